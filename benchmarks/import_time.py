@@ -0,0 +1,78 @@
+import json
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import click
+from loguru import logger
+
+logger = logger.bind(name="ImportTimeBenchmark")
+
+
+def _profile_import(module: str) -> dict:
+    """Import a module in a fresh interpreter with `-X importtime`, returning its wall time and imports."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True
+    )
+    wall_s = time.perf_counter() - start
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        imports.append((name.strip(), int(self_us), int(cumulative_us)))
+    return {"wall_s": wall_s, "imports": imports}
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.argument("module")
+@click.option("--repeat", default=3, help="Number of fresh interpreters to import the module in, the fastest is kept.")
+@click.option("--top", default=15, help="Number of slowest top-level imports to report.")
+@click.option(
+    "--history", default="benchmarks/import_time_history.jsonl", help="JSON lines file the report is appended to."
+)
+def run_benchmark(module: str, repeat: int, top: int, history: str):
+    """
+    Profile the import time of MODULE, and track it over time in a history file.
+
+    Shared by the packages of the repository: run it from a package directory with the package's
+    interpreter, e.g. `uv run python ../benchmarks/import_time.py kubrick_mcp.server`.
+    """
+    profile = min((_profile_import(module) for _ in range(repeat)), key=lambda profile: profile["wall_s"])
+    # Cost of each package, from its outermost import: the one with the largest cumulative time.
+    packages = {}
+    for name, _, cumulative_us in profile["imports"]:
+        package = name.split(".")[0]
+        if package != module.split(".")[0]:
+            packages[package] = max(packages.get(package, 0), cumulative_us)
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "revision": _git_revision(),
+        "module": module,
+        "wall_ms": 1000 * profile["wall_s"],
+        "import_ms": sum(self_us for _, self_us, _ in profile["imports"]) / 1000,
+        "modules": len(profile["imports"]),
+        "slowest_packages_ms": {package: cumulative_us / 1000 for package, cumulative_us in slowest},
+    }
+    logger.info(f"Import time report: {json.dumps(report, indent=4)}")
+
+    with open(history, "a") as f:
+        f.write(json.dumps(report) + "\n")
+
+
+if __name__ == "__main__":
+    run_benchmark()
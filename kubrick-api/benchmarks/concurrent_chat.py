@@ -0,0 +1,109 @@
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+
+import click
+from loguru import logger
+
+logger = logger.bind(name="ConcurrentChatBenchmark")
+
+STUB_ANSWER = json.dumps({"tool_use": False, "message": "This is a stubbed answer."})
+
+
+def start_stub_completion_server(host: str, port: int, latency_ms: float) -> None:
+    """Serve a Groq-compatible chat completion endpoint that answers after a fixed delay."""
+    import uvicorn
+    from fastapi import FastAPI, Request
+
+    app = FastAPI()
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency_ms / 1000)
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": STUB_ANSWER},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+
+async def timed_chat(agent, message: str, video_path: str | None) -> float:
+    start = time.perf_counter()
+    await agent.chat(message, video_path)
+    return time.perf_counter() - start
+
+
+async def run_chats(agent, n_chats: int, video_path: str | None) -> dict:
+    start = time.perf_counter()
+    sequential = [await timed_chat(agent, f"Question {i}", video_path) for i in range(n_chats)]
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    concurrent = await asyncio.gather(*[timed_chat(agent, f"Question {i}", video_path) for i in range(n_chats)])
+    concurrent_s = time.perf_counter() - start
+
+    return {
+        "chats": n_chats,
+        "sequential_s": sequential_s,
+        "concurrent_s": concurrent_s,
+        "speedup": sequential_s / concurrent_s,
+        "sequential_p50_ms": 1000 * statistics.median(sequential),
+        "concurrent_p50_ms": 1000 * statistics.median(concurrent),
+        "concurrent_max_ms": 1000 * max(concurrent),
+    }
+
+
+@click.command()
+@click.option("--n-chats", default=32, help="Number of chats run sequentially, then in parallel.")
+@click.option("--latency-ms", default=200.0, help="Latency of every stubbed completion.")
+@click.option("--port", default=8765, help="Port of the local stub completion endpoint.")
+@click.option("--with-routing", is_flag=True, help="Pass a video path, so every chat also runs the router.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(n_chats: int, latency_ms: float, port: int, with_routing: bool, output: str):
+    """
+    Measure how well N parallel chats overlap when every LLM call is served by a local stub.
+    """
+    start_stub_completion_server("127.0.0.1", port, latency_ms)
+
+    # Settings are read at import time, point the Groq client to the stub before importing the agent.
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("GROQ_API_KEY", "stub")
+    from kubrick_api.agent import GroqAgent
+
+    agent = GroqAgent(name="kubrick_benchmark", mcp_servers=["http://127.0.0.1:1/mcp"])
+    agent.routing_system_prompt = "Route the request."
+    agent.general_system_prompt = "Answer the user."
+    agent.tool_use_system_prompt = "Pick a tool. Image provided: {is_image_provided}"
+
+    try:
+        report = asyncio.run(run_chats(agent, n_chats, "benchmark.mp4" if with_routing else None))
+        report["speculation"] = agent.speculation_metrics
+    finally:
+        agent.reset_memory()
+
+    logger.info(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,51 @@
+import json
+
+import click
+from loguru import logger
+
+logger = logger.bind(name="RouterAccuracyBenchmark")
+
+
+@click.command()
+@click.option("--log-path", default="router_decisions.jsonl", help="Routing decision log written by GroqAgent.")
+@click.option(
+    "--thresholds",
+    default="0.5,0.6,0.7,0.8,0.9",
+    help="Comma separated confidence thresholds to evaluate.",
+)
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(log_path: str, thresholds: str, output: str):
+    """
+    Evaluate the local router against the LLM router decisions in the routing log.
+
+    Decisions that went to the LLM router, either as a fallback or as a sampled audit of a confident
+    local decision, have both labels and make up the evaluation set. For each threshold the report
+    gives the share of those messages the local router would have answered and its accuracy on them.
+    """
+    with open(log_path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    decisions = [r for r in records if r["source"] != "llm_audit"]
+    labeled = [r for r in records if r["source"] in ("llm", "llm_audit") and r["local_tool_use"] is not None]
+    report = {
+        "decisions": len(decisions),
+        "local_share": sum(r["source"] == "local" for r in decisions) / max(len(decisions), 1),
+        "labeled": len(labeled),
+        "thresholds": {},
+    }
+    for threshold in [float(t) for t in thresholds.split(",")]:
+        answered = [r for r in labeled if r["local_confidence"] >= threshold]
+        correct = sum(r["local_tool_use"] == r["tool_use"] for r in answered)
+        report["thresholds"][str(threshold)] = {
+            "coverage": len(answered) / max(len(labeled), 1),
+            "accuracy": correct / len(answered) if answered else None,
+        }
+
+    logger.info(json.dumps(report, indent=2))
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    run_benchmark()
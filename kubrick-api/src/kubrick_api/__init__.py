@@ -1,3 +0,0 @@
-from kubrick_api.opik_utils import configure
-
-configure()
\ No newline at end of file
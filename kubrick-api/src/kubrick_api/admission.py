@@ -0,0 +1,192 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from loguru import logger
+
+logger = logger.bind(name="AdmissionController")
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is not admitted, with the HTTP status and Retry-After delay to answer with."""
+
+    def __init__(self, lane: str, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.lane = lane
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+
+class _Lane:
+    def __init__(
+        self,
+        name: str,
+        priority: int,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: Optional[float],
+    ):
+        self.name = name
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        # Moving average of how long an admitted request holds its slot, used to estimate Retry-After.
+        self.service_time = 1.0
+        self.wait_time_total = 0.0
+        self.counters = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0}
+
+
+class Lease:
+    """An admitted request's slot in its lane. Releasing it more than once is a no-op."""
+
+    def __init__(self, controller: "AdmissionController", lane: _Lane):
+        self._controller = controller
+        self._lane = lane
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released:
+            self._released = True
+            self._controller._release(self._lane, time.monotonic() - self._start)
+
+    async def __aenter__(self) -> "Lease":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.release()
+
+
+class AdmissionController:
+    """Admission control over a global concurrency limit, split into priority lanes.
+
+    Every lane has its own concurrency limit and a bounded FIFO wait queue. A request is admitted when both
+    its lane and the global limit have room. When a slot frees up, the waiters of the highest-priority lane
+    are served first, so a burst of low-priority work (ingestion) cannot delay high-priority work (chat) by
+    more than the slots its own lane limit lets it hold.
+
+    Requests are rejected with 429 when their lane's queue is full, and with 503 when they waited longer
+    than the lane's queue timeout. Both carry a Retry-After estimated from the lane's recent service time.
+    """
+
+    def __init__(self, max_concurrency: int):
+        self.max_concurrency = max_concurrency
+        self._active = 0
+        self._lanes: Dict[str, _Lane] = {}
+
+    def add_lane(
+        self,
+        name: str,
+        priority: int,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: Optional[float] = None,
+    ) -> None:
+        """Add a lane. Lower `priority` values are served first."""
+        self._lanes[name] = _Lane(name, priority, max_concurrency, max_queue, queue_timeout)
+
+    @property
+    def metrics(self) -> Dict[str, dict]:
+        return {
+            "active": self._active,
+            "max_concurrency": self.max_concurrency,
+            "lanes": {
+                lane.name: {
+                    "active": lane.active,
+                    "queue_depth": len(lane.waiters),
+                    "max_concurrency": lane.max_concurrency,
+                    "max_queue": lane.max_queue,
+                    "avg_service_ms": lane.service_time * 1000,
+                    "avg_wait_ms": 1000 * lane.wait_time_total / max(lane.counters["queued"], 1),
+                    **lane.counters,
+                }
+                for lane in self._lanes.values()
+            },
+        }
+
+    def retry_after(self, lane_name: str) -> int:
+        """Estimate in seconds when the lane will have drained its current queue."""
+        lane = self._lanes[lane_name]
+        return max(1, math.ceil(lane.service_time * (len(lane.waiters) + 1) / lane.max_concurrency))
+
+    def ensure_capacity(self, lane_name: str) -> None:
+        """Reject right away when the lane's queue is full, for work that is only admitted later on.
+
+        Raises:
+            AdmissionRejected: With status 429 if the queue of the lane is full.
+        """
+        lane = self._lanes[lane_name]
+        if len(lane.waiters) >= lane.max_queue:
+            lane.counters["rejected_full"] += 1
+            raise AdmissionRejected(lane_name, 429, self.retry_after(lane_name), f"Too many {lane_name} requests")
+
+    def _has_room(self, lane: _Lane) -> bool:
+        return lane.active < lane.max_concurrency and self._active < self.max_concurrency
+
+    async def acquire(self, lane_name: str) -> Lease:
+        """Wait for a slot in the lane.
+
+        Raises:
+            AdmissionRejected: With status 429 if the lane's queue is full, or 503 if the queue timeout expired.
+        """
+        lane = self._lanes[lane_name]
+        if not lane.waiters and self._has_room(lane):
+            return self._admit(lane)
+
+        self.ensure_capacity(lane_name)
+        waiter = asyncio.get_running_loop().create_future()
+        lane.waiters.append(waiter)
+        lane.counters["queued"] += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=lane.queue_timeout)
+        except asyncio.TimeoutError:
+            lane.waiters.remove(waiter)
+            lane.counters["rejected_timeout"] += 1
+            logger.warning(f"Rejected a {lane_name} request after {time.monotonic() - start:.1f}s in the queue")
+            raise AdmissionRejected(
+                lane_name, 503, self.retry_after(lane_name), f"Timed out waiting for a {lane_name} slot"
+            )
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted while the caller was being cancelled, hand it to the next waiter.
+                self._release(lane, 0.0)
+            elif waiter in lane.waiters:
+                lane.waiters.remove(waiter)
+            raise
+        finally:
+            lane.wait_time_total += time.monotonic() - start
+
+        return Lease(self, lane)
+
+    def _admit(self, lane: _Lane) -> Lease:
+        lane.active += 1
+        self._active += 1
+        lane.counters["admitted"] += 1
+        return Lease(self, lane)
+
+    def _release(self, lane: _Lane, service_time: float) -> None:
+        lane.active -= 1
+        self._active -= 1
+        if service_time > 0:
+            lane.service_time = 0.8 * lane.service_time + 0.2 * service_time
+        self._grant()
+
+    def _grant(self) -> None:
+        """Hand the free slots to the waiters of the highest-priority lanes first."""
+        for lane in sorted(self._lanes.values(), key=lambda lane: lane.priority):
+            while lane.waiters and self._has_room(lane):
+                waiter = lane.waiters.popleft()
+                if waiter.done():
+                    continue
+                lane.active += 1
+                self._active += 1
+                lane.counters["admitted"] += 1
+                waiter.set_result(None)
@@ -0,0 +1,132 @@
+import hashlib
+import os
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Optional, Set, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+logger = logger.bind(name="AnswerCache")
+
+# Tools whose answer only depends on the video and the question, so it can be reused across users.
+CACHEABLE_TOOLS = {
+    "ask_question_about_video",
+    "ask_question_about_video_time_range",
+    "get_video_clip_from_user_query",
+    "get_video_clip_from_time_range",
+    "get_video_clip_from_image",
+    "get_highlight_reel_from_user_queries",
+    "get_highlight_reel_from_time_windows",
+}
+
+_WORD_PATTERN = re.compile(r"\d+(?:[.:]\d+)*|[\w']+")
+_FINGERPRINT_BYTES = 1 << 20
+
+
+@lru_cache(maxsize=1024)
+def _fingerprint(video_path: str, size: int, mtime_ns: int) -> str:
+    """Hash the size, head and tail of a video file, cached until the file changes."""
+    digest = hashlib.sha256(str(size).encode())
+    with open(video_path, "rb") as f:
+        digest.update(f.read(_FINGERPRINT_BYTES))
+        if size > 2 * _FINGERPRINT_BYTES:
+            f.seek(-_FINGERPRINT_BYTES, os.SEEK_END)
+            digest.update(f.read(_FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+def video_content_id(video_path: str) -> str:
+    """Identify a video by its content, so the same video uploaded under two names shares its cached answers.
+
+    Falls back to the path when the video is not reachable from the API.
+    """
+    try:
+        stat = os.stat(video_path)
+    except OSError:
+        return video_path
+    return _fingerprint(video_path, stat.st_size, stat.st_mtime_ns)
+
+
+def normalize_question(question: str) -> str:
+    """Normalize the case, spacing and punctuation of a question, keeping its words and their order."""
+    return " ".join(_WORD_PATTERN.findall(question.lower()))
+
+
+class _CacheEntry:
+    def __init__(self, video_id: str, response: BaseModel):
+        self.video_id = video_id
+        self.response = response
+        self.created_at = time.monotonic()
+
+
+class AnswerCache:
+    """An in-process cache of tool-backed answers, keyed by video content, image id and normalized question.
+
+    The cache is shared across sessions, so callers only use it for self-contained questions, the first
+    turn of a session, whose answer does not depend on an earlier conversation.
+
+    Only the same question about the same video reuses an answer. Paraphrases are deliberately not matched
+    by question embedding similarity: questions with the same words in another order embed closely but ask
+    something else ("who enters after the dog leaves" is not "who leaves after the dog enters"). Entries
+    expire after the TTL, the least recently used ones are evicted above `max_entries`, and all the entries
+    of a video are dropped when it is re-indexed.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: OrderedDict[Tuple[str, Optional[str], str], _CacheEntry] = OrderedDict()
+        self._by_video: Dict[str, Set[Tuple[str, Optional[str], str]]] = {}
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "max": self.max_entries, **self._counters}
+
+    def get(self, video_path: str, question: str, image_id: Optional[str] = None) -> Optional[BaseModel]:
+        """Get the cached answer to the same question about the same video and image, if any."""
+        key = (video_content_id(video_path), image_id, normalize_question(question))
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry.created_at > self.ttl:
+            self._remove(key)
+            entry = None
+
+        if entry is None:
+            self._counters["misses"] += 1
+            return None
+
+        self._counters["hits"] += 1
+        self._entries.move_to_end(key)
+        logger.info(f"Answer cache hit for video {entry.video_id}")
+        return entry.response
+
+    def put(self, video_path: str, question: str, image_id: Optional[str], response: BaseModel) -> None:
+        """Cache the answer to a question about a video."""
+        video_id = video_content_id(video_path)
+        key = (video_id, image_id, normalize_question(question))
+        self._entries[key] = _CacheEntry(video_id, response)
+        self._entries.move_to_end(key)
+        self._by_video.setdefault(video_id, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._counters["evictions"] += 1
+
+    def invalidate(self, video_path: str) -> None:
+        """Drop every cached answer about a video, e.g. after it was re-indexed."""
+        keys = list(self._by_video.get(video_content_id(video_path), ()))
+        for key in keys:
+            self._remove(key)
+        self._counters["invalidations"] += 1
+        logger.info(f"Invalidated {len(keys)} cached answers for {video_path}")
+
+    def _remove(self, key: Tuple[str, Optional[str], str]) -> None:
+        entry = self._entries.pop(key)
+        keys = self._by_video[entry.video_id]
+        keys.discard(key)
+        if not keys:
+            del self._by_video[entry.video_id]
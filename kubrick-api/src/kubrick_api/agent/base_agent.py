@@ -1,9 +1,21 @@
+import asyncio
+import time
 from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, List, Optional
 
-from fastmcp import Client
 from loguru import logger
+from mcp.types import PromptListChangedNotification, ServerNotification, ToolListChangedNotification
 
+from kubrick_api.agent.mcp_router import MCPRouter
 from kubrick_api.agent.memory import Memory
+from kubrick_api.agent.sessions import DEFAULT_SESSION_ID, AgentSession, SessionManager, new_session_id
+from kubrick_api.config import get_settings
+
+settings = get_settings()
+
+_current_session: ContextVar[Optional[AgentSession]] = ContextVar("current_session", default=None)
 
 
 class BaseAgent(ABC):
@@ -14,48 +26,162 @@ class BaseAgent(ABC):
     def __init__(
         self,
         name: str,
-        mcp_server: str,
+        mcp_servers: List[str],
         memory: Memory = None,
         disable_tools: list = None,
     ):
         self.name = name
-        self.mcp_client = Client(mcp_server)
-        self.memory = memory if memory else Memory(name)
+        self.mcp_router = MCPRouter(
+            mcp_servers,
+            vnodes=settings.MCP_HASH_RING_VNODES,
+            replication=settings.MCP_REPLICATION,
+            failure_cooldown=settings.MCP_REPLICA_FAILURE_COOLDOWN_SECONDS,
+            failure_threshold=settings.MCP_REPLICA_FAILURE_THRESHOLD,
+            placements_path=settings.MCP_PLACEMENTS_LOG_PATH,
+            size=settings.MCP_POOL_SIZE,
+            keepalive_interval=settings.MCP_POOL_KEEPALIVE_SECONDS,
+            acquire_timeout=settings.MCP_POOL_ACQUIRE_TIMEOUT_SECONDS,
+            message_handler=self._on_mcp_message,
+        )
+        self.sessions = SessionManager(
+            name,
+            max_sessions=settings.AGENT_MAX_SESSIONS,
+            ttl=settings.AGENT_SESSION_TTL_SECONDS,
+            memory=memory,
+        )
         self.disable_tools = disable_tools if disable_tools else []
         
         self.tools = None
         self.routing_system_prompt = None
         self.tool_use_system_prompt = None
         self.general_system_prompt = None
+
+        self.setup_version = 0
+        self._setup_at = None
+        self._refresh_after = 0.0
+        self._setup_lock = asyncio.Lock()
+        self._refresh_task = None
+        self._refresh_failures = 0
         
     async def setup(self):
         """Initialize async components of the agent."""
-        async with self.mcp_client as _:
-            self.tools = await self._get_tools()
-            self.routing_system_prompt = await self._get_routing_system_prompt()
-            self.tool_use_system_prompt = await self._get_tool_use_system_prompt()
-            self.general_system_prompt = await self._get_general_system_prompt()
+        tools = await self._get_tools()
+        routing_system_prompt = await self._get_routing_system_prompt()
+        tool_use_system_prompt = await self._get_tool_use_system_prompt()
+        general_system_prompt = await self._get_general_system_prompt()
+
+        # Only swap in a complete catalog, so a failed refresh keeps serving the last good one.
+        setup = (tools, routing_system_prompt, tool_use_system_prompt, general_system_prompt)
+        if setup != (self.tools, self.routing_system_prompt, self.tool_use_system_prompt, self.general_system_prompt):
+            self.tools, self.routing_system_prompt, self.tool_use_system_prompt, self.general_system_prompt = setup
+            self.setup_version += 1
+            logger.info(f"Loaded agent setup version {self.setup_version}")
+
+        self._setup_at = time.monotonic()
+        self._refresh_after = self._setup_at + settings.AGENT_SETUP_TTL_SECONDS
+
+    async def ensure_setup(self):
+        """Make sure the tool catalog and prompts are loaded.
+
+        The first call loads them. Later calls return at once with the cached version, and start a background
+        refresh when it is older than the TTL or the MCP server signaled that its tools or prompts changed.
+        """
+        if self._setup_at is None:
+            async with self._setup_lock:
+                if self._setup_at is None:
+                    await self.setup()
+            return
+
+        if time.monotonic() >= self._refresh_after:
+            self.refresh_in_background()
+
+    def refresh_in_background(self):
+        """Refresh the tool catalog and prompts in a background task, unless a refresh is already running."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _refresh(self):
+        async with self._setup_lock:
+            try:
+                await self.setup()
+            except Exception as e:
+                self._refresh_failures += 1
+                self._refresh_after = time.monotonic() + settings.AGENT_SETUP_RETRY_SECONDS
+                logger.warning(f"Agent setup refresh failed, keeping version {self.setup_version}: {e}")
+
+    async def _on_mcp_message(self, message) -> None:
+        """Refresh the cached setup when the MCP server signals a tool or prompt list change."""
+        if isinstance(message, ServerNotification) and isinstance(
+            message.root, (ToolListChangedNotification, PromptListChangedNotification)
+        ):
+            logger.info(f"MCP server signaled {message.root.method}, refreshing agent setup")
+            self._refresh_after = 0.0
+            self.refresh_in_background()
+
+    @property
+    def setup_metrics(self) -> dict:
+        return {
+            "version": self.setup_version,
+            "age_s": time.monotonic() - self._setup_at if self._setup_at is not None else None,
+            "refresh_failures": self._refresh_failures,
+        }
+
+    async def close(self):
+        """Write the pending memory records and close the pooled MCP sessions of the agent."""
+        self.sessions.flush()
+        await self.mcp_router.close()
 
     async def _get_routing_system_prompt(self) -> str:
         """Get the routing system prompt."""
         logger.info("Getting routing system prompt")
-        mcp_prompt = await self.mcp_client.get_prompt("routing_system_prompt")
+        async with self.mcp_router.session() as client:
+            mcp_prompt = await client.get_prompt("routing_system_prompt")
         return mcp_prompt.messages[0].content.text
     
     async def _get_tool_use_system_prompt(self) -> str:
         """Get the tool use system prompt."""
         logger.info("Getting tool use system prompt")
-        mcp_prompt = await self.mcp_client.get_prompt("tool_use_system_prompt")
+        async with self.mcp_router.session() as client:
+            mcp_prompt = await client.get_prompt("tool_use_system_prompt")
         return mcp_prompt.messages[0].content.text
     
     async def _get_general_system_prompt(self) -> str:
         """Get the general system prompt."""
         logger.info("Getting general system prompt")
-        mcp_prompt = await self.mcp_client.get_prompt("general_system_prompt")
+        async with self.mcp_router.session() as client:
+            mcp_prompt = await client.get_prompt("general_system_prompt")
         return mcp_prompt.messages[0].content.text
 
-    def reset_memory(self):
-        self.memory.reset_memory()
+    @property
+    def session(self) -> AgentSession:
+        """The session of the message being processed, or the default session outside of `use_session`."""
+        return _current_session.get() or self.sessions.get(DEFAULT_SESSION_ID)
+
+    @property
+    def memory(self) -> Memory:
+        return self.session.memory
+
+    @property
+    def thread_id(self) -> str:
+        return self.session.thread_id
+
+    @asynccontextmanager
+    async def use_session(self, session_id: Optional[str] = None) -> AsyncIterator[AgentSession]:
+        """Process a message within a session, one message at a time per session.
+
+        A message without a session id gets a new session, so anonymous clients never share a history or
+        wait on each other's messages.
+        """
+        session = self.sessions.get(session_id or new_session_id())
+        async with session.lock:
+            token = _current_session.set(session)
+            try:
+                yield session
+            finally:
+                _current_session.reset(token)
+
+    def reset_memory(self, session_id: Optional[str] = None):
+        self.sessions.reset(session_id)
         
     def filter_active_tools(self, tools: list) -> list:
         """
@@ -78,7 +204,7 @@ class BaseAgent(ABC):
             Exception: If tool discovery fails for any other reason
         """
         try:
-            async with self.mcp_client as client:
+            async with self.mcp_router.session() as client:
                 tools = await client.list_tools()
                 if not tools:
                     logger.info("No tools were discovered from the MCP server")
@@ -101,9 +227,8 @@ class BaseAgent(ABC):
         raise NotImplementedError("Tools are not implemented in the base class.")
     
     async def call_tool(self, function_name: str, function_args: dict) -> str:
-        async with self.mcp_client as _:
-            mcp_response = await self.mcp_client.call_tool(function_name, function_args)
-            return mcp_response[0].text
+        mcp_response = await self.mcp_router.call_tool(function_name, function_args)
+        return mcp_response[0].text
     
     @abstractmethod
     async def chat(self, message: str) -> str:
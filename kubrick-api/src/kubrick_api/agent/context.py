@@ -0,0 +1,143 @@
+import math
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from kubrick_api.agent.memory import MemoryRecord
+from kubrick_api.config import get_settings
+
+logger = logger.bind(name="Context")
+
+settings = get_settings()
+
+# Fallback when the tokenizer cannot be loaded. Llama 4 tokenizers average a bit under 4 characters per
+# token on English text, so this slightly overestimates.
+CHARS_PER_TOKEN = 3.5
+MESSAGE_OVERHEAD_TOKENS = 4
+IMAGE_TOKENS = 1000
+
+SUMMARY_SYSTEM_PROMPT = """
+You maintain a running summary of a conversation between a user and Kubrick, an AI assistant that answers
+questions about videos. You receive the current summary and the messages that happened since. Return an
+updated summary, in a few short paragraphs, that keeps the facts, the user's goals and preferences, the
+videos and clips discussed and any open questions. Drop greetings and small talk.
+"""
+
+_request_report: ContextVar[Optional["PromptTokenReport"]] = ContextVar("prompt_token_report", default=None)
+_tokenizer: Any = None
+
+
+def load_tokenizer() -> bool:
+    """Load the tokenizer of the chat models from the Hugging Face Hub, to count prompt tokens with it.
+
+    The download blocks, so the API runs this in a worker thread at startup. Tokens are estimated from the
+    text length until it is loaded, or if it cannot be, e.g. offline or without access to the repo.
+
+    Returns:
+        bool: Whether the tokenizer was loaded.
+    """
+    global _tokenizer
+    if not settings.TOKENIZER_MODEL:
+        return False
+    try:
+        from tokenizers import Tokenizer
+
+        _tokenizer = Tokenizer.from_pretrained(settings.TOKENIZER_MODEL)
+    except Exception as e:
+        logger.warning(f"Could not load the {settings.TOKENIZER_MODEL} tokenizer, estimating tokens instead: {e}")
+        return False
+    logger.info(f"Counting prompt tokens with the {settings.TOKENIZER_MODEL} tokenizer")
+    return True
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of a text with the chat model tokenizer, or estimate them from its length without it."""
+    if _tokenizer is None:
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+    return len(_tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def estimate_tokens(content: Any) -> int:
+    """Estimate the prompt tokens of a message content, either a string or a list of multimodal content parts.
+
+    Text is counted with the chat model tokenizer. The message framing and the images are estimates.
+    """
+    if isinstance(content, list):
+        text = " ".join(part.get("text", "") for part in content if part.get("type") == "text")
+        n_images = sum(part.get("type") == "image_url" for part in content)
+        return estimate_tokens(text) + n_images * IMAGE_TOKENS
+    return count_tokens(content or "") + MESSAGE_OVERHEAD_TOKENS
+
+
+def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(estimate_tokens(message.get("content")) for message in messages)
+
+
+def context_budget(model: str) -> int:
+    """The prompt token budget of a model, used to fit the system prompt, summary, history and user message."""
+    return settings.MODEL_CONTEXT_TOKEN_BUDGETS.get(model, settings.CONTEXT_TOKEN_BUDGET)
+
+
+def fit_history(records: List[MemoryRecord], budget: int) -> List[MemoryRecord]:
+    """Keep the newest records whose estimated tokens fit in the budget, in chronological order."""
+    fitted = []
+    used = 0
+    for record in reversed(records):
+        tokens = estimate_tokens(record.content)
+        if used + tokens > budget:
+            break
+        fitted.append(record)
+        used += tokens
+    return fitted[::-1]
+
+
+def format_transcript(records: List[MemoryRecord]) -> str:
+    return "\n".join(f"{record.role}: {record.content}" for record in records)
+
+
+class PromptTokenReport:
+    """The prompt tokens spent by one request, per LLM call, and the history tokens saved by the context budget.
+
+    Prompt tokens come from the usage returned by the API. Streamed completions do not return it, so they
+    are reported with an estimate instead.
+    """
+
+    def __init__(self):
+        self.prompt_tokens: Dict[str, int] = {}
+        self.history_tokens_full = 0
+        self.history_tokens_sent = 0
+
+    def add_usage(self, step: str, result: Any) -> None:
+        """Add the prompt tokens of a completion, or of the raw completion behind an instructor response."""
+        completion = getattr(result, "_raw_response", result)
+        usage = getattr(completion, "usage", None)
+        self.add(step, getattr(usage, "prompt_tokens", 0) or 0)
+
+    def add(self, step: str, tokens: int) -> None:
+        self.prompt_tokens[step] = self.prompt_tokens.get(step, 0) + tokens
+
+    def add_history(self, full: int, sent: int) -> None:
+        self.history_tokens_full += full
+        self.history_tokens_sent += sent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": sum(self.prompt_tokens.values()),
+            "prompt_tokens_by_step": dict(self.prompt_tokens),
+            "history_tokens_full": self.history_tokens_full,
+            "history_tokens_sent": self.history_tokens_sent,
+            "history_tokens_saved": self.history_tokens_full - self.history_tokens_sent,
+        }
+
+
+def start_report() -> PromptTokenReport:
+    """Start the prompt token report of the current request."""
+    report = PromptTokenReport()
+    _request_report.set(report)
+    return report
+
+
+def current_report() -> PromptTokenReport:
+    """The prompt token report of the current request, or a throwaway one outside of a request."""
+    return _request_report.get() or PromptTokenReport()
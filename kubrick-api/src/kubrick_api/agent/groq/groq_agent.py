@@ -1,22 +1,40 @@
+import asyncio
 import json
+import random
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import cached_property
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional
 
-import instructor
 import opik
-from groq import Groq
 from loguru import logger
 from opik import opik_context
 
+from kubrick_api.agent.answer_cache import CACHEABLE_TOOLS, AnswerCache
 from kubrick_api.agent.base_agent import BaseAgent
+from kubrick_api.agent.context import (
+    SUMMARY_SYSTEM_PROMPT,
+    PromptTokenReport,
+    context_budget,
+    current_report,
+    estimate_messages_tokens,
+    estimate_tokens,
+    fit_history,
+    format_transcript,
+    start_report,
+)
 from kubrick_api.agent.groq.groq_tool import transform_tool_definition
-from kubrick_api.agent.memory import Memory, MemoryRecord
+from kubrick_api.agent.memory import ConversationSummary, Memory, MemoryRecord
+from kubrick_api.agent.router import LocalRouter, RoutingDecision, log_routing_decision
+from kubrick_api.agent.sessions import AgentSession
 from kubrick_api.config import get_settings
+from kubrick_api.image_store import ImageStore
 from kubrick_api.models import (
     AssistantMessageResponse,
     GeneralResponseModel,
     RoutingResponseModel,
+    SummaryResponseModel,
     VideoClipResponseModel,
 )
 
@@ -29,19 +47,59 @@ class GroqAgent(BaseAgent):
     def __init__(
         self,
         name: str,
-        mcp_server: str,
+        mcp_servers: List[str],
         memory: Optional[Memory] = None,
         disable_tools: list = None,
     ):
         super().__init__(
             name,
-            mcp_server,
+            mcp_servers,
             memory,
             disable_tools,
         )
-        self.client = Groq(api_key=settings.GROQ_API_KEY)
-        self.instructor_client = instructor.from_groq(self.client, mode=instructor.Mode.JSON)
-        self.thread_id = str(uuid.uuid4())
+        self.image_store = ImageStore()
+        self.local_router = (
+            LocalRouter.from_settings(settings.LOCAL_ROUTER_EXAMPLES_PATH) if settings.LOCAL_ROUTER_ENABLED else None
+        )
+        self.answer_cache = (
+            AnswerCache(
+                max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+                ttl=settings.ANSWER_CACHE_TTL_SECONDS,
+            )
+            if settings.ANSWER_CACHE_ENABLED
+            else None
+        )
+        self._background_tasks = set()
+        self.speculation_metrics = {
+            "chats": 0,
+            "tool_path": 0,
+            "general_path": 0,
+            "cancelled_in_flight": 0,
+            # Usage of the discarded paths that finished, cancelled ones never return theirs.
+            "wasted_tokens_lower_bound": 0,
+            "cancelled_prompt_tokens_estimate": 0,
+            "latency_saved_ms": 0.0,
+        }
+        self.context_metrics = {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "history_tokens_full": 0,
+            "history_tokens_sent": 0,
+            "summary_updates": 0,
+        }
+
+    @cached_property
+    def client(self):
+        """The Groq client, created on first use: groq and instructor are slow to import."""
+        from groq import AsyncGroq
+
+        return AsyncGroq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL)
+
+    @cached_property
+    def instructor_client(self):
+        import instructor
+
+        return instructor.from_groq(self.client, mode=instructor.Mode.JSON)
 
     async def _get_tools(self) -> List[Dict[str, Any]]:
         tools = await self.discover_tools()
@@ -52,88 +110,192 @@ class GroqAgent(BaseAgent):
         self,
         system_prompt: str,
         user_message: str,
-        image_base64: Optional[str] = None,
+        image_id: Optional[str] = None,
+        model: str = settings.GROQ_GENERAL_MODEL,
         n: int = settings.AGENT_MEMORY_SIZE,
     ) -> List[Dict[str, Any]]:
-        history = [{"role": "system", "content": system_prompt}]
-        history += [{"role": record.role, "content": record.content} for record in self.memory.get_latest(n)]
+        """Build the conversation sent to `model`, fitting it in the model's context token budget.
 
-        user_content = (
-            [
-                {"type": "text", "text": user_message},
-                {
-                    "type": "image_url",
-                    "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"},
-                },
-            ]
-            if image_base64
-            else user_message
+        The newest turns are kept verbatim, as many as fit in the budget left by the system prompt, the
+        rolling summary and the user message. Older turns are only represented by the summary, which is
+        updated in the background once enough of them have piled up.
+        """
+        user_content = self._user_content(user_message, image_id)
+        summary_content, kept = self._fit_context(
+            estimate_tokens(system_prompt) + estimate_tokens(user_content), model, n
+        )
+        return _compose_history(system_prompt, summary_content, kept, user_content)
+
+    def _user_content(self, user_message: str, image_id: Optional[str] = None) -> Any:
+        if not image_id:
+            return user_message
+        return [
+            {"type": "text", "text": user_message},
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{self.image_store.load_base64(image_id, 'llm')}"},
+            },
+        ]
+
+    def _fit_context(
+        self, reserved_tokens: int, model: str, n: int = settings.AGENT_MEMORY_SIZE
+    ) -> tuple[Optional[str], List[MemoryRecord]]:
+        """Select the summary and the newest turns that fit in the budget of `model` left by `reserved_tokens`.
+
+        The first kept turn becomes the start of the session's prompt window, so this runs once per request.
+
+        Returns:
+            tuple[Optional[str], List[MemoryRecord]]: The summary message content, if any, and the kept turns.
+        """
+        summary = self.memory.get_summary()
+        summary_content = f"Summary of the earlier conversation:\n{summary.text}" if summary else None
+        records = self.memory.get_latest(n)
+        budget = context_budget(model) - reserved_tokens
+        if summary_content:
+            budget -= estimate_tokens(summary_content)
+        kept = fit_history(records, budget)
+
+        if records:
+            self.session.window_start = kept[0].timestamp if kept else datetime.max
+        current_report().add_history(
+            full=sum(estimate_tokens(record.content) for record in records),
+            sent=sum(estimate_tokens(record.content) for record in kept)
+            + (estimate_tokens(summary_content) if summary_content else 0),
         )
-        history.append({"role": "user", "content": user_content})
-        return history
+        return summary_content, kept
 
-    @opik.track(name="router", type="llm")
-    def _should_use_tool(self, message: str) -> bool:
+    def _route_locally(self, message: str) -> Optional[RoutingDecision]:
+        """The local router decision for a message, computed once per request, or None without a local router."""
+        return self.local_router.route(message) if self.local_router else None
+
+    @staticmethod
+    def _is_confident(local_decision: Optional[RoutingDecision]) -> bool:
+        """Whether the local router is confident enough to route the message without the LLM router."""
+        return bool(local_decision) and local_decision.confidence >= settings.LOCAL_ROUTER_CONFIDENCE_THRESHOLD
+
+    @opik.track(name="router", type="general")
+    async def _should_use_tool(self, message: str, local_decision: Optional[RoutingDecision]) -> bool:
+        if self._is_confident(local_decision):
+            logger.info(f"Local router decision: {local_decision}")
+            self._log_routing_decision(message, local_decision)
+            if random.random() < settings.LOCAL_ROUTER_AUDIT_RATE:
+                self._run_in_background(self._audit_local_route(message, local_decision))
+            return local_decision.tool_use
+
+        decision = RoutingDecision(tool_use=await self._route_with_llm(message), confidence=1.0, source="llm")
+        self._log_routing_decision(message, decision, local_decision)
+        return decision.tool_use
+
+    def _run_in_background(self, coroutine: Awaitable[Any]) -> None:
+        """Run a coroutine off the request path, keeping a reference to it until it is done."""
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _log_routing_decision(
+        self, message: str, decision: RoutingDecision, local_decision: Optional[RoutingDecision] = None
+    ) -> None:
+        """Append a routing decision to the decision log from a worker thread, off the event loop."""
+        self._run_in_background(
+            asyncio.to_thread(
+                log_routing_decision, settings.ROUTER_DECISION_LOG_PATH, message, decision, local_decision
+            )
+        )
+
+    async def _audit_local_route(self, message: str, local_decision: RoutingDecision) -> None:
+        """Label a confident local routing decision with the LLM router, off the request path."""
+        try:
+            tool_use = await self._route_with_llm(message)
+        except Exception as e:
+            logger.warning(f"Routing audit failed: {e}")
+            return
+        decision = RoutingDecision(tool_use=tool_use, confidence=1.0, source="llm_audit")
+        await asyncio.to_thread(
+            log_routing_decision, settings.ROUTER_DECISION_LOG_PATH, message, decision, local_decision
+        )
+
+    @opik.track(name="llm-router", type="llm")
+    async def _route_with_llm(self, message: str) -> bool:
         messages = [
             {"role": "system", "content": self.routing_system_prompt},
             {"role": "user", "content": message},
         ]
-        response = self.instructor_client.chat.completions.create(
+        response = await self.instructor_client.chat.completions.create(
             model=settings.GROQ_ROUTING_MODEL,
             response_model=RoutingResponseModel,
             messages=messages,
             max_completion_tokens=20,
         )
+        current_report().add_usage("router", response)
         return response.tool_use
 
-    async def _execute_tool_call(self, tool_call: Any, video_path: str, image_base64: str | None = None) -> str:
+    async def _execute_tool_call(self, tool_call: Any, video_path: str, image_id: str | None = None) -> str:
         """Execute a single tool call and return its response."""
         function_name = tool_call.function.name
         function_args = json.loads(tool_call.function.arguments)
 
         function_args["video_path"] = video_path
 
-        if function_name == "get_video_clip_from_image":
-            function_args["user_image"] = image_base64
-
         logger.info(f"Executing tool: {function_name}")
 
         try:
+            if function_name == "get_video_clip_from_image":
+                if image_id is None:
+                    raise ValueError("no image was sent with this message")
+                function_args["user_image"] = self.image_store.reference(image_id, "search")
             return await self.call_tool(function_name, function_args)
         except Exception as e:
             logger.error(f"Error executing tool {function_name}: {str(e)}")
             return f"Error executing tool {function_name}: {str(e)}"
 
-    @opik.track(name="tool-use", type="tool")
-    async def _run_with_tool(self, message: str, video_path: str, image_base64: str | None = None) -> str:
-        """Execute chat completion with tool usage."""
-        tool_use_system_prompt = self.tool_use_system_prompt.format(
-            is_image_provided=bool(image_base64),
+    @opik.track(name="tool-selection", type="llm")
+    async def _select_tools(self, chat_history: List[Dict[str, Any]]) -> Any:
+        """Ask the tool use model which tools to call for the current conversation, returning the completion."""
+        completion = await self.client.chat.completions.create(
+            model=settings.GROQ_TOOL_USE_MODEL,
+            messages=chat_history,
+            tools=self.tools,
+            tool_choice="auto",
+            max_completion_tokens=4096,
         )
-        chat_history = self._build_chat_history(tool_use_system_prompt, message)
+        current_report().add_usage("tool_selection", completion)
+        return completion
 
-        response = (
-            self.client.chat.completions.create(
-                model=settings.GROQ_TOOL_USE_MODEL,
-                messages=chat_history,
-                tools=self.tools,
-                tool_choice="auto",
-                max_completion_tokens=4096,
-            )
-            .choices[0]
-            .message
-        )
-        tool_calls = response.tool_calls
-        logger.info(f"Tool calls: {tool_calls}")
+    async def _execute_tool_call_bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        tool_call: Any,
+        video_path: str,
+        image_id: str | None = None,
+    ) -> str:
+        """Execute a single tool call within the concurrency limit and the per-call timeout."""
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(
+                    self._execute_tool_call(tool_call, video_path, image_id),
+                    timeout=settings.TOOL_CALL_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.error(f"Tool {tool_call.function.name} timed out after {settings.TOOL_CALL_TIMEOUT_SECONDS}s")
+                return f"Error executing tool {tool_call.function.name}: timed out"
 
-        if not tool_calls:
-            logger.info("No tool calls available, returning general response ...")
-            return GeneralResponseModel(message=response.content)
+    async def _execute_tool_calls(
+        self,
+        tool_calls: List[Any],
+        chat_history: List[Dict[str, Any]],
+        video_path: str,
+        image_id: str | None = None,
+    ) -> List[str]:
+        """Execute the tool calls of one turn concurrently, append their results to the chat history and return them.
 
-        for tool_call in tool_calls:
-            function_response = await self._execute_tool_call(tool_call, video_path, image_base64)
-            logger.info(f"Function response: {function_response}")
+        A turn takes about as long as its slowest tool.
+        """
+        function_responses = [None] * len(tool_calls)
+        async for idx, function_response in self._iter_tool_results(tool_calls, video_path, image_id):
+            function_responses[idx] = function_response
 
+        for tool_call, function_response in zip(tool_calls, function_responses):
+            logger.info(f"Function response: {function_response}")
             chat_history.append(
                 {
                     "tool_call_id": tool_call.id,
@@ -143,8 +305,51 @@ class GroqAgent(BaseAgent):
                 }
             )
 
+        return function_responses
+
+    async def _iter_tool_results(
+        self,
+        tool_calls: List[Any],
+        video_path: str,
+        image_id: str | None = None,
+    ) -> AsyncIterator[tuple[int, str]]:
+        """Execute the tool calls of one turn concurrently, yielding `(index, response)` pairs as they complete.
+
+        Every call checks out its own pooled MCP session, so the pool size also bounds the parallelism.
+        """
+        semaphore = asyncio.Semaphore(settings.TOOL_CALL_MAX_CONCURRENCY)
+        results = asyncio.Queue()
+
+        async def run(idx: int, tool_call: Any) -> None:
+            results.put_nowait((idx, await self._execute_tool_call_bounded(semaphore, tool_call, video_path, image_id)))
+
+        async def run_all() -> None:
+            try:
+                await asyncio.gather(*[run(idx, tool_call) for idx, tool_call in enumerate(tool_calls)])
+            finally:
+                results.put_nowait(None)
+
+        batch = asyncio.create_task(run_all())
+        try:
+            while (result := await results.get()) is not None:
+                yield result
+            await batch
+        finally:
+            batch.cancel()
+
+    def _build_followup(
+        self, message: str, tool_names: List[str], function_responses: List[str]
+    ) -> tuple[List[Dict[str, Any]], type]:
+        """Build the follow-up conversation and response model used to answer from the tool results."""
         response_model = (
-            GeneralResponseModel if tool_call.function.name == "ask_question_about_video" else VideoClipResponseModel
+            GeneralResponseModel
+            if all(name in ("ask_question_about_video", "ask_question_about_video_time_range") for name in tool_names)
+            else VideoClipResponseModel
+        )
+        function_response = (
+            function_responses[0]
+            if len(function_responses) == 1
+            else "\n\n".join(f"Result of {name}:\n{response}" for name, response in zip(tool_names, function_responses))
         )
 
         # TODO: Prompt need to be improved, tool-calling history + general response confuse the LLM
@@ -156,59 +361,448 @@ class GroqAgent(BaseAgent):
             {"role": "user", "content": message},
             {"role": "assistant", "content": function_response},
         ]
-        followup_response = self.instructor_client.chat.completions.create(
+        return tmp_chat, response_model
+
+    @opik.track(name="tool-use", type="tool")
+    async def _run_with_tool(self, message: str, video_path: str, image_id: str | None = None) -> str:
+        """Execute chat completion with tool usage."""
+        tool_use_system_prompt = self.tool_use_system_prompt.format(
+            is_image_provided=bool(image_id),
+        )
+        chat_history = self._build_chat_history(tool_use_system_prompt, message, model=settings.GROQ_TOOL_USE_MODEL)
+        completion = await self._select_tools(chat_history)
+        return await self._complete_with_tool(message, video_path, image_id, chat_history, completion)
+
+    async def _complete_with_tool(
+        self,
+        message: str,
+        video_path: str,
+        image_id: str | None,
+        chat_history: List[Dict[str, Any]],
+        completion: Any,
+    ) -> Any:
+        """Execute the tools picked in a tool selection completion and answer from their results."""
+        response = completion.choices[0].message
+        tool_calls = response.tool_calls
+        logger.info(f"Tool calls: {tool_calls}")
+
+        if not tool_calls:
+            logger.info("No tool calls available, returning general response ...")
+            return GeneralResponseModel(message=response.content)
+
+        function_responses = await self._execute_tool_calls(tool_calls, chat_history, video_path, image_id)
+        followup_chat, response_model = self._build_followup(
+            message, [tool_call.function.name for tool_call in tool_calls], function_responses
+        )
+        followup_response = await self.instructor_client.chat.completions.create(
             model=settings.GROQ_GENERAL_MODEL,
-            messages=tmp_chat,
+            messages=followup_chat,
             response_model=response_model,
         )
+        current_report().add_usage("followup", followup_response)
+        self._cache_answer(
+            message, video_path, image_id, [tool_call.function.name for tool_call in tool_calls], followup_response
+        )
 
         return followup_response
 
+    def _is_first_turn(self) -> bool:
+        """Whether the session has no earlier turns, so the answer only depends on the video and the question.
+
+        Follow-ups like "and what happens after that?" are answered from the history of their session, so
+        their answers are neither shared through nor taken from the answer cache.
+        """
+        return not self.memory.get_latest(1)
+
+    def _get_cached_answer(self, message: str, video_path: Optional[str], image_id: Optional[str]) -> Any:
+        """Get the cached answer to the same first question about the same video, or None."""
+        if not (self.answer_cache and video_path and self._is_first_turn()):
+            return None
+        return self.answer_cache.get(video_path, message, image_id)
+
+    def _cache_answer(
+        self,
+        message: str,
+        video_path: str,
+        image_id: Optional[str],
+        tool_names: List[str],
+        response: Any,
+    ) -> None:
+        """Cache the answer to the first question of a session, built from tools that only use the video."""
+        if (
+            self.answer_cache
+            and tool_names
+            and all(name in CACHEABLE_TOOLS for name in tool_names)
+            and self._is_first_turn()
+        ):
+            self.answer_cache.put(video_path, message, image_id, response)
+
+    def invalidate_video(self, video_path: str) -> None:
+        """Drop the cached answers about a video, once it has been re-indexed."""
+        if self.answer_cache:
+            self.answer_cache.invalidate(video_path)
+
     @opik.track(name="generate-response", type="llm")
-    def _respond_general(self, message: str) -> str:
-        chat_history = self._build_chat_history(self.general_system_prompt, message)
-        return self.instructor_client.chat.completions.create(
+    async def _respond_general(self, message: str, chat_history: Optional[List[Dict[str, Any]]] = None) -> str:
+        chat_history = chat_history or self._build_chat_history(self.general_system_prompt, message)
+        response = await self.instructor_client.chat.completions.create(
             model=settings.GROQ_GENERAL_MODEL,
             messages=chat_history,
             response_model=GeneralResponseModel,
         )
-
-    def _add_to_memory(self, role: str, content: str) -> None:
-        """Add a message to the agent's memory."""
-        self.memory.insert(
-            MemoryRecord(
-                message_id=str(uuid.uuid4()),
-                role=role,
-                content=content,
-                timestamp=datetime.now(),
-            )
-        )
+        current_report().add_usage("general", response)
+        return response
 
     @opik.track(name="memory-insertion", type="general")
     def _add_memory_pair(self, user_message: str, assistant_message: str) -> None:
-        self._add_to_memory("user", user_message)
-        self._add_to_memory("assistant", assistant_message)
+        self.memory.insert_many(
+            [
+                MemoryRecord(message_id=str(uuid.uuid4()), role=role, content=content, timestamp=datetime.now())
+                for role, content in (("user", user_message), ("assistant", assistant_message))
+            ]
+        )
+
+    def _finish_turn(self, user_message: str, assistant_message: str, report: PromptTokenReport) -> Dict[str, Any]:
+        """Store a completed turn, schedule the summary update and report the prompt tokens of the request."""
+        self._add_memory_pair(user_message, assistant_message)
+        self._schedule_summary_update()
+
+        tokens = report.to_dict()
+        self.context_metrics["requests"] += 1
+        self.context_metrics["prompt_tokens"] += tokens["prompt_tokens"]
+        self.context_metrics["history_tokens_full"] += tokens["history_tokens_full"]
+        self.context_metrics["history_tokens_sent"] += tokens["history_tokens_sent"]
+        logger.info(
+            f"Prompt tokens: {tokens['prompt_tokens']} {tokens['prompt_tokens_by_step']}, "
+            f"history tokens saved: {tokens['history_tokens_saved']}"
+        )
+        return tokens
+
+    def _schedule_summary_update(self) -> None:
+        """Fold the turns left out of the last prompt into the session summary, unless an update is running."""
+        session = self.session
+        if session.window_start is None or (session.summary_task and not session.summary_task.done()):
+            return
+        session.summary_task = asyncio.create_task(self._update_summary(session))
+
+    async def _update_summary(self, session: AgentSession) -> None:
+        """Update the rolling summary of a session with the turns between the summary and the prompt window.
+
+        The summary is only updated once `SUMMARY_MIN_RECORDS` records are due, so a long conversation costs
+        one summarization call every few turns instead of one per turn.
+        """
+        memory = session.memory
+        try:
+            summary = memory.get_summary()
+            records = memory.get_range(
+                summary.summarized_until if summary else None, session.window_start, settings.SUMMARY_MAX_RECORDS
+            )
+            if len(records) < settings.SUMMARY_MIN_RECORDS:
+                return
+
+            response = await self.instructor_client.chat.completions.create(
+                model=settings.GROQ_SUMMARY_MODEL,
+                response_model=SummaryResponseModel,
+                messages=[
+                    {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": f"Current summary:\n{summary.text if summary else 'None'}\n\n"
+                        f"New messages:\n{format_transcript(records)}",
+                    },
+                ],
+                max_completion_tokens=settings.SUMMARY_MAX_TOKENS,
+            )
+            memory.set_summary(ConversationSummary(text=response.summary, summarized_until=records[-1].timestamp))
+            self.context_metrics["summary_updates"] += 1
+            logger.info(f"Summarized {len(records)} records of session {session.session_id}")
+        except Exception as e:
+            logger.warning(f"Summary update of session {session.session_id} failed: {e}")
 
     @opik.track(name="chat", type="general")
     async def chat(
         self,
         message: str,
         video_path: Optional[str] = None,
-        image_base64: Optional[str] = None,
+        image_id: Optional[str] = None,
+        session_id: Optional[str] = None,
     ) -> AssistantMessageResponse:
-        """Main entry point for processing a user message."""
-        opik_context.update_current_trace(thread_id=self.thread_id)
+        """Main entry point for processing a user message, within the conversation of `session_id`."""
+        async with self.use_session(session_id) as session:
+            opik_context.update_current_trace(thread_id=self.thread_id)
+            report = start_report()
+
+            response = self._get_cached_answer(message, video_path, image_id)
+            local_decision = self._route_locally(message) if response is None and video_path else None
+            if response is not None:
+                logger.info("Answering from the answer cache")
+            elif video_path and settings.SPECULATIVE_EXECUTION and not self._is_confident(local_decision):
+                response = await self._chat_speculatively(message, video_path, image_id, local_decision)
+            else:
+                response = await self._chat(message, video_path, image_id, local_decision)
 
-        tool_required = video_path and self._should_use_tool(message)
+            tokens = self._finish_turn(message, response.message, report)
+            opik_context.update_current_trace(metadata=tokens)
+            return AssistantMessageResponse(**response.dict(), session_id=session.session_id)
+
+    async def _chat(
+        self,
+        message: str,
+        video_path: Optional[str] = None,
+        image_id: Optional[str] = None,
+        local_decision: Optional[RoutingDecision] = None,
+    ) -> Any:
+        """Route the message, then answer it with or without tools."""
+        tool_required = video_path and await self._should_use_tool(message, local_decision)
         logger.info(f"Tool required: {tool_required}")
 
         if tool_required:
             logger.info("Running tool response")
-            response = await self._run_with_tool(message, video_path, image_base64)
+            return await self._run_with_tool(message, video_path, image_id)
+
+        logger.info("Running general response")
+        return await self._respond_general(message)
+
+    @opik.track(name="speculative-execution", type="general")
+    async def _chat_speculatively(
+        self,
+        message: str,
+        video_path: str,
+        image_id: str | None = None,
+        local_decision: Optional[RoutingDecision] = None,
+    ) -> Any:
+        """Run the router, the general answer and the tool selection concurrently, keeping only the routed path.
+
+        The critical path goes from router + answer down to about max(router, answer), at the cost of the
+        tokens of the losing path. Both paths share the history selected once for the request. The losing
+        path is cancelled if it is still running: the tokens of a finished one are recorded as wasted, and
+        the prompt tokens of a cancelled one are estimated, as its usage is never returned.
+        """
+        start = time.perf_counter()
+        tool_use_system_prompt = self.tool_use_system_prompt.format(
+            is_image_provided=bool(image_id),
+        )
+        user_content = self._user_content(message, image_id)
+        # Fit the history in the smaller budget of the two models, next to the longer system prompt.
+        summary_content, kept_records = self._fit_context(
+            max(estimate_tokens(tool_use_system_prompt), estimate_tokens(self.general_system_prompt))
+            + estimate_tokens(user_content),
+            min(settings.GROQ_TOOL_USE_MODEL, settings.GROQ_GENERAL_MODEL, key=context_budget),
+        )
+        chat_history = _compose_history(tool_use_system_prompt, summary_content, kept_records, user_content)
+        general_history = _compose_history(self.general_system_prompt, summary_content, kept_records, message)
+        general_task = asyncio.create_task(_timed(self._respond_general(message, general_history)))
+        selection_task = asyncio.create_task(_timed(self._select_tools(chat_history)))
+
+        try:
+            tool_required = await self._should_use_tool(message, local_decision)
+        except BaseException:
+            general_task.cancel()
+            selection_task.cancel()
+            raise
+        router_s = time.perf_counter() - start
+        logger.info(f"Tool required: {tool_required}")
+
+        kept, discarded = (selection_task, general_task) if tool_required else (general_task, selection_task)
+        wasted_tokens, cancelled_prompt_tokens = 0, 0
+        if discarded.done() and not discarded.cancelled() and discarded.exception() is None:
+            result, _ = discarded.result()
+            wasted_tokens = _total_tokens(result)
         else:
-            logger.info("Running general response")
-            response = self._respond_general(message)
+            discarded.cancel()
+            cancelled_prompt_tokens = estimate_messages_tokens(general_history if tool_required else chat_history)
+            self.speculation_metrics["cancelled_in_flight"] += 1
+
+        result, kept_finished_at = await kept
+        latency_saved_s = min(router_s, kept_finished_at - start)
+
+        self.speculation_metrics["chats"] += 1
+        self.speculation_metrics["tool_path" if tool_required else "general_path"] += 1
+        self.speculation_metrics["wasted_tokens_lower_bound"] += wasted_tokens
+        self.speculation_metrics["cancelled_prompt_tokens_estimate"] += cancelled_prompt_tokens
+        self.speculation_metrics["latency_saved_ms"] += latency_saved_s * 1000
+        opik_context.update_current_span(
+            metadata={
+                "tool_required": tool_required,
+                "wasted_tokens_lower_bound": wasted_tokens,
+                "cancelled_prompt_tokens_estimate": cancelled_prompt_tokens,
+                "latency_saved_ms": latency_saved_s * 1000,
+            }
+        )
+        logger.info(
+            f"Speculative execution saved {latency_saved_s * 1000:.0f}ms, wasted at least {wasted_tokens} tokens "
+            f"and about {cancelled_prompt_tokens} prompt tokens of a cancelled request"
+        )
+
+        if tool_required:
+            return await self._complete_with_tool(message, video_path, image_id, chat_history, result)
+        return result
+
+    async def _stream_answer(
+        self, messages: List[Dict[str, Any]], response_model: type
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a structured answer as `token` events, followed by a `done` event with the full response.
+
+        Streamed completions do not return their usage, so their prompt tokens are reported with an estimate.
+        """
+        current_report().add("answer", estimate_messages_tokens(messages))
+        sent = ""
+        partial = None
+        async for partial in self.instructor_client.chat.completions.create_partial(
+            model=settings.GROQ_GENERAL_MODEL,
+            messages=messages,
+            response_model=response_model,
+        ):
+            text = partial.message or ""
+            if len(text) > len(sent) and text.startswith(sent):
+                yield {"type": "token", "text": text[len(sent) :]}
+                sent = text
+
+        yield {
+            "type": "done",
+            "message": partial.message if partial else "",
+            "clip_path": getattr(partial, "clip_path", None),
+        }
+
+    async def chat_stream(
+        self,
+        message: str,
+        video_path: Optional[str] = None,
+        image_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Process a user message within the conversation of `session_id`, yielding events as soon as they are produced.
+
+        Events are dicts with a `type` key: `routing`, `tool_call`, `tool_result`, `clip` and `token` while the
+        response is built, then a final `done` event with the full message, clip path and time to first token.
+        Memory is written once the response is complete, and the `done` event also reports the prompt tokens
+        and the session id, to send with the next messages of the conversation.
+        """
+        async with self.use_session(session_id) as session:
+            report = start_report()
+            async for event in self._chat_stream(message, video_path, image_id):
+                if event["type"] == "done":
+                    event["tokens"] = self._finish_turn(message, event["message"], report)
+                    event["session_id"] = session.session_id
+                yield event
+
+    async def _chat_stream(
+        self,
+        message: str,
+        video_path: Optional[str] = None,
+        image_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start = time.perf_counter()
+
+        cached = self._get_cached_answer(message, video_path, image_id)
+        if cached is not None:
+            clip_path = getattr(cached, "clip_path", None)
+            if clip_path:
+                yield {"type": "clip", "clip_path": clip_path}
+            yield {"type": "token", "text": cached.message}
+            yield {
+                "type": "done",
+                "message": cached.message,
+                "clip_path": clip_path,
+                "time_to_first_token_ms": (time.perf_counter() - start) * 1000,
+                "cached": True,
+            }
+            return
+
+        tool_required = bool(video_path) and await self._should_use_tool(message, self._route_locally(message))
+        logger.info(f"Tool required: {tool_required}")
+        yield {"type": "routing", "tool_use": tool_required}
+
+        clip_path = None
+        tool_names = []
+        messages, response_model = None, GeneralResponseModel
+        if tool_required:
+            tool_use_system_prompt = self.tool_use_system_prompt.format(
+                is_image_provided=bool(image_id),
+            )
+            chat_history = self._build_chat_history(tool_use_system_prompt, message, model=settings.GROQ_TOOL_USE_MODEL)
+            response = (await self._select_tools(chat_history)).choices[0].message
+            tool_calls = response.tool_calls or []
+            logger.info(f"Tool calls: {tool_calls}")
+
+            for tool_call in tool_calls:
+                yield {
+                    "type": "tool_call",
+                    "name": tool_call.function.name,
+                    "arguments": json.loads(tool_call.function.arguments),
+                }
+
+            function_responses = [None] * len(tool_calls)
+            async for idx, function_response in self._iter_tool_results(tool_calls, video_path, image_id):
+                function_responses[idx] = function_response
+                yield {"type": "tool_result", "name": tool_calls[idx].function.name}
+
+                try:
+                    tool_clip_path = json.loads(function_response).get("clip_path")
+                except (json.JSONDecodeError, AttributeError):
+                    tool_clip_path = None
+                if tool_clip_path:
+                    clip_path = tool_clip_path
+                    yield {"type": "clip", "clip_path": clip_path}
+
+            if tool_calls:
+                tool_names = [tool_call.function.name for tool_call in tool_calls]
+                messages, response_model = self._build_followup(message, tool_names, function_responses)
+            else:
+                logger.info("No tool calls available, returning general response ...")
+                answer = response.content or ""
+        else:
+            messages = self._build_chat_history(self.general_system_prompt, message)
+
+        if messages is not None:
+            events = self._stream_answer(messages, response_model)
+        else:
+            events = _aiter([{"type": "token", "text": answer}, {"type": "done", "message": answer, "clip_path": None}])
+
+        time_to_first_token = None
+        async for event in events:
+            if event["type"] == "token" and time_to_first_token is None:
+                time_to_first_token = time.perf_counter() - start
+                logger.info(f"Time to first token: {time_to_first_token * 1000:.0f}ms")
+            if event["type"] == "done":
+                event["clip_path"] = event["clip_path"] or clip_path
+                event["time_to_first_token_ms"] = (
+                    time_to_first_token * 1000 if time_to_first_token is not None else None
+                )
+                if tool_names and (response_model is GeneralResponseModel or event["clip_path"]):
+                    fields = {"message": event["message"], "clip_path": event["clip_path"]}
+                    self._cache_answer(
+                        message,
+                        video_path,
+                        image_id,
+                        tool_names,
+                        response_model(**{name: fields[name] for name in response_model.model_fields}),
+                    )
+            yield event
+
+
+def _compose_history(
+    system_prompt: str, summary_content: Optional[str], records: List[MemoryRecord], user_content: Any
+) -> List[Dict[str, Any]]:
+    history = [{"role": "system", "content": system_prompt}]
+    if summary_content:
+        history.append({"role": "system", "content": summary_content})
+    history += [{"role": record.role, "content": record.content} for record in records]
+    history.append({"role": "user", "content": user_content})
+    return history
+
+
+async def _timed(coroutine: Awaitable[Any]) -> tuple[Any, float]:
+    return await coroutine, time.perf_counter()
+
+
+def _total_tokens(result: Any) -> int:
+    """Total tokens of a completion, or of the raw completion behind an instructor response."""
+    completion = getattr(result, "_raw_response", result)
+    usage = getattr(completion, "usage", None)
+    return getattr(usage, "total_tokens", 0) or 0
 
-        self._add_memory_pair(message, response.message)
 
-        return AssistantMessageResponse(**response.dict())
+async def _aiter(items: List[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    for item in items:
+        yield item
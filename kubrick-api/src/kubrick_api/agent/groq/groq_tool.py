@@ -8,6 +8,7 @@ class GroqParameter(BaseModel):
     type: str
     description: str
     default: Optional[Any] = None
+    items: Optional[Dict[str, Any]] = None
 
 
 class GroqParameters(BaseModel):
@@ -42,6 +43,7 @@ class GroqTool(BaseModel):
                 type=field_info["type"],
                 description=field_info["title"],
                 default=field_info.get("default"),
+                items=field_info.get("items"),
             )
 
         parameters = GroqParameters(
@@ -57,4 +59,4 @@ class GroqTool(BaseModel):
 
 def transform_tool_definition(tool) -> dict:
     """Transform an MCP tool into a Groq tool definition dictionary."""
-    return GroqTool.from_mcp_tool(tool).model_dump()
+    return GroqTool.from_mcp_tool(tool).model_dump(exclude_none=True)
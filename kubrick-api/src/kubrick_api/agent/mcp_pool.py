@@ -0,0 +1,159 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastmcp import Client
+from fastmcp.client.logging import MessageHandler
+from fastmcp.exceptions import ClientError, FastMCPError
+from loguru import logger
+from mcp.shared.exceptions import McpError
+
+logger = logger.bind(name="MCPSessionPool")
+
+# Errors returned by the server for a single request, the session that raised them is still healthy.
+_APPLICATION_ERRORS = (ClientError, FastMCPError, McpError)
+
+
+class _PooledSession:
+    def __init__(self, idx: int):
+        self.idx = idx
+        self.client: Client | None = None
+        self.broken = asyncio.Event()
+        self.in_use = False
+        self.queued = False
+        self.task: asyncio.Task | None = None
+
+
+class MCPSessionPool:
+    """A fixed-size pool of persistent, health-checked MCP client sessions.
+
+    Every session is opened and closed by its own long-lived task, which keeps the connection alive with
+    periodic pings and reconnects with exponential backoff when the session breaks. Callers check out a
+    connected session with `session()`, so the pool size is also the limit on concurrent MCP requests.
+    """
+
+    def __init__(
+        self,
+        mcp_server: str,
+        size: int = 4,
+        keepalive_interval: float = 30.0,
+        acquire_timeout: float = 30.0,
+        max_backoff: float = 30.0,
+        message_handler: Optional[MessageHandler] = None,
+    ):
+        self.mcp_server = mcp_server
+        self.message_handler = message_handler
+        self.size = size
+        self.keepalive_interval = keepalive_interval
+        self.acquire_timeout = acquire_timeout
+        self.max_backoff = max_backoff
+
+        self._sessions: List[_PooledSession] = []
+        self._idle: asyncio.Queue | None = None
+        self._closed = False
+        self._counters = {"acquired": 0, "waits": 0, "reconnects": 0, "failed_pings": 0, "broken": 0}
+
+    @property
+    def metrics(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "connected": sum(session.client is not None for session in self._sessions),
+            "in_use": sum(session.in_use for session in self._sessions),
+            "idle": self._idle.qsize() if self._idle else 0,
+            **self._counters,
+        }
+
+    def _start(self) -> None:
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        self._sessions = [_PooledSession(idx) for idx in range(self.size)]
+        for session in self._sessions:
+            session.task = asyncio.create_task(self._run_session(session))
+
+    def _release(self, session: _PooledSession) -> None:
+        if not session.queued and not session.in_use and session.client is not None and not session.broken.is_set():
+            session.queued = True
+            self._idle.put_nowait(session)
+
+    async def _run_session(self, session: _PooledSession) -> None:
+        """Keep one session connected until the pool is closed."""
+        backoff = 1.0
+        while not self._closed:
+            try:
+                client = Client(self.mcp_server, message_handler=self.message_handler)
+                async with client:
+                    session.client = client
+                    session.broken.clear()
+                    self._release(session)
+                    backoff = 1.0
+                    await self._keepalive(session)
+            except Exception as e:
+                logger.warning(f"MCP session {session.idx} failed: {e}")
+            finally:
+                session.client = None
+
+            if self._closed:
+                return
+            self._counters["reconnects"] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    async def _keepalive(self, session: _PooledSession) -> None:
+        """Ping the session while it is idle, returning when it breaks or the pool is closed."""
+        while not self._closed and not session.broken.is_set():
+            try:
+                await asyncio.wait_for(session.broken.wait(), timeout=self.keepalive_interval)
+            except asyncio.TimeoutError:
+                if session.in_use:
+                    continue
+                try:
+                    await asyncio.wait_for(session.client.ping(), timeout=self.keepalive_interval)
+                except Exception as e:
+                    logger.warning(f"MCP session {session.idx} failed its health check: {e}")
+                    self._counters["failed_pings"] += 1
+                    session.broken.set()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Client]:
+        """Check out a connected MCP session for the duration of the context.
+
+        Raises:
+            asyncio.TimeoutError: If no session becomes available within `acquire_timeout` seconds.
+        """
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed")
+        self._start()
+
+        if self._idle.empty():
+            self._counters["waits"] += 1
+        async with asyncio.timeout(self.acquire_timeout):
+            while True:
+                session = await self._idle.get()
+                session.queued = False
+                if session.client is not None and not session.broken.is_set():
+                    break
+
+        session.in_use = True
+        self._counters["acquired"] += 1
+        try:
+            yield session.client
+        except _APPLICATION_ERRORS:
+            raise
+        except BaseException:
+            # Includes cancellation, which can leave a request half-sent: the session is not reused.
+            self._counters["broken"] += 1
+            session.broken.set()
+            raise
+        finally:
+            session.in_use = False
+            self._release(session)
+
+    async def close(self) -> None:
+        """Close every session of the pool."""
+        self._closed = True
+        for session in self._sessions:
+            session.broken.set()
+        await asyncio.gather(*[session.task for session in self._sessions if session.task], return_exceptions=True)
+        self._sessions = []
+        self._idle = None
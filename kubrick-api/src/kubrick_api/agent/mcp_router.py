@@ -0,0 +1,340 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from fastmcp import Client
+from fastmcp.client.logging import MessageHandler
+from loguru import logger
+
+from kubrick_api.agent.mcp_pool import _APPLICATION_ERRORS, MCPSessionPool
+
+logger = logger.bind(name="MCPRouter")
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """A consistent hash ring with virtual nodes.
+
+    Every node is placed `vnodes` times on the ring, so keys spread evenly and only the keys of a node that
+    leaves, about 1/N of them, move to other nodes.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = 64):
+        self.nodes = list(dict.fromkeys(nodes))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def preference_list(self, key: str) -> List[str]:
+        """Get every node, in the order in which they own the key: owner first, then its successors."""
+        start = bisect.bisect(self._hashes, _hash(key))
+        nodes = []
+        for i in range(len(self._owners)):
+            node = self._owners[(start + i) % len(self._owners)]
+            if node not in nodes:
+                nodes.append(node)
+                if len(nodes) == len(self.nodes):
+                    break
+        return nodes
+
+
+def _load_placements(log_path: Optional[str], nodes: List[str]) -> Dict[str, Set[str]]:
+    """Load the placements appended to the log by `_append_placement`, for the replicas still configured."""
+    placements: Dict[str, Set[str]] = {}
+    if log_path is None:
+        return placements
+    try:
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short when the API stopped mid-write.
+                    continue
+                if record["replica"] in nodes:
+                    placements.setdefault(record["video_path"], set()).add(record["replica"])
+    except FileNotFoundError:
+        pass
+    return placements
+
+
+def _append_placement(log_path: str, video_path: str, url: str) -> None:
+    try:
+        with open(log_path, "a") as f:
+            f.write(json.dumps({"video_path": video_path, "replica": url}) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to record the placement of {video_path} on {url}: {e}")
+
+
+class _Replica:
+    def __init__(self, url: str, pool: MCPSessionPool):
+        self.url = url
+        self.pool = pool
+        self.down_until = 0.0
+        self.consecutive_failures = 0
+        self.counters = {"calls": 0, "failures": 0, "ingested": 0}
+
+    @property
+    def is_up(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+
+class MCPRouter:
+    """Routes MCP requests across MCP server replicas, sending each video to the replicas holding its index.
+
+    Every replica keeps the indexes, model weights and clip caches of the videos it processed in its own
+    process, so the requests about a video go to the replica that owns it on a consistent hash ring of the
+    replicas, where its index is warm. Videos are ingested on the first `replication` replicas of their
+    preference list, so a request fails over to a warm replica when the owner is unreachable. Requests that
+    are not about a video (prompts, tool listing) go to the least busy replica.
+
+    A request that fails on a replica with a connection error fails over to the next replica. The replica is
+    only marked down, for `failure_cooldown` seconds, once its pool has no connected session left, which
+    means its health pings or reconnects failed, or after `failure_threshold` failures in a row. A replica
+    that is merely busy, where no session could be checked out in time although some are connected, is not
+    failed over: the request fails with the pool's timeout, so back-pressure does not move videos around.
+    Whenever a replica leaves or rejoins, the known videos are re-ingested in the background on the replicas that now
+    own them but do not hold them yet. Ingestion is idempotent on the MCP server, so this is cheap for the
+    replicas that already have the index.
+
+    The replicas holding each video are appended to the `placements_path` log, so they survive a restart of
+    the API, like the indexes survive on the replicas.
+    """
+
+    def __init__(
+        self,
+        mcp_servers: List[str],
+        vnodes: int = 64,
+        replication: int = 1,
+        failure_cooldown: float = 30.0,
+        failure_threshold: int = 3,
+        placements_path: Optional[str] = None,
+        message_handler: Optional[MessageHandler] = None,
+        **pool_kwargs,
+    ):
+        if not mcp_servers:
+            raise ValueError("At least one MCP server is required")
+        self.ring = HashRing(mcp_servers, vnodes)
+        self.replication = min(replication, len(self.ring.nodes))
+        self.failure_cooldown = failure_cooldown
+        self.failure_threshold = failure_threshold
+        self.placements_path = placements_path
+        self._replicas: Dict[str, _Replica] = {
+            url: _Replica(url, MCPSessionPool(url, message_handler=message_handler, **pool_kwargs))
+            for url in self.ring.nodes
+        }
+
+        # Replicas known to hold the index of each video ingested through this router.
+        self._placements: Dict[str, Set[str]] = _load_placements(placements_path, self.ring.nodes)
+        self._rebalance_task: Optional[asyncio.Task] = None
+        self._counters = {"failovers": 0, "membership_changes": 0, "rebalanced_videos": 0, "busy": 0}
+
+    @property
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "videos": len(self._placements),
+            **self._counters,
+            "replicas": {
+                replica.url: {"up": replica.is_up, **replica.counters, "pool": replica.pool.metrics}
+                for replica in self._replicas.values()
+            },
+        }
+
+    def replicas_for(self, video_path: str) -> List[str]:
+        """Get the replicas to try for a video: the reachable ones holding its index first, in ring order."""
+        preference = self.ring.preference_list(video_path)
+        placements = self._placements.get(video_path, set())
+
+        def rank(url: str) -> tuple:
+            return (not self._replicas[url].is_up, url not in placements, preference.index(url))
+
+        return sorted(preference, key=rank)
+
+    def _least_busy(self) -> List[str]:
+        return sorted(
+            self._replicas,
+            key=lambda url: (not self._replicas[url].is_up, self._replicas[url].pool.metrics["in_use"]),
+        )
+
+    @asynccontextmanager
+    async def session(self, video_path: Optional[str] = None) -> AsyncIterator[Client]:
+        """Check out a session on the best replica for the video, or on the least busy one.
+
+        Fails over to the next replicas while no session can be checked out. Errors raised once the session
+        is in use are not retried, as the request may have been sent, and only break that session.
+
+        Raises:
+            asyncio.TimeoutError: If the replica is busy, see `_is_replica_failure`.
+            Exception: The error of the last replica, if no session could be checked out on any of them.
+        """
+        urls = self.replicas_for(video_path) if video_path else self._least_busy()
+
+        last_error = None
+        for attempt, url in enumerate(urls):
+            replica = self._replicas[url]
+            if attempt:
+                self._counters["failovers"] += 1
+                logger.warning(f"Failing over a session for {video_path} to {url}")
+            async with AsyncExitStack() as stack:
+                try:
+                    client = await stack.enter_async_context(replica.pool.session())
+                except Exception as e:
+                    if not self._is_replica_failure(replica, e):
+                        raise
+                    self._record_failure(replica, e)
+                    last_error = e
+                    continue
+                self._mark_up(replica)
+                yield client
+            return
+
+        raise last_error
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on the replica owning the video of its arguments, failing over to the next ones.
+
+        Raises:
+            asyncio.TimeoutError: If the replica is busy, see `_is_replica_failure`.
+            Exception: The error of the last replica, if none could be reached, or the tool error of the
+                first replica that returned one.
+        """
+        video_path = arguments.get("video_path")
+        urls = self.replicas_for(video_path) if video_path else self._least_busy()
+
+        last_error = None
+        for attempt, url in enumerate(urls):
+            replica = self._replicas[url]
+            if attempt:
+                self._counters["failovers"] += 1
+                logger.warning(f"Failing over {name} for {video_path} to {url}")
+            try:
+                async with replica.pool.session() as client:
+                    result = await client.call_tool(name, arguments)
+            except _APPLICATION_ERRORS:
+                raise
+            except Exception as e:
+                if not self._is_replica_failure(replica, e):
+                    raise
+                self._record_failure(replica, e)
+                last_error = e
+                continue
+
+            replica.counters["calls"] += 1
+            self._mark_up(replica)
+            return result
+
+        raise last_error
+
+    async def process_video(self, video_path: str) -> None:
+        """Ingest a video on the first `replication` reachable replicas of its preference list.
+
+        Raises:
+            Exception: The error of the last replica, if the video could not be ingested on enough of them.
+        """
+        self._placements.setdefault(video_path, set())
+        ingested, last_error = set(), None
+        for _ in range(len(self.ring.nodes)):
+            urls = [url for url in self._owners(video_path) if url not in ingested]
+            if not urls:
+                return
+            for url in urls:
+                try:
+                    await self._ingest(video_path, url)
+                    ingested.add(url)
+                except _APPLICATION_ERRORS:
+                    if not self._placements[video_path]:
+                        del self._placements[video_path]
+                    raise
+                except Exception as e:
+                    last_error = e
+        if last_error is not None and len(ingested) < self.replication:
+            raise last_error
+
+    def _owners(self, video_path: str) -> List[str]:
+        up = [url for url in self.ring.preference_list(video_path) if self._replicas[url].is_up]
+        return up[: self.replication]
+
+    async def _ingest(self, video_path: str, url: str) -> None:
+        replica = self._replicas[url]
+        try:
+            async with replica.pool.session() as client:
+                await client.call_tool("process_video", {"video_path": video_path})
+        except _APPLICATION_ERRORS:
+            raise
+        except Exception as e:
+            if self._is_replica_failure(replica, e):
+                self._record_failure(replica, e)
+            raise
+        replica.counters["ingested"] += 1
+        self._mark_up(replica)
+        placements = self._placements.setdefault(video_path, set())
+        if url not in placements and self.placements_path is not None:
+            await asyncio.to_thread(_append_placement, self.placements_path, video_path, url)
+        placements.add(url)
+        logger.info(f"Ingested {video_path} on {url}")
+
+    def _is_replica_failure(self, replica: _Replica, error: Exception) -> bool:
+        """Whether an error means the replica is unreachable, rather than busy.
+
+        The pool times out a checkout both when all of its sessions are in use and when none is connected,
+        only the latter is a failure of the replica.
+        """
+        if isinstance(error, asyncio.TimeoutError) and replica.pool.metrics["connected"]:
+            self._counters["busy"] += 1
+            logger.warning(f"MCP replica {replica.url} is busy: no session was released in time")
+            return False
+        return True
+
+    def _record_failure(self, replica: _Replica, error: Exception) -> None:
+        replica.counters["failures"] += 1
+        replica.consecutive_failures += 1
+        if not replica.pool.metrics["connected"] or replica.consecutive_failures >= self.failure_threshold:
+            self._mark_down(replica, error)
+        else:
+            logger.warning(
+                f"MCP replica {replica.url} failed ({replica.consecutive_failures}/{self.failure_threshold}): {error}"
+            )
+
+    def _mark_down(self, replica: _Replica, error: Exception) -> None:
+        was_up = replica.is_up
+        replica.down_until = time.monotonic() + self.failure_cooldown
+        if was_up:
+            logger.warning(f"MCP replica {replica.url} is down for {self.failure_cooldown:.0f}s: {error}")
+            self._membership_changed()
+
+    def _mark_up(self, replica: _Replica) -> None:
+        replica.consecutive_failures = 0
+        if replica.down_until:
+            replica.down_until = 0.0
+            logger.info(f"MCP replica {replica.url} is back up")
+            self._membership_changed()
+
+    def _membership_changed(self) -> None:
+        self._counters["membership_changes"] += 1
+        if self._placements and (self._rebalance_task is None or self._rebalance_task.done()):
+            self._rebalance_task = asyncio.create_task(self._rebalance())
+
+    async def _rebalance(self) -> None:
+        """Ingest the known videos on the replicas that own them now but do not hold their index yet."""
+        for video_path, placements in list(self._placements.items()):
+            missing = [url for url in self._owners(video_path) if url not in placements]
+            for url in missing:
+                try:
+                    await self._ingest(video_path, url)
+                except Exception as e:
+                    logger.warning(f"Failed to rebalance {video_path} onto {url}: {e}")
+            if missing:
+                self._counters["rebalanced_videos"] += 1
+
+    async def close(self) -> None:
+        """Stop rebalancing and close the session pools of every replica."""
+        if self._rebalance_task is not None:
+            self._rebalance_task.cancel()
+        await asyncio.gather(*[replica.pool.close() for replica in self._replicas.values()])
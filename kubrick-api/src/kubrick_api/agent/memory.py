@@ -1,9 +1,15 @@
+import time
+from collections import deque
 from datetime import datetime
+from itertools import islice
 
-import pixeltable as pxt
 from loguru import logger
 from pydantic import BaseModel
 
+from kubrick_api.config import get_settings
+
+settings = get_settings()
+
 
 class MemoryRecord(BaseModel):
     message_id: str
@@ -12,19 +18,60 @@ class MemoryRecord(BaseModel):
     timestamp: datetime
 
 
+class ConversationSummary(BaseModel):
+    text: str
+    summarized_until: datetime
+
+
 class Memory:
-    def __init__(self, name: str):
+    """The conversation memory of one session, backed by the agent's pixeltable memory table.
+
+    The latest records are kept in an in-process ring buffer, so reading the last messages costs O(n) in
+    the window instead of O(history). New records are written behind in batches, once enough are pending
+    or the last write is old enough, and on `flush`. Older history is read from the table with a latest-N
+    query on the (B-tree indexed) session id and timestamp columns.
+
+    Turns that no longer fit in the prompt are folded into a rolling summary, stored per session in a
+    summaries table next to the memory table.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session_id: str = "default",
+        reset: bool = False,
+        buffer_size: int = settings.MEMORY_BUFFER_SIZE,
+        flush_batch_size: int = settings.MEMORY_FLUSH_BATCH_SIZE,
+        flush_interval: float = settings.MEMORY_FLUSH_INTERVAL_SECONDS,
+    ):
         self.directory = name
+        self.session_id = session_id
+        self.flush_batch_size = flush_batch_size
+        self.flush_interval = flush_interval
+
+        import pixeltable as pxt
 
-        pxt.create_dir(self.directory, if_exists="replace_force")
+        pxt.create_dir(self.directory, if_exists="replace_force" if reset else "ignore")
 
         self._setup_table()
         self._memory_table = pxt.get_table(f"{self.directory}.memory")
+        self._summary_table = pxt.get_table(f"{self.directory}.summaries")
+
+        self._recent: deque[MemoryRecord] = deque(maxlen=buffer_size)
+        self._pending: list[dict] = []
+        self._last_flush = time.monotonic()
+        # Whether the ring buffer holds the whole history of the session.
+        self._complete = reset
+        self._summary: ConversationSummary | None = None
+        self._summary_loaded = reset
 
     def _setup_table(self):
+        import pixeltable as pxt
+
         self._memory_table = pxt.create_table(
             f"{self.directory}.memory",
             {
+                "session_id": pxt.String,
                 "message_id": pxt.String,
                 "role": pxt.String,
                 "content": pxt.String,
@@ -32,19 +79,139 @@ class Memory:
             },
             if_exists="ignore",
         )
+        if "session_id" not in self._memory_table.columns():
+            # A memory table created before sessions existed, its history is the default session's.
+            logger.info(f"Migrating {self.directory}.memory to per-session history")
+            self._memory_table.add_column(session_id=pxt.String)
+            self._memory_table.update({"session_id": "default"})
+        pxt.create_table(
+            f"{self.directory}.summaries",
+            {
+                "session_id": pxt.String,
+                "summary": pxt.String,
+                "summarized_until": pxt.Timestamp,
+            },
+            if_exists="ignore",
+        )
+
+    def _clear_buffers(self):
+        self._recent.clear()
+        self._pending = []
+        self._complete = True
+        self._summary = None
+        self._summary_loaded = True
 
     def reset_memory(self):
+        import pixeltable as pxt
+
         logger.info(f"Resetting memory: {self.directory}")
         pxt.drop_dir(self.directory, if_not_exists="ignore", force=True)
+        self._clear_buffers()
+
+    def clear(self):
+        logger.info(f"Clearing memory of session: {self.session_id}")
+        self._memory_table.delete(where=self._memory_table.session_id == self.session_id)
+        self._summary_table.delete(where=self._summary_table.session_id == self.session_id)
+        self._clear_buffers()
 
     def insert(self, memory_record: MemoryRecord):
-        self._memory_table.insert([memory_record.dict()])
+        self.insert_many([memory_record])
+
+    def insert_many(self, memory_records: list[MemoryRecord]):
+        """Add records to the ring buffer and queue them for a batched write to the memory table."""
+        for memory_record in memory_records:
+            if len(self._recent) == self._recent.maxlen:
+                self._complete = False
+            self._recent.append(memory_record)
+            self._pending.append({"session_id": self.session_id, **memory_record.model_dump()})
+
+        if len(self._pending) >= self.flush_batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write the pending records to the memory table in a single insert."""
+        if self._pending:
+            self._memory_table.insert(self._pending)
+            self._pending = []
+        self._last_flush = time.monotonic()
+
+    def _session_records(self, where=None):
+        predicate = self._memory_table.session_id == self.session_id
+        if where is not None:
+            predicate = predicate & where
+        return self._memory_table.where(predicate).select(
+            self._memory_table.message_id,
+            self._memory_table.role,
+            self._memory_table.content,
+            self._memory_table.timestamp,
+        )
 
     def get_all(self) -> list[MemoryRecord]:
-        return [MemoryRecord(**record) for record in self._memory_table.collect()]
+        self.flush()
+        return [
+            MemoryRecord(**record)
+            for record in self._session_records().order_by(self._memory_table.timestamp).collect()
+        ]
 
     def get_latest(self, n: int) -> list[MemoryRecord]:
-        return self.get_all()[-n:]
+        if n <= 0:
+            return []
+        if n <= len(self._recent) or self._complete:
+            latest = list(islice(reversed(self._recent), n))
+            return latest[::-1]
+
+        self.flush()
+        rows = self._session_records().order_by(self._memory_table.timestamp, asc=False).limit(n).collect()
+        latest = [MemoryRecord(**record) for record in rows][::-1]
+        self._recent.clear()
+        self._recent.extend(latest)
+        self._complete = len(latest) < n and len(latest) <= self._recent.maxlen
+        return latest
+
+    def get_range(self, after: datetime | None, before: datetime, limit: int) -> list[MemoryRecord]:
+        """Get the oldest records newer than `after` and older than `before`, at most `limit` of them."""
+        if self._complete or (after is not None and self._recent and self._recent[0].timestamp <= after):
+            records = [
+                record
+                for record in self._recent
+                if (after is None or record.timestamp > after) and record.timestamp < before
+            ]
+            return records[:limit]
+
+        self.flush()
+        predicate = self._memory_table.timestamp < before
+        if after is not None:
+            predicate = predicate & (self._memory_table.timestamp > after)
+        rows = self._session_records(predicate).order_by(self._memory_table.timestamp).limit(limit).collect()
+        return [MemoryRecord(**record) for record in rows]
+
+    def get_summary(self) -> ConversationSummary | None:
+        """Get the rolling summary of the turns that fell out of the prompt, if any."""
+        if not self._summary_loaded:
+            rows = (
+                self._summary_table.where(self._summary_table.session_id == self.session_id)
+                .select(self._summary_table.summary, self._summary_table.summarized_until)
+                .collect()
+            )
+            if len(rows) > 0:
+                row = rows[0]
+                self._summary = ConversationSummary(text=row["summary"], summarized_until=row["summarized_until"])
+            self._summary_loaded = True
+        return self._summary
+
+    def set_summary(self, summary: ConversationSummary):
+        """Replace the rolling summary of the session."""
+        self._summary_table.delete(where=self._summary_table.session_id == self.session_id)
+        self._summary_table.insert(
+            [{"session_id": self.session_id, "summary": summary.text, "summarized_until": summary.summarized_until}]
+        )
+        self._summary = summary
+        self._summary_loaded = True
 
     def get_by_message_id(self, message_id: str) -> MemoryRecord:
-        return self._memory_table.where(self._memory_table.message_id == message_id).collect()[0]
+        for record in self._recent:
+            if record.message_id == message_id:
+                return record
+
+        self.flush()
+        return MemoryRecord(**self._session_records(self._memory_table.message_id == message_id).collect()[0])
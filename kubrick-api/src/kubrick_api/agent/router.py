@@ -0,0 +1,173 @@
+import json
+import math
+import re
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+from pydantic import BaseModel
+
+logger = logger.bind(name="LocalRouter")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Labeled examples the local router starts from, True when the message needs a video tool.
+DEFAULT_ROUTING_EXAMPLES: List[Tuple[str, bool]] = [
+    ("Show me the clip where the goal is scored", True),
+    ("Can you find the moment when the player falls?", True),
+    ("Give me the part of the video where they celebrate", True),
+    ("Extract a clip of the penalty kick", True),
+    ("Cut the scene where the car crashes", True),
+    ("Find this image in the video", True),
+    ("Show me when this happens in the video", True),
+    ("Get me a highlight reel of all the goals", True),
+    ("Show me what happens after minute 34", True),
+    ("What happens in the second half of the video?", True),
+    ("What is the person in the video wearing?", True),
+    ("What are they talking about in the video?", True),
+    ("Who appears at the beginning of the video?", True),
+    ("How many people are in the video?", True),
+    ("What color is the car in the video?", True),
+    ("Summarize the video", True),
+    ("What does the speaker say about the budget?", True),
+    ("Is there a dog in the video?", True),
+    ("Hi!", False),
+    ("Hello, how are you?", False),
+    ("Who are you?", False),
+    ("What is your name?", False),
+    ("What's your favorite movie?", False),
+    ("Tell me about Stanley Kubrick", False),
+    ("Who directed 2001: A Space Odyssey?", False),
+    ("Can you recommend me a good film?", False),
+    ("What can you do?", False),
+    ("Thanks, that was great", False),
+    ("Tell me a joke", False),
+    ("What do you think about HAL 9000?", False),
+    ("How does video compression work?", False),
+    ("What is a frame rate?", False),
+]
+
+
+class RoutingDecision(BaseModel):
+    tool_use: bool
+    confidence: float
+    source: str
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class LocalRouter:
+    """A nearest-neighbour router over TF-IDF vectors of labeled example messages.
+
+    It is meant to answer most routing decisions on CPU in well under a millisecond, leaving
+    the LLM router for the messages it is not confident about.
+    """
+
+    def __init__(
+        self,
+        examples: List[Tuple[str, bool]],
+        n_neighbors: int = 5,
+        min_similarity: float = 0.15,
+        smoothing: float = 0.25,
+    ):
+        self.n_neighbors = n_neighbors
+        self.min_similarity = min_similarity
+        self.smoothing = smoothing
+        self.labels = [label for _, label in examples]
+
+        documents = [Counter(_tokenize(text)) for text, _ in examples]
+        document_frequency = Counter(token for document in documents for token in document)
+        self.idf = {
+            token: math.log((1 + len(documents)) / (1 + frequency)) + 1
+            for token, frequency in document_frequency.items()
+        }
+        self.vectors = [self._vectorize(document) for document in documents]
+
+    @classmethod
+    def from_settings(cls, examples_path: Optional[str] = None, **kwargs) -> "LocalRouter":
+        """Build a router from the default examples, extended with a JSONL file of `message`/`tool_use` rows.
+
+        Args:
+            examples_path (Optional[str]): Path to a JSONL file of extra labeled examples.
+
+        Returns:
+            LocalRouter: The router.
+        """
+        examples = list(DEFAULT_ROUTING_EXAMPLES)
+        if examples_path and Path(examples_path).exists():
+            with open(examples_path) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            examples += [(row["message"], bool(row["tool_use"])) for row in rows]
+            logger.info(f"Loaded {len(rows)} routing examples from {examples_path}")
+        return cls(examples, **kwargs)
+
+    def _vectorize(self, counts: Counter) -> Dict[str, float]:
+        vector = {token: count * self.idf[token] for token, count in counts.items() if token in self.idf}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {token: weight / norm for token, weight in vector.items()} if norm else {}
+
+    def route(self, message: str) -> RoutingDecision:
+        """Route a message by a similarity-weighted vote of its nearest labeled examples.
+
+        Args:
+            message (str): The user message.
+
+        Returns:
+            RoutingDecision: The decision, with the smoothed share of the vote won as confidence. Few or weak
+                neighbours give a low confidence, and no neighbour above `min_similarity` gives 0.
+        """
+        query = self._vectorize(Counter(_tokenize(message)))
+        neighbors = sorted(
+            (
+                (sum(weight * vector.get(token, 0.0) for token, weight in query.items()), label)
+                for vector, label in zip(self.vectors, self.labels)
+            ),
+            reverse=True,
+        )[: self.n_neighbors]
+
+        votes = Counter()
+        for similarity, label in neighbors:
+            if similarity >= self.min_similarity:
+                votes[label] += similarity
+        if not votes:
+            return RoutingDecision(tool_use=False, confidence=0.0, source="local")
+
+        tool_use = votes[True] >= votes[False]
+        confidence = votes[tool_use] / (sum(votes.values()) + self.smoothing)
+        return RoutingDecision(tool_use=tool_use, confidence=confidence, source="local")
+
+
+def log_routing_decision(
+    log_path: str,
+    message: str,
+    decision: RoutingDecision,
+    local_decision: Optional[RoutingDecision] = None,
+) -> None:
+    """Append a routing decision to a JSONL log used for offline accuracy evaluation.
+
+    Args:
+        log_path (str): Path of the JSONL log.
+        message (str): The routed user message.
+        decision (RoutingDecision): The decision that was used.
+        local_decision (Optional[RoutingDecision]): The local router decision, when the LLM router was used instead.
+    """
+    if decision.source == "local":
+        local_decision = decision
+    record = {
+        "timestamp": datetime.now().isoformat(),
+        "message": message,
+        "tool_use": decision.tool_use,
+        "source": decision.source,
+        "local_tool_use": local_decision.tool_use if local_decision else None,
+        "local_confidence": local_decision.confidence if local_decision else None,
+    }
+    try:
+        with open(log_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write routing decision to {log_path}: {e}")
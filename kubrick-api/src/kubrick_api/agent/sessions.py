@@ -0,0 +1,104 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from loguru import logger
+
+from kubrick_api.agent.memory import Memory
+
+logger = logger.bind(name="SessionManager")
+
+DEFAULT_SESSION_ID = "default"
+
+
+def new_session_id() -> str:
+    """A session id for a client that did not send one."""
+    return uuid.uuid4().hex
+
+
+class AgentSession:
+    """The state of one conversation: its memory, its Opik thread and a lock serializing its messages."""
+
+    def __init__(self, session_id: str, memory: Memory):
+        self.session_id = session_id
+        self.memory = memory
+        self.thread_id = str(uuid.uuid4())
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        # Records older than this timestamp were left out of the last prompt and are due for the summary.
+        self.window_start: datetime | None = None
+        self.summary_task: asyncio.Task | None = None
+
+
+class SessionManager:
+    """Keeps the live conversations of an agent, with LRU eviction and an idle TTL.
+
+    Sessions are created lazily on their first message. Their messages are persisted in the agent's
+    memory table, so evicting a session only releases its in-process state: when it comes back, it is
+    recreated and reads its history from storage. The same goes for a restart, only `reset` deletes history.
+    """
+
+    def __init__(self, name: str, max_sessions: int, ttl: float, memory: Memory | None = None):
+        self.name = name
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: OrderedDict[str, AgentSession] = OrderedDict()
+        self._root_memory = memory if memory else Memory(name)
+        self._evictions = 0
+
+    @property
+    def metrics(self) -> dict:
+        return {"live": len(self._sessions), "max": self.max_sessions, "evictions": self._evictions}
+
+    def get(self, session_id: str) -> AgentSession:
+        """Get a live session, creating it if needed, and mark it as the most recently used.
+
+        Args:
+            session_id (str): The session id sent by the client.
+
+        Returns:
+            AgentSession: The session.
+        """
+        self._evict(time.monotonic())
+
+        session = self._sessions.get(session_id)
+        if session is None:
+            memory = (
+                self._root_memory
+                if session_id == DEFAULT_SESSION_ID
+                else Memory(self.name, session_id=session_id, reset=False)
+            )
+            session = self._sessions[session_id] = AgentSession(session_id, memory)
+        self._sessions.move_to_end(session_id)
+        session.last_used = time.monotonic()
+        return session
+
+    def _evict(self, now: float) -> None:
+        """Release idle sessions, then the least recently used ones above the cap, skipping busy sessions."""
+        n_over_cap = len(self._sessions) - self.max_sessions + 1
+        for session_id, session in list(self._sessions.items()):
+            if now - session.last_used <= self.ttl and n_over_cap <= 0:
+                break
+            if session.lock.locked():
+                continue
+            del self._sessions[session_id]
+            session.memory.flush()
+            self._evictions += 1
+            n_over_cap -= 1
+            logger.debug(f"Released session {session_id}")
+
+    def flush(self) -> None:
+        """Write the pending memory records of every live session."""
+        for session in self._sessions.values():
+            session.memory.flush()
+
+    def reset(self, session_id: str | None = None) -> None:
+        """Delete the history of one session, or of every session when no id is given."""
+        if session_id is None:
+            self._root_memory.reset_memory()
+            self._root_memory = Memory(self.name)
+            self._sessions.clear()
+        else:
+            self.get(session_id).memory.clear()
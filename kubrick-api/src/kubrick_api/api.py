@@ -1,3 +1,5 @@
+import asyncio
+import json
 import shutil
 from contextlib import asynccontextmanager
 from enum import Enum
@@ -5,17 +7,22 @@ from pathlib import Path
 from uuid import uuid4
 
 import click
-from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi import BackgroundTasks, FastAPI, File, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from fastmcp.client import Client
 from loguru import logger
+from starlette.background import BackgroundTask
 
+from kubrick_api.admission import AdmissionController, AdmissionRejected
 from kubrick_api.agent import GroqAgent
+from kubrick_api.agent.context import load_tokenizer
+from kubrick_api.agent.sessions import new_session_id
 from kubrick_api.config import get_settings
+from kubrick_api.opik_utils import configure
 from kubrick_api.models import (
     AssistantMessageResponse,
+    ImageUploadResponse,
     ProcessVideoRequest,
     ProcessVideoResponse,
     ResetMemoryResponse,
@@ -36,14 +43,34 @@ class TaskStatus(str, Enum):
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Opik is configured in the background, its workspace lookup is a network call.
+    app.state.opik_configure = asyncio.create_task(asyncio.to_thread(configure))
+    # The tokenizer used for the context budgets is downloaded on first use, off the event loop.
+    app.state.tokenizer = asyncio.create_task(asyncio.to_thread(load_tokenizer))
     app.state.agent = GroqAgent(
         name="kubrick",
-        mcp_server=settings.MCP_SERVER,
-        disable_tools=["process_video"],
+        mcp_servers=settings.MCP_SERVERS or [settings.MCP_SERVER],
+        disable_tools=["process_video", "quantize_video_index", "search_video_batch"],
     )
     app.state.bg_task_states = dict()
+    app.state.admission = AdmissionController(settings.ADMISSION_MAX_CONCURRENCY)
+    app.state.admission.add_lane(
+        "chat",
+        priority=0,
+        max_concurrency=settings.CHAT_MAX_CONCURRENCY,
+        max_queue=settings.CHAT_MAX_QUEUE,
+        queue_timeout=settings.CHAT_QUEUE_TIMEOUT_SECONDS,
+    )
+    app.state.admission.add_lane(
+        "ingestion",
+        priority=1,
+        max_concurrency=settings.INGESTION_MAX_CONCURRENCY,
+        max_queue=settings.INGESTION_MAX_QUEUE,
+        queue_timeout=settings.INGESTION_QUEUE_TIMEOUT_SECONDS,
+    )
+    app.state.agent.refresh_in_background()
     yield
-    app.state.agent.reset_memory()
+    await app.state.agent.close()
 
 
 app = FastAPI(
@@ -62,6 +89,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    """
+    Answer requests rejected by admission control right away, telling the client when to retry
+    """
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # Mount static files for media serving
 app.mount("/media", StaticFiles(directory="shared_media"), name="media")
 
@@ -80,38 +120,83 @@ async def get_task_status(task_id: str, fastapi_request: Request):
     return {"task_id": task_id, "status": status}
 
 
+@app.get("/metrics")
+async def metrics(fastapi_request: Request):
+    """
+    Agent metrics: MCP replicas and their session pool usage, cached setup version, live sessions, speculative execution savings,
+    prompt token usage and answer cache hits, and the admission control queue depths and rejections
+    """
+    agent = fastapi_request.app.state.agent
+    return {
+        "admission": fastapi_request.app.state.admission.metrics,
+        "mcp": agent.mcp_router.metrics,
+        "setup": agent.setup_metrics,
+        "sessions": agent.sessions.metrics,
+        "speculation": agent.speculation_metrics,
+        "context": agent.context_metrics,
+        "answer_cache": agent.answer_cache.metrics if agent.answer_cache else None,
+    }
+
+
 @app.post("/process-video")
 async def process_video(request: ProcessVideoRequest, bg_tasks: BackgroundTasks, fastapi_request: Request):
     """
     Process a video and return the results
     """
+    admission = fastapi_request.app.state.admission
+    admission.ensure_capacity("ingestion")
+
     task_id = str(uuid4())
     bg_task_states = fastapi_request.app.state.bg_task_states
 
     async def background_process_video(video_path: str, task_id: str):
         """
-        Background task to process the video
+        Background task to process the video, once the ingestion lane has a free slot
         """
-        bg_task_states[task_id] = TaskStatus.IN_PROGRESS
-
-        if not Path(video_path).exists():
-            bg_task_states[task_id] = TaskStatus.FAILED
-            raise HTTPException(status_code=404, detail="Video file not found")
-
         try:
-            mcp_client = Client(settings.MCP_SERVER)
-            async with mcp_client:
-                _ = await mcp_client.call_tool("process_video", {"video_path": request.video_path})
-        except Exception as e:
+            lease = await admission.acquire("ingestion")
+        except AdmissionRejected as e:
             logger.error(f"Error processing video {video_path}: {e}")
             bg_task_states[task_id] = TaskStatus.FAILED
-            raise HTTPException(status_code=500, detail=str(e))
-        bg_task_states[task_id] = TaskStatus.COMPLETED
+            return
+
+        async with lease:
+            bg_task_states[task_id] = TaskStatus.IN_PROGRESS
 
+            if not Path(video_path).exists():
+                bg_task_states[task_id] = TaskStatus.FAILED
+                raise HTTPException(status_code=404, detail="Video file not found")
+
+            try:
+                await fastapi_request.app.state.agent.mcp_router.process_video(request.video_path)
+                fastapi_request.app.state.agent.invalidate_video(video_path)
+            except Exception as e:
+                logger.error(f"Error processing video {video_path}: {e}")
+                bg_task_states[task_id] = TaskStatus.FAILED
+                raise HTTPException(status_code=500, detail=str(e))
+            bg_task_states[task_id] = TaskStatus.COMPLETED
+
+    bg_task_states[task_id] = TaskStatus.PENDING
     bg_tasks.add_task(background_process_video, request.video_path, task_id)
     return ProcessVideoResponse(message="Task enqueued for processing", task_id=task_id)
 
 
+async def resolve_image_id(agent: GroqAgent, request: UserMessageRequest) -> str | None:
+    """
+    Get the stored image of a chat request, storing an inline base64 image first
+
+    Raises:
+        ValueError: If the image id is unknown or the inline image cannot be read
+    """
+    if request.image_id:
+        if not agent.image_store.exists(request.image_id):
+            raise ValueError(f"Unknown image id: {request.image_id}")
+        return request.image_id
+    if request.image_base64:
+        return await asyncio.to_thread(agent.image_store.put_base64, request.image_base64)
+    return None
+
+
 @app.post("/chat", response_model=AssistantMessageResponse)
 async def chat(request: UserMessageRequest, fastapi_request: Request):
     """
@@ -124,22 +209,110 @@ async def chat(request: UserMessageRequest, fastapi_request: Request):
         ChatResponse containing the assistant's response
     """
     agent = fastapi_request.app.state.agent
-    await agent.setup()
+    async with await fastapi_request.app.state.admission.acquire("chat"):
+        await agent.ensure_setup()
 
+        try:
+            image_id = await resolve_image_id(agent, request)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        try:
+            response = await agent.chat(request.message, request.video_path, image_id, request.session_id)
+            return response
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: UserMessageRequest, fastapi_request: Request):
+    """
+    Chat with the AI assistant, streaming routing decisions, tool progress, clip paths
+    and answer tokens as Server-Sent Events
+
+    Args:
+        request: ChatRequest containing the message and optional image URL
+
+    Returns:
+        StreamingResponse of `text/event-stream` events, ending with a `done` event
+    """
+    agent = fastapi_request.app.state.agent
+    # The chat slot is held until the stream ends. It is released by whichever of the stream and the
+    # response background task finishes first, so a client that disconnects early does not leak it.
+    lease = await fastapi_request.app.state.admission.acquire("chat")
     try:
-        response = await agent.chat(request.message, request.video_path, request.image_base64)
-        return response
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        await agent.ensure_setup()
+        image_id = await resolve_image_id(agent, request)
+    except ValueError as e:
+        lease.release()
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseException:
+        lease.release()
+        raise
+
+    async def event_stream():
+        try:
+            async for event in agent.chat_stream(request.message, request.video_path, image_id, request.session_id):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {e}")
+            yield f"event: error\ndata: {json.dumps({'type': 'error', 'detail': str(e)})}\n\n"
+        finally:
+            lease.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(lease.release),
+    )
+
+
+@app.websocket("/ws/chat")
+async def chat_websocket(websocket: WebSocket):
+    """
+    Chat with the AI assistant over a WebSocket. Every received UserMessageRequest is answered
+    with the same events as /chat/stream, sent as JSON messages
+    """
+    await websocket.accept()
+    agent = websocket.app.state.agent
+    # Messages without a session id continue the conversation of the connection.
+    connection_session_id = new_session_id()
+
+    try:
+        while True:
+            request = UserMessageRequest(**await websocket.receive_json())
+            request.session_id = request.session_id or connection_session_id
+            try:
+                lease = await websocket.app.state.admission.acquire("chat")
+            except AdmissionRejected as e:
+                await websocket.send_json(
+                    {"type": "error", "detail": e.detail, "status_code": e.status_code, "retry_after": e.retry_after}
+                )
+                continue
+
+            try:
+                async with lease:
+                    await agent.ensure_setup()
+                    image_id = await resolve_image_id(agent, request)
+                    async for event in agent.chat_stream(
+                        request.message, request.video_path, image_id, request.session_id
+                    ):
+                        await websocket.send_json(event)
+            except Exception as e:
+                logger.error(f"Error streaming chat response: {e}")
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        logger.info("Chat WebSocket disconnected")
 
 
 @app.post("/reset-memory")
-async def reset_memory(fastapi_request: Request):
+async def reset_memory(fastapi_request: Request, session_id: str | None = None):
     """
-    Reset the memory of the agent
+    Reset the memory of one session, or of every session when no session id is given
     """
     agent = fastapi_request.app.state.agent
-    agent.reset_memory()
+    agent.reset_memory(session_id)
     return ResetMemoryResponse(message="Memory reset successfully")
 
 
@@ -166,6 +339,25 @@ async def upload_video(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/upload-image", response_model=ImageUploadResponse)
+async def upload_image(fastapi_request: Request, file: UploadFile = File(...)):
+    """
+    Upload an image once and return its id, to reference it in chat requests instead of sending it inline
+    """
+    data = await file.read(settings.IMAGE_UPLOAD_MAX_BYTES + 1)
+    if not data:
+        raise HTTPException(status_code=400, detail="No file uploaded")
+    if len(data) > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+
+    try:
+        image_id = await asyncio.to_thread(fastapi_request.app.state.agent.image_store.put, data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ImageUploadResponse(message="Image uploaded successfully", image_id=image_id)
+
+
 @app.get("/media/{file_path:path}")
 async def serve_media(file_path: str):
     """
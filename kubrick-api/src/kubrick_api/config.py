@@ -8,10 +8,12 @@ class Settings(BaseSettings):
 
     # --- GROQ Configuration ---
     GROQ_API_KEY: str
+    GROQ_BASE_URL: str | None = None
     GROQ_ROUTING_MODEL: str = "meta-llama/llama-4-scout-17b-16e-instruct"
     GROQ_TOOL_USE_MODEL: str = "meta-llama/llama-4-maverick-17b-128e-instruct"
     GROQ_IMAGE_MODEL: str = "meta-llama/llama-4-maverick-17b-128e-instruct"
     GROQ_GENERAL_MODEL: str = "meta-llama/llama-4-maverick-17b-128e-instruct"
+    GROQ_SUMMARY_MODEL: str = "meta-llama/llama-4-scout-17b-16e-instruct"
 
     # --- Comet ML & Opik Configuration ---
     OPIK_API_KEY: str | None = Field(default=None, description="API key for Comet ML and Opik services.")
@@ -21,11 +23,75 @@ class Settings(BaseSettings):
         description="Project name for Comet ML and Opik tracking.",
     )
 
+    # --- Router Configuration ---
+    LOCAL_ROUTER_ENABLED: bool = True
+    LOCAL_ROUTER_CONFIDENCE_THRESHOLD: float = 0.8
+    LOCAL_ROUTER_EXAMPLES_PATH: str | None = None
+    LOCAL_ROUTER_AUDIT_RATE: float = 0.05
+    ROUTER_DECISION_LOG_PATH: str = "router_decisions.jsonl"
+    # Answer and select tools while the LLM router runs, then drop the unused path: lower latency, up to 2x LLM spend.
+    SPECULATIVE_EXECUTION: bool = False
+
+    # --- Agent Setup Configuration ---
+    AGENT_SETUP_TTL_SECONDS: float = 300.0
+    AGENT_SETUP_RETRY_SECONDS: float = 30.0
+
     # --- Memory Configuration ---
     AGENT_MEMORY_SIZE: int = 20
+    MEMORY_BUFFER_SIZE: int = 100
+    MEMORY_FLUSH_BATCH_SIZE: int = 16
+    MEMORY_FLUSH_INTERVAL_SECONDS: float = 5.0
+
+    # --- Context Configuration ---
+    # Hugging Face tokenizer used to count prompt tokens, shared by the Llama 4 chat models.
+    TOKENIZER_MODEL: str | None = "meta-llama/Llama-4-Scout-17B-16E-Instruct"
+    CONTEXT_TOKEN_BUDGET: int = 3000
+    MODEL_CONTEXT_TOKEN_BUDGETS: dict[str, int] = {}
+    SUMMARY_MIN_RECORDS: int = 4
+    SUMMARY_MAX_RECORDS: int = 40
+    SUMMARY_MAX_TOKENS: int = 512
+
+    # --- Answer Cache Configuration ---
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_MAX_ENTRIES: int = 1024
+    ANSWER_CACHE_TTL_SECONDS: float = 3600.0
+
+    # --- Image Store Configuration ---
+    # Media directory shared with the MCP server, images are stored in its `images` subdirectory.
+    SHARED_MEDIA_DIR: str = "shared_media"
+    IMAGE_LLM_MAX_SIZE: int = 1024
+    IMAGE_SEARCH_MAX_SIZE: int = 448
+    IMAGE_UPLOAD_MAX_BYTES: int = 20 * 1024 * 1024
+
+    # --- Session Configuration ---
+    AGENT_MAX_SESSIONS: int = 1000
+    AGENT_SESSION_TTL_SECONDS: float = 1800.0
+
+    # --- Admission Control Configuration ---
+    ADMISSION_MAX_CONCURRENCY: int = 10
+    CHAT_MAX_CONCURRENCY: int = 8
+    CHAT_MAX_QUEUE: int = 32
+    CHAT_QUEUE_TIMEOUT_SECONDS: float = 15.0
+    INGESTION_MAX_CONCURRENCY: int = 2
+    INGESTION_MAX_QUEUE: int = 16
+    INGESTION_QUEUE_TIMEOUT_SECONDS: float = 3600.0
 
     # --- MCP Configuration ---
     MCP_SERVER: str = "http://kubrick-mcp:9090/mcp"
+    # MCP server replicas, each serving the videos it owns on a consistent hash ring. Defaults to MCP_SERVER.
+    MCP_SERVERS: list[str] = []
+    MCP_HASH_RING_VNODES: int = 64
+    MCP_REPLICATION: int = 1
+    MCP_REPLICA_FAILURE_COOLDOWN_SECONDS: float = 30.0
+    # Failures in a row after which a replica whose pool is still connected is marked down.
+    MCP_REPLICA_FAILURE_THRESHOLD: int = 3
+    # Replicas holding each processed video, kept across restarts of the API.
+    MCP_PLACEMENTS_LOG_PATH: str = "mcp_placements.jsonl"
+    MCP_POOL_SIZE: int = 4
+    MCP_POOL_KEEPALIVE_SECONDS: float = 30.0
+    MCP_POOL_ACQUIRE_TIMEOUT_SECONDS: float = 30.0
+    TOOL_CALL_MAX_CONCURRENCY: int = 4
+    TOOL_CALL_TIMEOUT_SECONDS: float = 120.0
 
     # --- Disable Nest Asyncio ---
     DISABLE_NEST_ASYNCIO: bool = True
@@ -0,0 +1,84 @@
+import base64
+import hashlib
+import re
+from io import BytesIO
+from pathlib import Path
+
+from loguru import logger
+from PIL import Image
+
+from kubrick_api.config import get_settings
+
+logger = logger.bind(name="ImageStore")
+
+settings = get_settings()
+
+_IMAGE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class ImageStore:
+    """Content-addressed storage of user images in the media directory shared with the MCP server.
+
+    Every image is stored once, under the hash of its bytes, as downscaled JPEG variants: `llm` for the
+    vision model prompt and `search` for the CLIP image search. Requests, the agent and the MCP tools then
+    pass the image id, or the variant path relative to the shared media directory, instead of the image itself.
+    """
+
+    VARIANTS = ("llm", "search")
+
+    def __init__(
+        self,
+        shared_media_dir: str = settings.SHARED_MEDIA_DIR,
+        llm_max_size: int = settings.IMAGE_LLM_MAX_SIZE,
+        search_max_size: int = settings.IMAGE_SEARCH_MAX_SIZE,
+    ):
+        self.shared_media_dir = Path(shared_media_dir)
+        self.directory = self.shared_media_dir / "images"
+        self.max_sizes = {"llm": llm_max_size, "search": search_max_size}
+
+    def put(self, data: bytes) -> str:
+        """Store an image, unless it is already stored, and return its id.
+
+        Raises:
+            ValueError: If the data is not a readable image.
+        """
+        image_id = hashlib.sha256(data).hexdigest()[:32]
+        if all(self.path(image_id, variant).exists() for variant in self.VARIANTS):
+            return image_id
+
+        try:
+            image = Image.open(BytesIO(data))
+            image = image.convert("RGB")
+        except (OSError, ValueError) as e:
+            raise ValueError(f"Invalid image: {e}")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for variant in self.VARIANTS:
+            resized = image.copy()
+            resized.thumbnail((self.max_sizes[variant], self.max_sizes[variant]))
+            # Write then rename, so concurrent uploads of the same image never expose a partial file.
+            tmp_path = self.path(image_id, variant).with_suffix(".tmp")
+            resized.save(tmp_path, format="JPEG", quality=90)
+            tmp_path.replace(self.path(image_id, variant))
+
+        logger.info(f"Stored image {image_id} ({len(data)} bytes, {image.width}x{image.height})")
+        return image_id
+
+    def put_base64(self, image_base64: str) -> str:
+        """Store an image sent inline as base64, for clients that do not upload their images first."""
+        return self.put(base64.b64decode(image_base64))
+
+    def path(self, image_id: str, variant: str) -> Path:
+        if not _IMAGE_ID_PATTERN.match(image_id):
+            raise ValueError(f"Invalid image id: {image_id}")
+        return self.directory / f"{image_id}_{variant}.jpg"
+
+    def reference(self, image_id: str, variant: str) -> str:
+        """Path of an image variant relative to the shared media directory, as the MCP tools expect it."""
+        return self.path(image_id, variant).relative_to(self.shared_media_dir).as_posix()
+
+    def exists(self, image_id: str) -> bool:
+        return _IMAGE_ID_PATTERN.match(image_id) is not None and self.path(image_id, "search").exists()
+
+    def load_base64(self, image_id: str, variant: str = "llm") -> str:
+        return base64.b64encode(self.path(image_id, variant).read_bytes()).decode("utf-8")
@@ -13,12 +13,20 @@ class ProcessVideoResponse(BaseModel):
 class UserMessageRequest(BaseModel):
     message: str
     video_path: str | None = None
+    image_id: str | None = None
     image_base64: str | None = None
+    session_id: str | None = None
 
 
 class AssistantMessageResponse(BaseModel):
     message: str
     clip_path: str | None = None
+    session_id: str | None = None
+
+
+class ImageUploadResponse(BaseModel):
+    message: str
+    image_id: str
 
 
 class ResetMemoryResponse(BaseModel):
@@ -40,6 +48,10 @@ class RoutingResponseModel(BaseModel):
     )
 
 
+class SummaryResponseModel(BaseModel):
+    summary: str = Field(description="The updated summary of the conversation.")
+
+
 class GeneralResponseModel(BaseModel):
     message: str = Field(
         description="Your response to the user's question, that needs to follow Kubrick's style and personality"
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# The settings require the API keys, traces must not be sent to Opik, and pixeltable must not touch the
+# developer's own catalog.
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("OPIK_TRACK_DISABLE", "true")
+os.environ.setdefault("PIXELTABLE_HOME", tempfile.mkdtemp(prefix="kubrick-api-tests-"))
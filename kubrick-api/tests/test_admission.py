@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from kubrick_api.admission import AdmissionController, AdmissionRejected
+
+
+def _controller(max_concurrency=1, chat_queue=1, chat_timeout=None):
+    controller = AdmissionController(max_concurrency)
+    controller.add_lane("chat", priority=0, max_concurrency=1, max_queue=chat_queue, queue_timeout=chat_timeout)
+    controller.add_lane("ingestion", priority=1, max_concurrency=1, max_queue=4)
+    return controller
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = _controller()
+
+    async def run():
+        lease = await controller.acquire("chat")
+        waiter = asyncio.create_task(controller.acquire("chat"))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("chat")
+        lease.release()
+        (await waiter).release()
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert (rejected.status_code, rejected.lane) == (429, "chat")
+    assert rejected.retry_after >= 1
+    assert controller.metrics["lanes"]["chat"]["rejected_full"] == 1
+    assert controller.metrics["active"] == 0
+
+
+def test_queue_timeout_is_rejected_with_503():
+    controller = _controller(chat_timeout=0.01)
+
+    async def run():
+        lease = await controller.acquire("chat")
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire("chat")
+        lease.release()
+        return rejected.value
+
+    rejected = asyncio.run(run())
+
+    assert rejected.status_code == 503
+    assert controller.metrics["lanes"]["chat"]["rejected_timeout"] == 1
+    assert controller.metrics["lanes"]["chat"]["queue_depth"] == 0
+
+
+def test_ensure_capacity_rejects_before_the_work_is_queued():
+    controller = _controller(chat_queue=0)
+
+    async def run():
+        lease = await controller.acquire("chat")
+        try:
+            controller.ensure_capacity("chat")
+        finally:
+            lease.release()
+
+    with pytest.raises(AdmissionRejected, match="Too many chat requests"):
+        asyncio.run(run())
+
+
+def test_retry_after_grows_with_the_queue():
+    controller = _controller(chat_queue=8)
+    controller._lanes["chat"].service_time = 2.0
+
+    async def run():
+        lease = await controller.acquire("chat")
+        empty = controller.retry_after("chat")
+        waiters = [asyncio.create_task(controller.acquire("chat")) for _ in range(3)]
+        await asyncio.sleep(0)
+        queued = controller.retry_after("chat")
+        lease.release()
+        for waiter in waiters:
+            (await waiter).release()
+        return empty, queued
+
+    assert asyncio.run(run()) == (2, 8)
+
+
+def test_higher_priority_waiters_are_served_first():
+    controller = _controller(chat_queue=4)
+    order = []
+
+    async def use(lane):
+        async with await controller.acquire(lane):
+            order.append(lane)
+
+    async def run():
+        lease = await controller.acquire("ingestion")
+        ingestion = asyncio.create_task(use("ingestion"))
+        await asyncio.sleep(0)
+        chat = asyncio.create_task(use("chat"))
+        await asyncio.sleep(0)
+        lease.release()
+        await asyncio.gather(ingestion, chat)
+
+    asyncio.run(run())
+
+    assert order == ["chat", "ingestion"]
+
+
+def test_cancelled_waiter_hands_its_slot_on():
+    controller = _controller(chat_queue=4)
+
+    async def run():
+        lease = await controller.acquire("chat")
+        cancelled = asyncio.create_task(controller.acquire("chat"))
+        next_waiter = asyncio.create_task(controller.acquire("chat"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        lease.release()
+        (await next_waiter).release()
+        return cancelled.cancelled()
+
+    assert asyncio.run(run())
+    assert controller.metrics["active"] == 0
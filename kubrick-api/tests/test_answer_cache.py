@@ -0,0 +1,109 @@
+import pytest
+
+from kubrick_api.agent import answer_cache
+from kubrick_api.agent.answer_cache import AnswerCache
+from kubrick_api.models import GeneralResponseModel
+
+ANSWER = GeneralResponseModel(message="The dog enters at 0:42.")
+
+
+@pytest.fixture
+def videos(tmp_path):
+    paths = []
+    for name, content in [("first.mp4", b"first video"), ("second.mp4", b"second video")]:
+        path = tmp_path / name
+        path.write_bytes(content)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Who enters after the dog leaves?",
+        "who enters after the dog leaves",
+        "  Who   enters after the dog leaves ?! ",
+        "WHO ENTERS AFTER THE DOG LEAVES.",
+    ],
+)
+def test_the_same_question_is_reused(videos, question):
+    cache = AnswerCache()
+    cache.put(videos[0], "Who enters after the dog leaves?", None, ANSWER)
+
+    assert cache.get(videos[0], question) == ANSWER
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Who leaves after the dog enters?",
+        "Who enters before the dog leaves?",
+        "Who enters after the cat leaves?",
+        "Who enters after the dog leaves the room?",
+        "Which person enters after the dog leaves?",
+    ],
+)
+def test_near_misses_are_not_reused(videos, question):
+    cache = AnswerCache()
+    cache.put(videos[0], "Who enters after the dog leaves?", None, ANSWER)
+
+    assert cache.get(videos[0], question) is None
+
+
+@pytest.mark.parametrize(
+    "question",
+    ["Show me the clip at 1:30", "Show me the clip at 1:03", "Show me the clip at 130", "Show me the clip at 13.0"],
+)
+def test_numbers_must_match(videos, question):
+    cache = AnswerCache()
+    cache.put(videos[0], "Show me the clip at 13:0", None, ANSWER)
+
+    assert cache.get(videos[0], question) is None
+
+
+def test_other_videos_and_images_are_not_reused(videos):
+    cache = AnswerCache()
+    cache.put(videos[0], "Show me this player", "image-1", ANSWER)
+
+    assert cache.get(videos[1], "Show me this player", "image-1") is None
+    assert cache.get(videos[0], "Show me this player", "image-2") is None
+    assert cache.get(videos[0], "Show me this player") is None
+    assert cache.get(videos[0], "Show me this player", "image-1") == ANSWER
+
+
+def test_a_copy_of_a_video_reuses_its_answers(videos, tmp_path):
+    copy = tmp_path / "copy.mp4"
+    copy.write_bytes(b"first video")
+    cache = AnswerCache()
+    cache.put(videos[0], "When does the dog enter?", None, ANSWER)
+
+    assert cache.get(str(copy), "When does the dog enter?") == ANSWER
+
+
+def test_entries_expire_and_are_evicted(videos, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(answer_cache.time, "monotonic", lambda: now)
+    cache = AnswerCache(max_entries=2, ttl=60.0)
+    cache.put(videos[0], "first", None, ANSWER)
+    cache.put(videos[0], "second", None, ANSWER)
+    cache.get(videos[0], "first")
+    cache.put(videos[0], "third", None, ANSWER)
+
+    assert cache.get(videos[0], "second") is None
+    assert cache.get(videos[0], "first") == ANSWER
+
+    now += 61.0
+    assert cache.get(videos[0], "first") is None
+    assert cache.metrics["evictions"] == 1
+
+
+def test_reindexed_videos_are_invalidated(videos):
+    cache = AnswerCache()
+    cache.put(videos[0], "When does the dog enter?", None, ANSWER)
+    cache.put(videos[1], "When does the dog enter?", None, ANSWER)
+
+    cache.invalidate(videos[0])
+
+    assert cache.get(videos[0], "When does the dog enter?") is None
+    assert cache.get(videos[1], "When does the dog enter?") == ANSWER
+    assert cache.metrics["entries"] == 1
@@ -0,0 +1,57 @@
+import pytest
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+
+from kubrick_api.agent import context
+from kubrick_api.agent.context import CHARS_PER_TOKEN, MESSAGE_OVERHEAD_TOKENS, count_tokens, estimate_tokens
+
+TEXTS = [
+    "Show me the clip where the goal is scored in the second half.",
+    "The player in the red shirt runs down the left wing, crosses the ball and the striker heads it in.",
+    "Hi! Who are you and what can you do with my videos?",
+    "What does the speaker say about the budget between minute 3 and minute 5?",
+    "Summary of the earlier conversation:\nThe user asked about the penalty kick at 34:12 and the celebration.",
+]
+
+
+def _cached_tokenizer():
+    from huggingface_hub import try_to_load_from_cache
+
+    path = try_to_load_from_cache(context.settings.TOKENIZER_MODEL, "tokenizer.json")
+    if not isinstance(path, str):
+        pytest.skip(f"The {context.settings.TOKENIZER_MODEL} tokenizer is not in the Hugging Face cache")
+    return Tokenizer.from_file(path)
+
+
+def test_tokens_are_estimated_without_a_tokenizer(monkeypatch):
+    monkeypatch.setattr(context, "_tokenizer", None)
+
+    assert count_tokens("a" * 35) == 10
+    assert estimate_tokens("a" * 35) == 10 + MESSAGE_OVERHEAD_TOKENS
+
+
+def test_tokens_are_counted_with_the_loaded_tokenizer(monkeypatch):
+    tokenizer = Tokenizer(WordLevel({"[UNK]": 0, "show": 1, "me": 2}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    monkeypatch.setattr(context, "_tokenizer", tokenizer)
+
+    assert count_tokens("show me the goal") == 4
+    assert estimate_tokens([{"type": "text", "text": "show me"}]) == 2 + MESSAGE_OVERHEAD_TOKENS
+
+
+def test_unavailable_tokenizer_falls_back_to_the_estimate(monkeypatch):
+    monkeypatch.setattr(context, "_tokenizer", None)
+    monkeypatch.setattr(Tokenizer, "from_pretrained", staticmethod(lambda *args, **kwargs: 1 / 0))
+
+    assert context.load_tokenizer() is False
+    assert context._tokenizer is None
+
+
+def test_estimate_slightly_overestimates_real_counts():
+    tokenizer = _cached_tokenizer()
+
+    real = sum(len(tokenizer.encode(text, add_special_tokens=False).ids) for text in TEXTS)
+    estimated = sum(len(text) / CHARS_PER_TOKEN for text in TEXTS)
+
+    assert real <= estimated <= 1.5 * real
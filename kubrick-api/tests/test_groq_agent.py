@@ -0,0 +1,192 @@
+import asyncio
+import json
+from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from kubrick_api.agent.answer_cache import AnswerCache
+from kubrick_api.agent.groq import groq_agent
+from kubrick_api.agent.groq.groq_agent import GroqAgent
+from kubrick_api.agent.memory import MemoryRecord
+from kubrick_api.agent.router import RoutingDecision
+from kubrick_api.agent.sessions import AgentSession
+from kubrick_api.models import GeneralResponseModel
+
+
+class CountingRouter:
+    def __init__(self, decision):
+        self.decision = decision
+        self.calls = 0
+
+    def route(self, message):
+        self.calls += 1
+        return self.decision
+
+
+@pytest.fixture
+def decision_log(tmp_path, monkeypatch):
+    log_path = tmp_path / "router_decisions.jsonl"
+    monkeypatch.setattr(groq_agent.settings, "ROUTER_DECISION_LOG_PATH", str(log_path))
+    monkeypatch.setattr(groq_agent.settings, "LOCAL_ROUTER_AUDIT_RATE", 0.0)
+    return log_path
+
+
+def _agent(local_decision):
+    agent = GroqAgent.__new__(GroqAgent)
+    agent.local_router = CountingRouter(local_decision)
+    agent._background_tasks = set()
+    return agent
+
+
+async def _chat_and_drain(agent, message, local_decision):
+    response = await agent._chat(message, "video.mp4", None, local_decision)
+    await asyncio.gather(*agent._background_tasks)
+    return response
+
+
+def test_confident_local_decision_is_not_routed_again(decision_log):
+    decision = RoutingDecision(tool_use=False, confidence=0.95, source="local")
+    agent = _agent(decision)
+
+    async def respond_general(message):
+        return GeneralResponseModel(message="Hi!")
+
+    agent._respond_general = respond_general
+
+    response = asyncio.run(_chat_and_drain(agent, "Hello", agent._route_locally("Hello")))
+
+    assert response.message == "Hi!"
+    assert agent.local_router.calls == 1
+    assert [json.loads(line)["source"] for line in decision_log.read_text().splitlines()] == ["local"]
+
+
+def test_unconfident_local_decision_falls_back_to_the_llm_router(decision_log):
+    decision = RoutingDecision(tool_use=False, confidence=0.4, source="local")
+    agent = _agent(decision)
+
+    async def route_with_llm(message):
+        return True
+
+    async def run_with_tool(message, video_path, image_id):
+        return GeneralResponseModel(message="A dog enters at 0:42.")
+
+    agent._route_with_llm = route_with_llm
+    agent._run_with_tool = run_with_tool
+
+    response = asyncio.run(_chat_and_drain(agent, "When does the dog enter?", decision))
+
+    assert response.message == "A dog enters at 0:42."
+    assert agent.local_router.calls == 0
+    (record,) = [json.loads(line) for line in decision_log.read_text().splitlines()]
+    assert (record["source"], record["tool_use"], record["local_confidence"]) == ("llm", True, 0.4)
+
+
+class FakeMemory:
+    def __init__(self, records):
+        self.records = records
+
+    def get_summary(self):
+        return None
+
+    def get_latest(self, n):
+        return self.records[-n:]
+
+
+def test_speculative_paths_share_one_history(decision_log, monkeypatch):
+    records = [
+        MemoryRecord(message_id=str(i), role=role, content=f"turn {i}", timestamp=datetime(2025, 1, 1, 0, i))
+        for i, role in enumerate(["user", "assistant", "user", "assistant"])
+    ]
+    session = AgentSession("test", FakeMemory(records))
+    monkeypatch.setattr(GroqAgent, "session", property(lambda self: session))
+    agent = _agent(None)
+    agent.local_router = None
+    agent.tool_use_system_prompt = "Use the video tools."
+    agent.general_system_prompt = "Answer the user."
+    agent.speculation_metrics = defaultdict(float)
+    histories = {}
+    fit_context = agent._fit_context
+
+    def count_fit_context(*args, **kwargs):
+        histories["fitted"] = histories.get("fitted", 0) + 1
+        return fit_context(*args, **kwargs)
+
+    async def respond_general(message, chat_history):
+        histories["general"] = chat_history
+        await asyncio.Event().wait()
+
+    async def select_tools(chat_history):
+        histories["tools"] = chat_history
+        return "completion"
+
+    async def route_with_llm(message):
+        await asyncio.sleep(0)
+        return True
+
+    async def complete_with_tool(message, video_path, image_id, chat_history, completion):
+        return GeneralResponseModel(message=completion)
+
+    agent._fit_context = count_fit_context
+    agent._respond_general = respond_general
+    agent._select_tools = select_tools
+    agent._route_with_llm = route_with_llm
+    agent._complete_with_tool = complete_with_tool
+
+    async def run():
+        response = await agent._chat_speculatively("When does the dog enter?", "video.mp4")
+        await asyncio.gather(*agent._background_tasks)
+        return response
+
+    assert asyncio.run(run()).message == "completion"
+    assert histories["fitted"] == 1
+    assert histories["general"][1:] == histories["tools"][1:]
+    assert histories["general"][0]["content"] == "Answer the user."
+    assert session.window_start == records[0].timestamp
+    assert agent.speculation_metrics["cancelled_in_flight"] == 1
+    assert agent.speculation_metrics["wasted_tokens_lower_bound"] == 0
+    assert agent.speculation_metrics["cancelled_prompt_tokens_estimate"] > 0
+
+
+def test_image_tool_without_an_image_returns_a_tool_error(monkeypatch):
+    monkeypatch.setattr(groq_agent.settings, "TOOL_CALL_TIMEOUT_SECONDS", 5)
+    agent = _agent(None)
+    calls = []
+
+    async def call_tool(function_name, function_args):
+        calls.append(function_name)
+        return f"{function_name} result"
+
+    agent.call_tool = call_tool
+    tool_calls = [
+        SimpleNamespace(id=str(i), function=SimpleNamespace(name=name, arguments="{}"))
+        for i, name in enumerate(["get_video_clip_from_image", "get_video_clip_from_user_query"])
+    ]
+
+    responses = asyncio.run(agent._execute_tool_calls(tool_calls, [], "video.mp4", None))
+
+    assert responses[0].startswith("Error executing tool get_video_clip_from_image")
+    assert responses[1] == "get_video_clip_from_user_query result"
+    assert calls == ["get_video_clip_from_user_query"]
+
+
+def test_only_first_turns_use_the_answer_cache(monkeypatch, tmp_path):
+    video_path = tmp_path / "video.mp4"
+    video_path.write_bytes(b"video")
+    memory = FakeMemory([])
+    monkeypatch.setattr(GroqAgent, "session", property(lambda self: AgentSession("test", memory)))
+    agent = _agent(None)
+    agent.answer_cache = AnswerCache()
+    answer = GeneralResponseModel(message="The dog enters at 0:42.")
+    tool_names = ["ask_question_about_video"]
+
+    agent._cache_answer("When does the dog enter?", str(video_path), None, tool_names, answer)
+    assert agent._get_cached_answer("When does the dog enter?", str(video_path), None) == answer
+
+    memory.records = [
+        MemoryRecord(message_id="0", role="user", content="When does the dog enter?", timestamp=datetime(2025, 1, 1))
+    ]
+    assert agent._get_cached_answer("When does the dog enter?", str(video_path), None) is None
+    agent._cache_answer("What happens after that?", str(video_path), None, tool_names, answer)
+    assert agent.answer_cache.metrics["entries"] == 1
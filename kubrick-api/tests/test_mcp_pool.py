@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from kubrick_api.agent import mcp_pool
+from kubrick_api.agent.mcp_pool import MCPSessionPool
+
+
+class FakeClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def ping(self):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fake_client(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "Client", FakeClient)
+
+
+async def _use_session(pool, error):
+    async with pool.session():
+        raise error
+
+
+@pytest.mark.parametrize("error", [asyncio.CancelledError(), KeyboardInterrupt(), RuntimeError("connection reset")])
+def test_interrupted_session_is_not_returned_to_the_pool(error):
+    async def run():
+        pool = MCPSessionPool("http://mcp", size=1, acquire_timeout=0.1)
+        with pytest.raises(type(error)):
+            await _use_session(pool, error)
+        metrics = pool.metrics
+        await pool.close()
+        return metrics
+
+    metrics = asyncio.run(run())
+
+    assert metrics["broken"] == 1
+    assert metrics["idle"] == 0
+
+
+def test_session_is_reused_after_an_application_error():
+    async def run():
+        pool = MCPSessionPool("http://mcp", size=1, acquire_timeout=0.1)
+        with pytest.raises(mcp_pool.ClientError):
+            await _use_session(pool, mcp_pool.ClientError("unknown tool"))
+        metrics = pool.metrics
+        await pool.close()
+        return metrics
+
+    metrics = asyncio.run(run())
+
+    assert metrics["broken"] == 0
+    assert metrics["idle"] == 1
@@ -0,0 +1,169 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from kubrick_api.agent.mcp_router import HashRing, MCPRouter
+
+NODES = [f"http://kubrick-mcp-{i}:9090/mcp" for i in range(4)]
+KEYS = [f"shared_media/video_{i}.mp4" for i in range(2000)]
+
+
+def _owners(ring):
+    return {key: ring.preference_list(key)[0] for key in KEYS}
+
+
+def test_ring_is_deterministic_and_balanced():
+    owners = _owners(HashRing(NODES))
+
+    assert owners == _owners(HashRing(list(reversed(NODES))))
+    counts = [list(owners.values()).count(node) for node in NODES]
+    assert max(counts) < 1.5 * len(KEYS) / len(NODES)
+
+
+def test_only_the_keys_of_a_removed_node_move():
+    before = _owners(HashRing(NODES))
+    after = _owners(HashRing(NODES[:-1]))
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+
+    assert moved == {key for key in KEYS if before[key] == NODES[-1]}
+
+
+def test_only_keys_taken_by_an_added_node_move():
+    before = _owners(HashRing(NODES[:-1]))
+    after = _owners(HashRing(NODES))
+
+    moved = {key for key in KEYS if before[key] != after[key]}
+
+    assert all(after[key] == NODES[-1] for key in moved)
+    assert len(moved) < 1.5 * len(KEYS) / len(NODES)
+
+
+def test_preference_list_falls_back_to_the_next_owner():
+    ring = HashRing(NODES)
+
+    for key in KEYS[:100]:
+        preference = ring.preference_list(key)
+        assert sorted(preference) == sorted(NODES)
+        assert HashRing([node for node in NODES if node != preference[0]]).preference_list(key) == preference[1:]
+
+
+class FakeClient:
+    def __init__(self, url):
+        self.url = url
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        return self.url
+
+
+class FakePool:
+    def __init__(self, url):
+        self.client = FakeClient(url)
+        self.reachable = True
+        self.busy = False
+        self.error = None
+
+    @property
+    def metrics(self):
+        return {"in_use": 0, "connected": int(self.reachable)}
+
+    @asynccontextmanager
+    async def session(self):
+        if not self.reachable or self.busy:
+            raise asyncio.TimeoutError()
+        if self.error is not None:
+            raise self.error
+        yield self.client
+
+    async def close(self):
+        pass
+
+
+def _router(**kwargs):
+    router = MCPRouter(NODES[:2], **kwargs)
+    for replica in router._replicas.values():
+        replica.pool = FakePool(replica.url)
+    return router
+
+
+def test_session_fails_over_to_the_next_replica():
+    router = _router()
+    owner, successor = router.ring.preference_list("video.mp4")
+    router._replicas[owner].pool.reachable = False
+
+    async def run():
+        async with router.session("video.mp4") as client:
+            return client.url
+
+    assert asyncio.run(run()) == successor
+    assert not router._replicas[owner].is_up
+    assert router.metrics["failovers"] == 1
+
+
+def test_busy_replica_is_not_failed_over_or_marked_down():
+    router = _router()
+    owner = router.ring.preference_list("video.mp4")[0]
+    router._replicas[owner].pool.busy = True
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(router.call_tool("get_video_clip_from_user_query", {"video_path": "video.mp4"}))
+
+    assert router._replicas[owner].is_up
+    assert router.metrics["failovers"] == 0
+    assert router.metrics["membership_changes"] == 0
+
+
+def test_connected_replica_is_marked_down_after_repeated_failures():
+    router = _router(failure_threshold=2)
+    owner, successor = router.ring.preference_list("video.mp4")
+    router._replicas[owner].pool.error = ConnectionError("connection reset")
+
+    async def call():
+        return await router.call_tool("get_video_clip_from_user_query", {"video_path": "video.mp4"})
+
+    assert asyncio.run(call()) == successor
+    assert router._replicas[owner].is_up
+    assert asyncio.run(call()) == successor
+    assert not router._replicas[owner].is_up
+    assert router.metrics["membership_changes"] == 1
+
+
+def test_session_raises_when_no_replica_is_reachable():
+    router = _router()
+    for replica in router._replicas.values():
+        replica.pool.reachable = False
+
+    async def run():
+        async with router.session("video.mp4"):
+            pass
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(run())
+
+
+def test_placements_survive_a_restart(tmp_path):
+    placements_path = str(tmp_path / "placements.jsonl")
+    router = _router(replication=2, placements_path=placements_path)
+    asyncio.run(router.process_video("video.mp4"))
+    asyncio.run(router.process_video("video.mp4"))
+
+    restarted = _router(placements_path=placements_path)
+    owner, successor = restarted.ring.preference_list("video.mp4")
+
+    assert restarted._placements == {"video.mp4": {owner, successor}}
+    assert len((tmp_path / "placements.jsonl").read_text().splitlines()) == 2
+    # The successor holds the index, so it is tried before an owner that never got it.
+    restarted._placements = {"video.mp4": {successor}}
+    assert restarted.replicas_for("video.mp4") == [successor, owner]
+
+
+def test_placements_of_removed_replicas_are_ignored(tmp_path):
+    placements_path = tmp_path / "placements.jsonl"
+    placements_path.write_text(
+        '{"video_path": "video.mp4", "replica": "http://removed:9090/mcp"}\n{"video_path": "video.mp4", "repl'
+    )
+
+    assert _router(placements_path=str(placements_path))._placements == {}
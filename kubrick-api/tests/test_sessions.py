@@ -0,0 +1,111 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from kubrick_api.agent.groq.groq_agent import GroqAgent
+from kubrick_api.agent.memory import MemoryRecord
+from kubrick_api.agent.sessions import DEFAULT_SESSION_ID, SessionManager
+
+
+@pytest.fixture
+def name():
+    return f"sessions_{uuid.uuid4().hex[:8]}"
+
+
+def _record(content):
+    return MemoryRecord(message_id=str(uuid.uuid4()), role="user", content=content, timestamp=datetime.now())
+
+
+@pytest.mark.parametrize("session_id", [DEFAULT_SESSION_ID, "alice"])
+def test_history_survives_a_restart(name, session_id):
+    sessions = SessionManager(name, max_sessions=10, ttl=60.0)
+    sessions.get(session_id).memory.insert_many([_record("Hi"), _record("Show me the goal")])
+    sessions.flush()
+
+    restarted = SessionManager(name, max_sessions=10, ttl=60.0)
+
+    assert [record.content for record in restarted.get(session_id).memory.get_latest(10)] == ["Hi", "Show me the goal"]
+
+
+def test_reset_deletes_every_history(name):
+    sessions = SessionManager(name, max_sessions=10, ttl=60.0)
+    sessions.get("alice").memory.insert(_record("Hi"))
+    sessions.flush()
+
+    sessions.reset()
+
+    assert SessionManager(name, max_sessions=10, ttl=60.0).get("alice").memory.get_latest(10) == []
+
+
+def test_anonymous_clients_do_not_share_a_session(name):
+    agent = GroqAgent.__new__(GroqAgent)
+    agent.sessions = SessionManager(name, max_sessions=10, ttl=60.0)
+    both_inside = asyncio.Event()
+    session_ids = []
+
+    async def client():
+        async with agent.use_session(None) as session:
+            session_ids.append(session.session_id)
+            if len(session_ids) == 2:
+                both_inside.set()
+            # Times out if the second client waits for the first one's lock.
+            await asyncio.wait_for(both_inside.wait(), timeout=5.0)
+
+    async def run():
+        await asyncio.gather(client(), client())
+
+    asyncio.run(run())
+
+    assert len(set(session_ids)) == 2
+    assert DEFAULT_SESSION_ID not in session_ids
+
+
+def test_eviction_skips_busy_sessions(name):
+    sessions = SessionManager(name, max_sessions=1, ttl=60.0)
+
+    async def run():
+        busy = sessions.get("busy")
+        async with busy.lock:
+            sessions.get("idle")
+            assert sessions.metrics["live"] == 2
+            sessions.get("other")
+            live_while_busy = set(sessions._sessions)
+        sessions.get("last")
+        return live_while_busy, set(sessions._sessions)
+
+    live_while_busy, live = asyncio.run(run())
+
+    assert live_while_busy == {"busy", "other"}
+    assert live == {"last"}
+    assert sessions.metrics["evictions"] == 3
+
+
+def test_idle_sessions_expire(name, monkeypatch):
+    sessions = SessionManager(name, max_sessions=10, ttl=60.0)
+    sessions.get("alice")
+    now = sessions.get("bob").last_used
+
+    monkeypatch.setattr("kubrick_api.agent.sessions.time.monotonic", lambda: now + 61.0)
+    sessions.get("carol")
+
+    assert set(sessions._sessions) == {"carol"}
+
+
+def test_a_memory_table_without_sessions_is_migrated(name):
+    import pixeltable as pxt
+
+    pxt.create_dir(name)
+    table = pxt.create_table(
+        f"{name}.memory",
+        {"message_id": pxt.String, "role": pxt.String, "content": pxt.String, "timestamp": pxt.Timestamp},
+    )
+    table.insert([_record("Hi").model_dump()])
+
+    sessions = SessionManager(name, max_sessions=10, ttl=60.0)
+    sessions.get("alice").memory.insert(_record("Show me the goal"))
+    sessions.flush()
+
+    assert [record.content for record in sessions.get(DEFAULT_SESSION_ID).memory.get_latest(10)] == ["Hi"]
+    assert [record.content for record in sessions.get("alice").memory.get_latest(10)] == ["Show me the goal"]
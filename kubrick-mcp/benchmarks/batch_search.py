@@ -0,0 +1,52 @@
+import json
+import time
+
+import click
+from loguru import logger
+
+from kubrick_mcp.video.video_search_engine import VideoSearchEngine
+
+logger = logger.bind(name="BatchSearchBenchmark")
+
+
+@click.command()
+@click.option("--video-path", required=True, help="Video index to benchmark, as registered by process_video.")
+@click.option("--queries-file", required=True, type=click.Path(exists=True), help="Text file with one query per line.")
+@click.option("--top-k", default=1, help="Number of results per query and modality.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(video_path: str, queries_file: str, top_k: int, output: str):
+    """
+    Compare the throughput of sequential per-query searches against a single batched search.
+    """
+    with open(queries_file) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    start = time.perf_counter()
+    for query in queries:
+        # Mirrors one get_video_clip_from_user_query call: new engine, speech and caption search.
+        search_engine = VideoSearchEngine(video_path)
+        search_engine.search_by_speech(query, top_k)
+        search_engine.search_by_caption(query, top_k)
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    VideoSearchEngine(video_path).batch_search(queries, [], top_k)
+    batch_s = time.perf_counter() - start
+
+    report = {
+        "queries": len(queries),
+        "sequential_s": sequential_s,
+        "batch_s": batch_s,
+        "sequential_queries_per_s": len(queries) / sequential_s,
+        "batch_queries_per_s": len(queries) / batch_s,
+        "speedup": sequential_s / batch_s,
+    }
+    logger.info(f"Batch search report: {report}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,137 @@
+import json
+import multiprocessing
+import random
+import time
+from pathlib import Path
+
+import click
+import numpy as np
+from loguru import logger
+from PIL import Image
+
+logger = logger.bind(name="ClipThroughputBenchmark")
+
+_WORDS = "a man woman dog car street kitchen table walks runs talks holds red blue small large in on at with".split()
+
+
+def _load_inputs(images_dir: str | None, texts_file: str | None, n_images: int, n_texts: int):
+    rng = random.Random(0)
+    if images_dir:
+        paths = sorted(p for p in Path(images_dir).iterdir() if p.suffix.lower() in {".jpg", ".jpeg", ".png"})
+        images = [Image.open(path).convert("RGB") for path in paths[:n_images]]
+    else:
+        noise = np.random.default_rng(0).integers(0, 255, (n_images, 240, 320, 3), dtype=np.uint8)
+        images = [Image.fromarray(frame) for frame in noise]
+    if texts_file:
+        with open(texts_file) as f:
+            texts = [line.strip() for line in f if line.strip()][:n_texts]
+    else:
+        # Captions of very different lengths, like the ones of the frames of a video.
+        texts = [" ".join(rng.choices(_WORDS, k=rng.randint(3, 60))) for _ in range(n_texts)]
+    return images, texts
+
+
+def _run_mode(mode: str, model_id: str, images_dir, texts_file, n_images: int, n_texts: int) -> dict:
+    """Embed the inputs in a fresh process, with the current path or the CPU backend."""
+    images, texts = _load_inputs(images_dir, texts_file, n_images, n_texts)
+
+    if mode == "huggingface":
+        # Same as pixeltable's `clip` UDF: fp32, default torch threads, fixed batches of 32, padded to the longest.
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+
+        model = CLIPModel.from_pretrained(model_id).eval()
+        processor = CLIPProcessor.from_pretrained(model_id)
+
+        def embed_texts(batch):
+            with torch.no_grad():
+                inputs = processor(text=batch, return_tensors="pt", padding=True, truncation=True)
+                return model.get_text_features(**inputs).numpy()
+
+        def embed_images(batch):
+            with torch.no_grad():
+                return model.get_image_features(**processor(images=batch, return_tensors="pt")).numpy()
+
+        batch_size = 32
+        start = time.perf_counter()
+        text_vectors = np.concatenate(
+            [embed_texts(texts[i : i + batch_size]) for i in range(0, len(texts), batch_size)]
+        )
+        texts_s = time.perf_counter() - start
+        start = time.perf_counter()
+        image_vectors = np.concatenate(
+            [embed_images(images[i : i + batch_size]) for i in range(0, len(images), batch_size)]
+        )
+        images_s = time.perf_counter() - start
+    else:
+        from kubrick_mcp.config import get_settings
+        from kubrick_mcp.video.clip_backend import ClipBackend, pin_torch_threads
+
+        settings = get_settings()
+        threads = pin_torch_threads(settings.CLIP_NUM_THREADS)
+        backend = ClipBackend(
+            model_id,
+            int8=mode == "cpu-int8",
+            batch_size=settings.CLIP_BATCH_SIZE,
+            max_batch_tokens=settings.CLIP_MAX_BATCH_TOKENS,
+        )
+        start = time.perf_counter()
+        text_vectors = backend.embed_texts(texts)
+        texts_s = time.perf_counter() - start
+        start = time.perf_counter()
+        image_vectors = backend.embed_images(images)
+        images_s = time.perf_counter() - start
+
+    report = {"texts_per_s": len(texts) / texts_s, "images_per_s": len(images) / images_s}
+    if mode != "huggingface":
+        report["threads"] = threads
+    return report, text_vectors, image_vectors
+
+
+def _cosines(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return np.sum(a * b, axis=1)
+
+
+def _mean_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(_cosines(a, b)))
+
+
+@click.command()
+@click.option("--model-id", default="openai/clip-vit-base-patch32", help="HuggingFace CLIP model id.")
+@click.option("--images-dir", default=None, help="Directory of frames to embed, random images if not set.")
+@click.option("--texts-file", default=None, help="Text file with one caption per line, random captions if not set.")
+@click.option("--n-images", default=256, help="Number of images to embed.")
+@click.option("--n-texts", default=1024, help="Number of texts to embed.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(model_id: str, images_dir: str, texts_file: str, n_images: int, n_texts: int, output: str):
+    """
+    Compare the images/sec and texts/sec of the current CLIP path against the CPU backend, in fp32 and int8.
+    """
+    context = multiprocessing.get_context("spawn")
+    report, vectors = {}, {}
+    for mode in ("huggingface", "cpu", "cpu-int8"):
+        # Every mode runs in a new process, as torch thread settings are process-wide.
+        with context.Pool(1) as pool:
+            report[mode], *vectors[mode] = pool.apply(
+                _run_mode, (mode, model_id, images_dir, texts_file, n_images, n_texts)
+            )
+
+    for mode in ("cpu", "cpu-int8"):
+        report[mode]["texts_speedup"] = report[mode]["texts_per_s"] / report["huggingface"]["texts_per_s"]
+        report[mode]["images_speedup"] = report[mode]["images_per_s"] / report["huggingface"]["images_per_s"]
+        report[mode]["text_cosine_vs_huggingface"] = _mean_cosine(vectors[mode][0], vectors["huggingface"][0])
+        report[mode]["image_cosine_vs_huggingface"] = _mean_cosine(vectors[mode][1], vectors["huggingface"][1])
+    # Parity of the int8 weights with the fp32 ones of the same backend: the worst input matters for search.
+    report["cpu-int8"]["text_min_cosine_vs_cpu"] = float(_cosines(vectors["cpu-int8"][0], vectors["cpu"][0]).min())
+    report["cpu-int8"]["image_min_cosine_vs_cpu"] = float(_cosines(vectors["cpu-int8"][1], vectors["cpu"][1]).min())
+    logger.info(f"CLIP throughput report: {json.dumps(report, indent=4)}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
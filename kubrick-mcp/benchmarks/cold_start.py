@@ -0,0 +1,52 @@
+import json
+import multiprocessing
+import time
+
+import click
+from loguru import logger
+
+logger = logger.bind(name="ColdStartBenchmark")
+
+
+def _first_queries(video_path: str, image_path: str, warm_up: bool) -> dict:
+    """Time the first two image searches of a fresh process, with or without warm-up first."""
+    from kubrick_mcp.video.video_search_engine import VideoSearchEngine
+    from kubrick_mcp.warmup import readiness
+    from kubrick_mcp.warmup import warm_up as run_warm_up
+
+    report = {}
+    if warm_up:
+        run_warm_up()
+        report["warm_up_ms"] = readiness.warm_up_ms
+
+    for query in ("first_query_ms", "second_query_ms"):
+        start = time.perf_counter()
+        VideoSearchEngine(video_path).search_by_image(image_path, 1)
+        report[query] = 1000 * (time.perf_counter() - start)
+    return report
+
+
+@click.command()
+@click.option("--video-path", required=True, help="Video index to benchmark, as registered by process_video.")
+@click.option("--image-path", required=True, type=click.Path(exists=True), help="Query image, inside shared_media.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(video_path: str, image_path: str, output: str):
+    """
+    Compare the first image search latency of a fresh server process, cold and after warm-up.
+    """
+    context = multiprocessing.get_context("spawn")
+    report = {}
+    for mode, warm_up in (("cold", False), ("warm", True)):
+        # Every mode runs in a new process, so no model or index is loaded yet.
+        with context.Pool(1) as pool:
+            report[mode] = pool.apply(_first_queries, (video_path, image_path, warm_up))
+    report["first_query_speedup"] = report["cold"]["first_query_ms"] / report["warm"]["first_query_ms"]
+    logger.info(f"Cold start report: {report}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import statistics
+import time
+
+import click
+from loguru import logger
+
+from kubrick_mcp.tools import _extract_clip, search_video_batch
+
+logger = logger.bind(name="ConcurrentToolsBenchmark")
+
+
+async def _search_latencies(video_path: str, queries: list[str]) -> list[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        await search_video_batch(video_path, text_queries=[query], top_k=1)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _benchmark(video_path: str, queries: list[str], clips: int, clip_duration: float) -> dict:
+    idle = await _search_latencies(video_path, queries)
+
+    burst = asyncio.gather(
+        *(_extract_clip(video_path, i * clip_duration, (i + 1) * clip_duration) for i in range(clips))
+    )
+    start = time.perf_counter()
+    during_burst = await _search_latencies(video_path, queries)
+    await burst
+    burst_s = time.perf_counter() - start
+
+    return {
+        "queries": len(queries),
+        "clips": clips,
+        "idle_p50_ms": 1000 * statistics.median(idle),
+        "idle_max_ms": 1000 * max(idle),
+        "burst_p50_ms": 1000 * statistics.median(during_burst),
+        "burst_max_ms": 1000 * max(during_burst),
+        "burst_s": burst_s,
+    }
+
+
+@click.command()
+@click.option("--video-path", required=True, help="Video index to benchmark, as registered by process_video.")
+@click.option("--queries-file", required=True, type=click.Path(exists=True), help="Text file with one query per line.")
+@click.option("--clips", default=10, help="Number of clips extracted concurrently with the searches.")
+@click.option("--clip-duration", default=10.0, help="Duration of each extracted clip, in seconds.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(video_path: str, queries_file: str, clips: int, clip_duration: float, output: str):
+    """
+    Compare search latency when idle against search latency during a burst of clip extractions.
+    """
+    with open(queries_file) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    report = asyncio.run(_benchmark(video_path, queries, clips, clip_duration))
+    logger.info(f"Concurrent tools report: {report}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
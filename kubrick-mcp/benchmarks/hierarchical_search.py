@@ -0,0 +1,67 @@
+import json
+import time
+from statistics import mean
+
+import click
+from loguru import logger
+
+from kubrick_mcp.video.video_search_engine import VideoSearchEngine
+
+logger = logger.bind(name="HierarchicalSearchBenchmark")
+
+
+def _recall(expected: list, found: list) -> float:
+    """Fraction of the flat search top-k clips that the hierarchical search also returned."""
+    if not expected:
+        return 1.0
+    expected_starts = {round(entry["start_time"], 2) for entry in expected}
+    found_starts = {round(entry["start_time"], 2) for entry in found}
+    return len(expected_starts & found_starts) / len(expected_starts)
+
+
+def _timed(fn, *args) -> tuple[list, float]:
+    start = time.perf_counter()
+    results = fn(*args)
+    return results, (time.perf_counter() - start) * 1000.0
+
+
+@click.command()
+@click.option("--video-path", required=True, help="Video index to benchmark, as registered by process_video.")
+@click.option("--queries-file", required=True, type=click.Path(exists=True), help="Text file with one query per line.")
+@click.option("--top-k", default=5, help="Number of results compared between flat and hierarchical search.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(video_path: str, queries_file: str, top_k: int, output: str):
+    """
+    Compare recall and latency of hierarchical (coarse-to-fine) search against the flat search.
+    """
+    with open(queries_file) as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    flat_engine = VideoSearchEngine(video_path, hierarchical=False)
+    hierarchical_engine = VideoSearchEngine(video_path, hierarchical=True)
+    logger.info(f"Video has {hierarchical_engine.segments.size} segments, benchmarking {len(queries)} queries")
+
+    report = {}
+    for method in ("search_by_speech", "search_by_caption"):
+        recalls, flat_latencies, hierarchical_latencies = [], [], []
+        for query in queries:
+            expected, flat_ms = _timed(getattr(flat_engine, method), query, top_k)
+            found, hierarchical_ms = _timed(getattr(hierarchical_engine, method), query, top_k)
+            recalls.append(_recall(expected, found))
+            flat_latencies.append(flat_ms)
+            hierarchical_latencies.append(hierarchical_ms)
+
+        report[method] = {
+            f"recall@{top_k}": mean(recalls),
+            "flat_latency_ms": mean(flat_latencies),
+            "hierarchical_latency_ms": mean(hierarchical_latencies),
+        }
+        logger.info(f"{method}: {report[method]}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+from typing import List
+
+import click
+from loguru import logger
+
+logger = logger.bind(name="TranscriptEmbeddingsBenchmark")
+
+
+def _load_texts(video_path: str | None, texts_file: str | None) -> List[str]:
+    if texts_file:
+        with open(texts_file) as f:
+            return [line.rstrip("\n") for line in f]
+    import kubrick_mcp.video.ingestion.registry as registry
+
+    view = registry.get_table(video_path).audio_chunks_view
+    return [row["chunk_text"] for row in view.select(view.chunk_text).collect()]
+
+
+async def _embed_per_rows(texts: List[str], model: str) -> int:
+    """Embed like pixeltable's `embeddings` UDF: 32 rows per request, all in flight at once.
+
+    Empty texts are left out, as the API rejects them.
+    """
+    from openai import AsyncOpenAI
+
+    from kubrick_mcp.config import get_settings
+
+    client = AsyncOpenAI(api_key=get_settings().OPENAI_API_KEY)
+    texts = [text for text in texts if text and text.strip()]
+    batches = [texts[i : i + 32] for i in range(0, len(texts), 32)]
+    await asyncio.gather(*[client.embeddings.create(input=batch, model=model) for batch in batches])
+    return len(batches)
+
+
+async def _compare(texts: List[str], model: str) -> dict:
+    from kubrick_mcp.video.text_embeddings import get_text_embedder
+
+    start = time.perf_counter()
+    per_rows_requests = await _embed_per_rows(texts, model)
+    per_rows_s = time.perf_counter() - start
+
+    embedder = get_text_embedder(model)
+    start = time.perf_counter()
+    await embedder.embed(texts)
+    batched_s = time.perf_counter() - start
+
+    return {
+        "rows": len(texts),
+        "empty_rows": embedder.stats["empty"],
+        "duplicate_rows": embedder.stats["duplicates"],
+        "pixeltable": {"requests": per_rows_requests, "seconds": per_rows_s},
+        "batched": {
+            "requests": embedder.stats["requests"],
+            "seconds": batched_s,
+            "rate_limit_wait_s": embedder.stats["rate_limit_wait_s"],
+        },
+        "requests_saved": per_rows_requests - embedder.stats["requests"],
+        "time_reduction_pct": 100 * (1 - batched_s / per_rows_s) if per_rows_s else 0.0,
+    }
+
+
+@click.command()
+@click.option("--video-path", default=None, help="Video index whose transcript chunks to embed.")
+@click.option("--texts-file", default=None, help="Text file with one transcript chunk per line, instead of a video.")
+@click.option("--model", default=None, help="OpenAI embedding model, the configured one if not set.")
+@click.option("--output", default=None, help="Optional path to write the JSON report to.")
+def run_benchmark(video_path: str, texts_file: str, model: str, output: str):
+    """
+    Compare the requests and time to embed the transcript chunks of a video with pixeltable's `embeddings`
+    and with the batched, deduplicated embedder used by new transcript indexes.
+    """
+    from kubrick_mcp.config import get_settings
+
+    if not video_path and not texts_file:
+        raise click.UsageError("Either --video-path or --texts-file is required")
+    model = model or get_settings().TRANSCRIPT_SIMILARITY_EMBD_MODEL
+
+    report = asyncio.run(_compare(_load_texts(video_path, texts_file), model))
+    logger.info(f"Transcript embeddings report: {json.dumps(report, indent=4)}")
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=4)
+
+
+if __name__ == "__main__":
+    run_benchmark()
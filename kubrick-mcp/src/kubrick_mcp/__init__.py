@@ -1,3 +0,0 @@
-from kubrick_mcp.opik_utils import configure
-
-configure()
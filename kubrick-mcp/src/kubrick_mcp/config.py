@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -11,6 +12,11 @@ class Settings(BaseSettings):
     OPIK_WORKSPACE: str = "default"
     OPIK_PROJECT: str = "kubrick-mcp"
 
+    # --- Prompt Store Configuration ---
+    PROMPT_CACHE_TTL_SECONDS: float = 300.0
+    PROMPT_CIRCUIT_BREAKER_FAILURES: int = 3
+    PROMPT_CIRCUIT_BREAKER_COOLDOWN_SECONDS: float = 60.0
+
     # --- OPENAI Configuration ---
     OPENAI_API_KEY: str
     AUDIO_TRANSCRIPT_MODEL: str = "gpt-4o-mini-transcribe"  # Whisper tiny model 37M
@@ -33,6 +39,23 @@ class Settings(BaseSettings):
     IMAGE_RESIZE_HEIGHT: int = 768
     CAPTION_SIMILARITY_EMBD_MODEL: str = "openai/clip-vit-base-patch32"
 
+    # --- CLIP Embedding Configuration ---
+    # "cpu": batched CPU inference pinned to the container's CPU quota, "huggingface": pixeltable's `clip`.
+    CLIP_EMBEDDING_BACKEND: Literal["cpu", "huggingface"] = "cpu"
+    CLIP_BATCH_SIZE: int = 64
+    CLIP_MAX_BATCH_TOKENS: int = 2048
+    CLIP_INT8: bool = False
+    CLIP_NUM_THREADS: int = 0
+
+    # --- Transcript Embedding Configuration ---
+    # "batched": large deduplicated requests to OpenAI, "pixeltable": pixeltable's `embeddings`, 32 rows per request.
+    TRANSCRIPT_EMBEDDING_BACKEND: Literal["batched", "pixeltable"] = "batched"
+    TRANSCRIPT_EMBEDDING_BATCH_SIZE: int = 1024
+    TRANSCRIPT_EMBEDDING_REQUEST_SIZE: int = 256
+    TRANSCRIPT_EMBEDDING_MAX_REQUEST_TOKENS: int = 100_000
+    TRANSCRIPT_EMBEDDING_MAX_CONCURRENCY: int = 4
+    TRANSCRIPT_EMBEDDING_CACHE_SIZE: int = 4096
+
     # --- Caption Similarity Search Configuration ---
     CAPTION_MODEL_PROMPT: str = "Describe what is happening in the image"
     DELTA_SECONDS_FRAME_INTERVAL: float = 5.0
@@ -43,6 +66,30 @@ class Settings(BaseSettings):
     VIDEO_CLIP_IMAGE_SEARCH_TOP_K: int = 1
     QUESTION_ANSWER_TOP_K: int = 3
 
+    # --- Hierarchical Search Configuration ---
+    SEGMENT_DURATION_SECONDS: float = 60.0
+    HIERARCHICAL_SEARCH_TOP_SEGMENTS: int = 3
+    HIERARCHICAL_SEARCH_MIN_SEGMENTS: int = 10
+
+    # --- Warm-up Configuration ---
+    WARMUP_ENABLED: bool = True
+    WARMUP_HOT_INDEXES: int = 3
+    WARMUP_MAX_ATTEMPTS: int = 3
+    WARMUP_RETRY_BACKOFF_SECONDS: float = 5.0
+
+    # --- Tool Execution Configuration ---
+    MEDIA_WORKERS: int = 2
+
+    # --- Storage Configuration ---
+    # Media directory shared with the API. Query image paths sent by the API are relative to it.
+    SHARED_MEDIA_DIR: str = "shared_media"
+    # Indexes built next to pixeltable's, like the quantized ones. Not relative to the working directory.
+    DATA_DIR: str = "~/.kubrick"
+
+    # --- Embedding Quantization Configuration ---
+    EMBEDDING_QUANTIZATION: Literal["none", "int8"] = "none"
+    QUANTIZATION_RESCORE_FACTOR: int = 4
+
 
 @lru_cache(maxsize=1)
 def get_settings() -> Settings:
@@ -0,0 +1,64 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Optional
+
+from loguru import logger
+
+from kubrick_mcp.config import get_settings
+
+logger = logger.bind(name="ToolExecutors")
+
+settings = get_settings()
+
+# pixeltable keeps a single connection and transaction per process, so all the index queries of the
+# server run on one thread. They are short, and no longer wait behind ffmpeg or ingestion.
+search_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kubrick-search")
+
+# ffmpeg runs in subprocesses, its threads only wait on them.
+media_executor = ThreadPoolExecutor(max_workers=settings.MEDIA_WORKERS, thread_name_prefix="kubrick-media")
+
+_ingestion_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_ingestion_executor() -> ProcessPoolExecutor:
+    """Get the ingestion process pool, started lazily on the first video to process.
+
+    Videos are processed and their indexes quantized in a separate process with its own pixeltable
+    connection, so the server keeps answering searches in the meantime. Both processes share the pixeltable
+    catalog, which pixeltable (>= 0.4) coordinates itself: its cached table metadata is validated against
+    the store at every transaction boundary, and concurrent writes are serialized by the database.
+
+    The server's own state shared across processes is guarded here instead:
+    - a single worker is used, so the index registry, a file that each ingestion rewrites as a whole, and
+      the quantized indexes have one writer, which only renames complete files into place;
+    - the search thread reloads the registry once an ingestion is done (see `process_video`), and reloads
+      a quantized index when its file changes, so it never reads tables that are still being built.
+    """
+    global _ingestion_executor
+    if _ingestion_executor is None:
+        _ingestion_executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    return _ingestion_executor
+
+
+async def run_search(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run index queries and embedding inference on the search thread."""
+    return await asyncio.get_running_loop().run_in_executor(search_executor, partial(fn, *args, **kwargs))
+
+
+async def run_media(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run ffmpeg work on the media thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(media_executor, partial(fn, *args, **kwargs))
+
+
+async def run_ingestion(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run video ingestion and other index writes in the ingestion process. `fn` and its arguments must be picklable."""
+    global _ingestion_executor
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_ingestion_executor(), partial(fn, *args, **kwargs))
+    except BrokenProcessPool:
+        logger.error("Ingestion process died, it will be restarted on the next video")
+        _ingestion_executor = None
+        raise
@@ -1,8 +1,6 @@
 import os
 
-import opik
 from loguru import logger
-from opik.configurator.configure import OpikConfigurator
 
 from kubrick_mcp.config import get_settings
 
@@ -10,6 +8,9 @@ settings = get_settings()
 
 
 def configure() -> None:
+    import opik
+    from opik.configurator.configure import OpikConfigurator
+
     if settings.OPIK_API_KEY and settings.OPIK_PROJECT:
         try:
             client = OpikConfigurator(api_key=settings.OPIK_API_KEY)
@@ -1,10 +1,20 @@
-import opik
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict
+
 from loguru import logger
 
-client = opik.Opik()
+from kubrick_mcp.config import get_settings
+
+if TYPE_CHECKING:
+    import opik
 
 logger = logger.bind(name="Prompts")
 
+settings = get_settings()
+
 
 ROUTING_SYSTEM_PROMPT = """
 You are a routing assistant responsible for determining whether the user needs 
@@ -32,9 +42,16 @@ The tools available are:
 - 'get_video_clip_from_user_query': This tool is used to get a clip from the video based on the user query.
 - 'get_video_clip_from_image': This tool is used to get a clip from the video based on an image provided by the user.
 - 'ask_question_about_video': This tool is used to get some information about the video.
+- 'get_video_clip_from_time_range': This tool is used to get a clip from the video based on the user query, when the user refers to a specific part of the video (e.g. "after minute 34", "in the second half").
+- 'ask_question_about_video_time_range': This tool is used to get some information about a specific part of the video.
+- 'get_highlight_reel_from_user_queries': This tool is used to get a single clip with several moments of the video, when the user asks for more than one moment at once (e.g. "show me all the goals").
+- 'get_highlight_reel_from_time_windows': This tool is used to get a single clip with several parts of the video, when the user gives the times of each part.
+
+Time ranges are always expressed in seconds from the start of the video.
 
 # Additional rules:
 - If the user has provided an image, you should always use the 'get_video_clip_from_image' tool.
+- If the user asks for several things at once (e.g. "a clip of the goal and who scored"), call one tool for each of them.
 
 # Current information:
 - Is image provided: {is_image_provided}
@@ -54,55 +71,123 @@ to make the conversation more engaging and interesting.
 """
 
 
-def routing_system_prompt() -> str:
-    _prompt_id = "routing-system-prompt"
-    try:
-        prompt = client.get_prompt(_prompt_id)
-        if prompt is None:
-            prompt = client.create_prompt(
-                name=_prompt_id,
-                prompt=ROUTING_SYSTEM_PROMPT,
+@lru_cache(maxsize=1)
+def _get_client() -> "opik.Opik":
+    """Configure Opik and create its client on the first prompt fetch, off the server startup path."""
+    import opik
+
+    from kubrick_mcp.opik_utils import configure
+
+    configure()
+    return opik.Opik()
+
+
+def _fetch_prompt(prompt_id: str, default: str) -> str:
+    """Fetch the latest version of a prompt from Opik, creating it from the default if it does not exist."""
+    client = _get_client()
+    prompt = client.get_prompt(prompt_id)
+    if prompt is None:
+        prompt = client.create_prompt(
+            name=prompt_id,
+            prompt=default,
+        )
+        logger.info(f"System prompt created. \n {prompt.commit=} \n {prompt.prompt=}")
+    return prompt.prompt
+
+
+class PromptStore:
+    """An in-memory store of the Opik prompts, refreshed in the background.
+
+    Prompts are always served from memory: the hardcoded default until the first successful fetch, then the
+    last fetched version. Entries older than the TTL are refreshed by a background thread while the cached
+    version keeps being served. After `failure_threshold` consecutive failures, a circuit breaker stops
+    calling Opik for `cooldown` seconds.
+    """
+
+    def __init__(self, ttl: float, failure_threshold: int, cooldown: float):
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._prompts: Dict[str, str] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._refreshing = set()
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prompt-refresh")
+
+    def get(self, prompt_id: str, default: str) -> str:
+        """Get a prompt from memory, scheduling a background refresh when it is missing or stale.
+
+        Args:
+            prompt_id (str): The Opik prompt name.
+            default (str): The hardcoded prompt, served until a version was fetched from Opik.
+
+        Returns:
+            str: The prompt text.
+        """
+        if time.monotonic() - self._fetched_at.get(prompt_id, float("-inf")) > self.ttl:
+            self.refresh(prompt_id, default)
+        return self._prompts.get(prompt_id, default)
+
+    def refresh(self, prompt_id: str, default: str) -> None:
+        """Refresh a prompt in the background, unless it is already refreshing or the circuit is open."""
+        with self._lock:
+            if prompt_id in self._refreshing or time.monotonic() < self._open_until:
+                return
+            self._refreshing.add(prompt_id)
+        self._executor.submit(self._refresh, prompt_id, default)
+
+    def _refresh(self, prompt_id: str, default: str) -> None:
+        try:
+            prompt = _fetch_prompt(prompt_id, default)
+        except Exception as e:
+            with self._lock:
+                self._failures += 1
+                if self._failures >= self.failure_threshold:
+                    self._open_until = time.monotonic() + self.cooldown
+                    logger.warning(f"Opik failed {self._failures} times, not calling it for {self.cooldown}s")
+            served = "cached" if prompt_id in self._prompts else "hardcoded"
+            logger.warning(
+                f"Couldn't retrieve prompt {prompt_id} from Opik, check credentials! Using {served} prompt: {e}"
             )
-            logger.info(f"System prompt created. \n {prompt.commit=} \n {prompt.prompt=}")
-        return prompt.prompt
-    except Exception:
-        logger.warning("Couldn't retrieve prompt from Opik, check credentials! Using hardcoded prompt.")
-        logger.warning(f"Using hardcoded prompt: {ROUTING_SYSTEM_PROMPT}")
-        prompt = ROUTING_SYSTEM_PROMPT
-    return prompt
+        else:
+            with self._lock:
+                self._prompts[prompt_id] = prompt
+                self._fetched_at[prompt_id] = time.monotonic()
+                self._failures = 0
+        finally:
+            with self._lock:
+                self._refreshing.discard(prompt_id)
+
+
+prompt_store = PromptStore(
+    ttl=settings.PROMPT_CACHE_TTL_SECONDS,
+    failure_threshold=settings.PROMPT_CIRCUIT_BREAKER_FAILURES,
+    cooldown=settings.PROMPT_CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+)
+
+_DEFAULT_PROMPTS = {
+    "routing-system-prompt": ROUTING_SYSTEM_PROMPT,
+    "tool-use-system-prompt": TOOL_USE_SYSTEM_PROMPT,
+    "general-system-prompt": GENERAL_SYSTEM_PROMPT,
+}
+
+
+def warm_up_prompts() -> None:
+    """Start fetching every prompt from Opik in the background."""
+    for prompt_id, default in _DEFAULT_PROMPTS.items():
+        prompt_store.refresh(prompt_id, default)
+
+
+def routing_system_prompt() -> str:
+    return prompt_store.get("routing-system-prompt", ROUTING_SYSTEM_PROMPT)
 
 
 def tool_use_system_prompt() -> str:
-    _prompt_id = "tool-use-system-prompt"
-    try:
-        prompt = client.get_prompt(_prompt_id)
-        if prompt is None:
-            prompt = client.create_prompt(
-                name=_prompt_id,
-                prompt=TOOL_USE_SYSTEM_PROMPT,
-            )
-            logger.info(f"System prompt created. \n {prompt.commit=} \n {prompt.prompt=}")
-        return prompt.prompt
-    except Exception:
-        logger.warning("Couldn't retrieve prompt from Opik, check credentials! Using hardcoded prompt.")
-        logger.warning(f"Using hardcoded prompt: {TOOL_USE_SYSTEM_PROMPT}")
-        prompt = TOOL_USE_SYSTEM_PROMPT
-    return prompt
+    return prompt_store.get("tool-use-system-prompt", TOOL_USE_SYSTEM_PROMPT)
 
 
 def general_system_prompt() -> str:
-    _prompt_id = "general-system-prompt"
-    try:
-        prompt = client.get_prompt(_prompt_id)
-        if prompt is None:
-            prompt = client.create_prompt(
-                name=_prompt_id,
-                prompt=GENERAL_SYSTEM_PROMPT,
-            )
-            logger.info(f"System prompt created. \n {prompt.commit=} \n {prompt.prompt=}")
-        return prompt.prompt
-    except Exception:
-        logger.warning("Couldn't retrieve prompt from Opik, check credentials! Using hardcoded prompt.")
-        logger.warning(f"Using hardcoded prompt: {GENERAL_SYSTEM_PROMPT}")
-        prompt = GENERAL_SYSTEM_PROMPT
-    return prompt
+    return prompt_store.get("general-system-prompt", GENERAL_SYSTEM_PROMPT)
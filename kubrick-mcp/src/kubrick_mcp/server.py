@@ -1,14 +1,23 @@
 import click
 from fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
 
-from kubrick_mcp.prompts import general_system_prompt, routing_system_prompt, tool_use_system_prompt
+from kubrick_mcp.prompts import general_system_prompt, routing_system_prompt, tool_use_system_prompt, warm_up_prompts
 from kubrick_mcp.resources import list_tables
 from kubrick_mcp.tools import (
     ask_question_about_video,
+    ask_question_about_video_time_range,
+    get_highlight_reel_from_time_windows,
+    get_highlight_reel_from_user_queries,
     get_video_clip_from_image,
+    get_video_clip_from_time_range,
     get_video_clip_from_user_query,
     process_video,
+    quantize_video_index,
+    search_video_batch,
 )
+from kubrick_mcp.warmup import readiness, start_warm_up
 
 
 def add_mcp_tools(mcp: FastMCP):
@@ -19,6 +28,13 @@ def add_mcp_tools(mcp: FastMCP):
         tags={"video", "process"},
     )
 
+    mcp.add_tool(
+        name="quantize_video_index",
+        description="Re-quantize the embedding indexes of a video to int8 and report memory saved vs recall lost.",
+        fn=quantize_video_index,
+        tags={"video", "process", "quantization"},
+    )
+
     mcp.add_tool(
         name="get_video_clip_from_user_query",
         description="Use this tool to get a video clip from a video file based on a user query or question.",
@@ -40,6 +56,41 @@ def add_mcp_tools(mcp: FastMCP):
         tags={"ask", "question", "information"},
     )
 
+    mcp.add_tool(
+        name="get_video_clip_from_time_range",
+        description="Use this tool to get a video clip based on a user query, restricted to a time range of the video.",
+        fn=get_video_clip_from_time_range,
+        tags={"video", "clip", "query", "time_range"},
+    )
+
+    mcp.add_tool(
+        name="ask_question_about_video_time_range",
+        description="Use this tool to get an answer to a question about a specific time range of the video.",
+        fn=ask_question_about_video_time_range,
+        tags={"ask", "question", "information", "time_range"},
+    )
+
+    mcp.add_tool(
+        name="search_video_batch",
+        description="Run a batch of text and image searches over one video and return the matches of each query.",
+        fn=search_video_batch,
+        tags={"video", "search", "batch"},
+    )
+
+    mcp.add_tool(
+        name="get_highlight_reel_from_user_queries",
+        description="Use this tool to get a single video clip with several moments of the video, one per user query.",
+        fn=get_highlight_reel_from_user_queries,
+        tags={"video", "clip", "query", "highlight"},
+    )
+
+    mcp.add_tool(
+        name="get_highlight_reel_from_time_windows",
+        description="Use this tool to get a single video clip with several time windows of the video.",
+        fn=get_highlight_reel_from_time_windows,
+        tags={"video", "clip", "time_range", "highlight"},
+    )
+
 
 def add_mcp_resources(mcp: FastMCP):
     mcp.add_resource_fn(
@@ -51,6 +102,13 @@ def add_mcp_resources(mcp: FastMCP):
     )
 
 
+def add_mcp_routes(mcp: FastMCP):
+    @mcp.custom_route("/ready", methods=["GET"])
+    async def ready(request: Request) -> JSONResponse:
+        """Readiness probe: 200 once the warm-up is over, "degraded" if the models failed to load, 503 until then."""
+        return JSONResponse(readiness.to_dict(), status_code=200 if readiness.ready else 503)
+
+
 def add_mcp_prompts(mcp: FastMCP):
     mcp.add_prompt(
         fn=routing_system_prompt,
@@ -79,6 +137,7 @@ mcp = FastMCP("VideoProcessor")
 add_mcp_prompts(mcp)
 add_mcp_tools(mcp)
 add_mcp_resources(mcp)
+add_mcp_routes(mcp)
 
 
 @click.command()
@@ -89,6 +148,8 @@ def run_mcp(port, host, transport):
     """
     Run the FastMCP server with the specified port, host, and transport protocol.
     """
+    warm_up_prompts()
+    start_warm_up()
     mcp.run(host=host, port=port, transport=transport)
 
 
@@ -1,21 +1,81 @@
-from typing import Dict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from loguru import logger
 
+import kubrick_mcp.video.ingestion.registry as registry
 from kubrick_mcp.config import get_settings
-from kubrick_mcp.video.ingestion.tools import extract_video_clip
-from kubrick_mcp.video.ingestion.video_processor import VideoProcessor
+from kubrick_mcp.executors import run_ingestion, run_media, run_search
+from kubrick_mcp.video.ingestion.tools import extract_highlight_reel, extract_video_clip
 from kubrick_mcp.video.video_search_engine import VideoSearchEngine
 
 logger = logger.bind(name="MCPVideoTools")
-video_processor = VideoProcessor()
 settings = get_settings()
 
 
-def process_video(video_path: str) -> str:
+@lru_cache(maxsize=1)
+def _get_video_processor():
+    """Create the video processor on first use, pixeltable and its functions are slow to import."""
+    from kubrick_mcp.video.ingestion.video_processor import VideoProcessor
+
+    return VideoProcessor()
+
+
+def _best_clip_for_query(
+    search_engine: VideoSearchEngine,
+    user_query: str,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Optional[Dict[str, float]]:
+    """Pick the best matching clip between speech and caption similarity search."""
+    speech_clips = search_engine.search_by_speech(
+        user_query, settings.VIDEO_CLIP_SPEECH_SEARCH_TOP_K, start_time, end_time
+    )
+    caption_clips = search_engine.search_by_caption(
+        user_query, settings.VIDEO_CLIP_CAPTION_SEARCH_TOP_K, start_time, end_time
+    )
+    if not speech_clips and not caption_clips:
+        return None
+
+    speech_sim = speech_clips[0]["similarity"] if speech_clips else 0
+    caption_sim = caption_clips[0]["similarity"] if caption_clips else 0
+
+    return speech_clips[0] if speech_sim > caption_sim or not caption_clips else caption_clips[0]
+
+
+def _search_best_clip(
+    video_path: str,
+    user_query: str,
+    start_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Optional[Dict[str, float]]:
+    return _best_clip_for_query(VideoSearchEngine(video_path), user_query, start_time, end_time)
+
+
+async def _extract_clip(video_path: str, start_time: float, end_time: float) -> str:
+    """Extract a clip on the media pool and return its path."""
+    video_clip = await run_media(
+        extract_video_clip,
+        video_path=video_path,
+        start_time=start_time,
+        end_time=end_time,
+        output_path=f"./shared_media/{str(uuid4())}.mp4",
+    )
+    return video_clip.filename
+
+
+def _no_matching_clip(message: str) -> Dict[str, Optional[str]]:
+    """The result of a clip tool when the search found nothing to extract."""
+    logger.info(message)
+    return {"clip_path": None, "message": message}
+
+
+async def process_video(video_path: str) -> str:
     """Process a video file and prepare it for searching.
 
+    The video is processed in the ingestion process, so searches keep being served in the meantime.
+
     Args:
         video_path (str): Path to the video file to process.
 
@@ -25,6 +85,15 @@ def process_video(video_path: str) -> str:
     Raises:
         ValueError: If the video file cannot be found or processed.
     """
+    is_done = await run_ingestion(_process_video, video_path)
+    # Pick up the index registered by the ingestion process.
+    await run_search(registry.reload_registry)
+    return is_done
+
+
+def _process_video(video_path: str) -> str:
+    registry.reload_registry()
+    video_processor = _get_video_processor()
     exists = video_processor._check_if_exists(video_path)
     if exists:
         logger.info(f"Video index for '{video_path}' already exists and is ready for use.")
@@ -34,7 +103,35 @@ def process_video(video_path: str) -> str:
     return is_done
 
 
-def get_video_clip_from_user_query(video_path: str, user_query: str) -> Dict[str, str]:
+async def quantize_video_index(video_path: str) -> Dict[str, Dict[str, Any]]:
+    """Re-quantize the embedding indexes of an already processed video to int8.
+
+    The indexes are quantized in the ingestion process, so searches keep being served in the meantime. They
+    are used by the next searches, once written.
+
+    Args:
+        video_path (str): Path to the processed video file.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: For each quantized index, the bytes it adds on disk, the memory scanned
+            per query and the recall lost with and without full-precision re-scoring.
+
+    Raises:
+        ValueError: If the video has not been processed yet.
+    """
+    return await run_ingestion(_quantize_video_index, video_path)
+
+
+def _quantize_video_index(video_path: str) -> Dict[str, Dict[str, Any]]:
+    registry.reload_registry()
+    video_processor = _get_video_processor()
+    if not video_processor._check_if_exists(video_path):
+        raise ValueError(f"Video index for '{video_path}' does not exist. Process the video first.")
+    video_processor.setup_table(video_name=video_path)
+    return video_processor.quantize_indexes()
+
+
+async def get_video_clip_from_user_query(video_path: str, user_query: str) -> Dict[str, Optional[str]]:
     """Get a video clip based on the user query using speech and caption similarity.
 
     Args:
@@ -42,54 +139,77 @@ def get_video_clip_from_user_query(video_path: str, user_query: str) -> Dict[str
         user_query (str): The user query to search for.
 
     Returns:
-        Dict[str, str]: Dictionary containing:
-            filename (str): Path to the extracted video clip.
+        Dict[str, Optional[str]]: Dictionary containing:
+            clip_path (Optional[str]): Path to the extracted video clip, None if nothing matched.
+            message (str): Why no clip was extracted, only when `clip_path` is None.
     """
-    search_engine = VideoSearchEngine(video_path)
+    video_clip_info = await run_search(_search_best_clip, video_path, user_query)
+    if not video_clip_info:
+        return _no_matching_clip(f"No matching clip found for '{user_query}' in video '{video_path}'.")
 
-    speech_clips = search_engine.search_by_speech(user_query, settings.VIDEO_CLIP_SPEECH_SEARCH_TOP_K)
-    caption_clips = search_engine.search_by_caption(user_query, settings.VIDEO_CLIP_CAPTION_SEARCH_TOP_K)
+    clip_path = await _extract_clip(video_path, video_clip_info["start_time"], video_clip_info["end_time"])
 
-    speech_sim = speech_clips[0]["similarity"] if speech_clips else 0
-    caption_sim = caption_clips[0]["similarity"] if caption_clips else 0
+    return {"clip_path": clip_path}
 
-    video_clip_info = speech_clips[0] if speech_sim > caption_sim else caption_clips[0]
 
-    video_clip = extract_video_clip(
-        video_path=video_path,
-        start_time=video_clip_info["start_time"],
-        end_time=video_clip_info["end_time"],
-        output_path=f"./shared_media/{str(uuid4())}.mp4",
+async def get_video_clip_from_time_range(
+    video_path: str, user_query: str, start_time: float, end_time: float
+) -> Dict[str, Optional[str]]:
+    """Get a video clip based on the user query, searching only inside a time range of the video.
+
+    Args:
+        video_path (str): The path to the video file.
+        user_query (str): The user query to search for.
+        start_time (float): Start of the time range to search in, in seconds.
+        end_time (float): End of the time range to search in, in seconds.
+
+    Returns:
+        Dict[str, Optional[str]]: Dictionary containing:
+            clip_path (Optional[str]): Path to the extracted video clip, None if nothing matched.
+            message (str): Why no clip was extracted, only when `clip_path` is None.
+
+    Raises:
+        ValueError: If the time range is empty.
+    """
+    if start_time >= end_time:
+        raise ValueError("start_time must be less than end_time")
+
+    video_clip_info = await run_search(_search_best_clip, video_path, user_query, start_time, end_time)
+    if not video_clip_info:
+        return _no_matching_clip(f"No content found between {start_time}s and {end_time}s in video '{video_path}'.")
+
+    clip_path = await _extract_clip(
+        video_path, max(video_clip_info["start_time"], start_time), min(video_clip_info["end_time"], end_time)
     )
 
-    return {"clip_path": video_clip.filename}
+    return {"clip_path": clip_path}
 
 
-def get_video_clip_from_image(video_path: str, user_image: str) -> Dict[str, str]:
+async def get_video_clip_from_image(video_path: str, user_image: str) -> Dict[str, Optional[str]]:
     """Get a video clip based on similarity to a provided image.
 
     Args:
         video_path (str): The path to the video file.
-        user_image (str): The query image encoded in base64 format.
+        user_image (str): The query image, as the path of an image stored by the API, relative to the shared media
+            directory, or encoded in base64.
 
     Returns:
-        Dict[str, str]: Dictionary containing:
-            filename (str): Path to the extracted video clip.
+        Dict[str, Optional[str]]: Dictionary containing:
+            clip_path (Optional[str]): Path to the extracted video clip, None if nothing matched.
+            message (str): Why no clip was extracted, only when `clip_path` is None.
     """
-    search_engine = VideoSearchEngine(video_path)
-    image_clips = search_engine.search_by_image(user_image, settings.VIDEO_CLIP_IMAGE_SEARCH_TOP_K)
-
-    video_clip = extract_video_clip(
-        video_path=video_path,
-        start_time=image_clips[0]["start_time"],
-        end_time=image_clips[0]["end_time"],
-        output_path=f"./shared_media/{str(uuid4())}.mp4",
+    image_clips = await run_search(
+        lambda: VideoSearchEngine(video_path).search_by_image(user_image, settings.VIDEO_CLIP_IMAGE_SEARCH_TOP_K)
     )
+    if not image_clips:
+        return _no_matching_clip(f"No matching clip found for the image in video '{video_path}'.")
+
+    clip_path = await _extract_clip(video_path, image_clips[0]["start_time"], image_clips[0]["end_time"])
 
-    return {"clip_path": video_clip.filename}
+    return {"clip_path": clip_path}
 
 
-def ask_question_about_video(video_path: str, user_query: str) -> Dict[str, str]:
+async def ask_question_about_video(video_path: str, user_query: str) -> Dict[str, str]:
     """Get relevant captions from the video based on the user's question.
 
     Args:
@@ -100,8 +220,110 @@ def ask_question_about_video(video_path: str, user_query: str) -> Dict[str, str]
         Dict[str, str]: Dictionary containing:
             answer (str): Concatenated relevant captions from the video.
     """
-    search_engine = VideoSearchEngine(video_path)
-    caption_info = search_engine.get_caption_info(user_query, settings.QUESTION_ANSWER_TOP_K)
+    caption_info = await run_search(
+        lambda: VideoSearchEngine(video_path).get_caption_info(user_query, settings.QUESTION_ANSWER_TOP_K)
+    )
 
     answer = "\n".join(entry["caption"] for entry in caption_info)
     return {"answer": answer}
+
+
+async def ask_question_about_video_time_range(
+    video_path: str, user_query: str, start_time: float, end_time: float
+) -> Dict[str, str]:
+    """Get relevant captions and speech from a time range of the video based on the user's question.
+
+    Args:
+        video_path (str): The path to the video file.
+        user_query (str): The question to search for relevant captions.
+        start_time (float): Start of the time range to search in, in seconds.
+        end_time (float): End of the time range to search in, in seconds.
+
+    Returns:
+        Dict[str, str]: Dictionary containing:
+            answer (str): Concatenated relevant captions and speech from the time range.
+    """
+    if start_time >= end_time:
+        raise ValueError("start_time must be less than end_time")
+
+    def search():
+        search_engine = VideoSearchEngine(video_path)
+        return (
+            search_engine.get_caption_info(user_query, settings.QUESTION_ANSWER_TOP_K, start_time, end_time),
+            search_engine.get_speech_info(user_query, settings.QUESTION_ANSWER_TOP_K, start_time, end_time),
+        )
+
+    caption_info, speech_info = await run_search(search)
+
+    answer = "\n".join([entry["caption"] for entry in caption_info] + [entry["text"] for entry in speech_info])
+    return {"answer": answer}
+
+
+async def search_video_batch(
+    video_path: str,
+    text_queries: Optional[List[str]] = None,
+    image_queries: Optional[List[str]] = None,
+    top_k: int = 1,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Run many text and image searches over one video in a single call.
+
+    Args:
+        video_path (str): The path to the video file.
+        text_queries (Optional[List[str]]): Queries matched against speech and frame captions.
+        image_queries (Optional[List[str]]): Query images, as paths of images stored by the API or in base64.
+        top_k (int): Number of results to return per query and modality.
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: Dictionary containing:
+            text_results: Per text query, the speech and caption matches and the `best` clip between them.
+            image_results: Per image query, the best matching frames.
+    """
+    results = await run_search(
+        lambda: VideoSearchEngine(video_path).batch_search(text_queries or [], image_queries or [], top_k)
+    )
+
+    for entry in results["text_results"]:
+        candidates = entry["speech"][:1] + entry["caption"][:1]
+        entry["best"] = max(candidates, key=lambda clip: clip["similarity"]) if candidates else None
+    return results
+
+
+async def get_highlight_reel_from_time_windows(video_path: str, time_windows: List[List[float]]) -> Dict[str, Any]:
+    """Assemble several moments of a video, given as time windows, into a single video clip.
+
+    Args:
+        video_path (str): The path to the video file.
+        time_windows (List[List[float]]): [start_time, end_time] pairs in seconds.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            clip_path (str): Path to the assembled video clip.
+            windows (List[List[float]]): The merged windows included in the clip.
+            stream_copied_ratio (float): Fraction of the clip that was stream-copied instead of re-encoded.
+    """
+    return await run_media(
+        extract_highlight_reel,
+        video_path=video_path,
+        windows=[(start_time, end_time) for start_time, end_time in time_windows],
+        output_path=f"./shared_media/{str(uuid4())}.mp4",
+    )
+
+
+async def get_highlight_reel_from_user_queries(video_path: str, user_queries: List[str]) -> Dict[str, Any]:
+    """Assemble the best matching moment of each user query into a single video clip.
+
+    Args:
+        video_path (str): The path to the video file.
+        user_queries (List[str]): One query per moment to include in the clip.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            clip_path (str): Path to the assembled video clip.
+            windows (List[List[float]]): The merged windows included in the clip.
+            stream_copied_ratio (float): Fraction of the clip that was stream-copied instead of re-encoded.
+    """
+    results = await search_video_batch(video_path, text_queries=user_queries)
+    windows = [
+        (entry["best"]["start_time"], entry["best"]["end_time"]) for entry in results["text_results"] if entry["best"]
+    ]
+    return await get_highlight_reel_from_time_windows(video_path, windows)
@@ -0,0 +1,161 @@
+import math
+import os
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from loguru import logger
+from PIL import Image
+
+from kubrick_mcp.config import get_settings
+
+logger = logger.bind(name="ClipBackend")
+
+settings = get_settings()
+
+
+def cpu_quota() -> int:
+    """Get the number of CPUs the process may use: its container's CPU quota, else the CPUs it is pinned to."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+    quota = None
+    try:
+        # cgroup v2: "<quota> <period>", or "max <period>" without a limit.
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: a quota of -1 means no limit.
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+    return max(1, min(cpus, math.ceil(quota))) if quota else cpus
+
+
+@lru_cache(maxsize=1)
+def pin_torch_threads(num_threads: int = 0) -> int:
+    """Size torch's thread pools to the CPU quota once per process, instead of to the host's CPU count.
+
+    Args:
+        num_threads (int): Number of intra-op threads, 0 to use the CPU quota.
+
+    Returns:
+        int: The number of intra-op threads.
+    """
+    import torch
+
+    num_threads = num_threads or cpu_quota()
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before any parallel work ran in the process.
+        pass
+    logger.info(f"Running CLIP inference on {num_threads} threads")
+    return num_threads
+
+
+class ClipBackend:
+    """Batched CPU inference for a CLIP model.
+
+    Texts are sorted by token length and split into batches that hold at most `max_batch_tokens` tokens once
+    padded, so short captions are not padded to the length of the longest one. Images are embedded in batches
+    of `batch_size`. With `int8`, the linear layers run with dynamically quantized int8 weights, which are
+    faster on CPU but give slightly different vectors: indexes and queries must use the same setting.
+    """
+
+    def __init__(self, model_id: str, int8: bool = False, batch_size: int = 64, max_batch_tokens: int = 2048):
+        import torch
+        from transformers import CLIPModel, CLIPProcessor
+
+        self.model_id = model_id
+        self.int8 = int8
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+
+        model = CLIPModel.from_pretrained(model_id)
+        model.eval()
+        if int8:
+            self.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.device = "cpu"
+        else:
+            self.device = "cuda" if torch.cuda.is_available() else "cpu"
+            self.model = model.to(self.device)
+        self.processor = CLIPProcessor.from_pretrained(model_id)
+
+    @property
+    def dim(self) -> int:
+        return self.model.config.projection_dim
+
+    def _text_batches(self, token_ids: List[List[int]]) -> List[List[int]]:
+        order = sorted(range(len(token_ids)), key=lambda i: len(token_ids[i]))
+        batches, batch = [], []
+        for i in order:
+            # Sorted by length, so the current text is the longest of its batch.
+            if batch and (
+                len(batch) == self.batch_size or (len(batch) + 1) * len(token_ids[i]) > self.max_batch_tokens
+            ):
+                batches.append(batch)
+                batch = []
+            batch.append(i)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, returning a (len(texts), dim) matrix of unnormalized embeddings in the input order."""
+        import torch
+
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        tokenizer = self.processor.tokenizer
+        token_ids = tokenizer(texts, truncation=True)["input_ids"]
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        with torch.inference_mode():
+            for batch in self._text_batches(token_ids):
+                inputs = tokenizer.pad({"input_ids": [token_ids[i] for i in batch]}, return_tensors="pt")
+                features = self.model.get_text_features(**inputs.to(self.device))
+                embeddings[batch] = features.to("cpu").numpy()
+        return embeddings
+
+    def embed_images(self, images: List[Image.Image]) -> np.ndarray:
+        """Embed images, returning a (len(images), dim) matrix of unnormalized embeddings in the input order."""
+        import torch
+
+        if not images:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        embeddings = []
+        with torch.inference_mode():
+            for start in range(0, len(images), self.batch_size):
+                batch = [image.convert("RGB") for image in images[start : start + self.batch_size]]
+                inputs = self.processor(images=batch, return_tensors="pt")
+                embeddings.append(self.model.get_image_features(**inputs.to(self.device)).to("cpu").numpy())
+        return np.concatenate(embeddings).astype(np.float32)
+
+
+def clip_int8_enabled() -> bool:
+    """Whether CLIP embeddings are computed with int8 weights.
+
+    Their vectors differ from the fp32 ones, so the setting is stored with every index, which can then only
+    be queried with the same setting.
+    """
+    return settings.CLIP_EMBEDDING_BACKEND == "cpu" and settings.CLIP_INT8
+
+
+@lru_cache(maxsize=2)
+def get_clip_backend(model_id: str) -> ClipBackend:
+    """Get the CLIP backend of a model, created once per process with the configured settings."""
+    if settings.CLIP_EMBEDDING_BACKEND == "cpu":
+        pin_torch_threads(settings.CLIP_NUM_THREADS)
+    return ClipBackend(
+        model_id,
+        int8=clip_int8_enabled(),
+        batch_size=settings.CLIP_BATCH_SIZE,
+        max_batch_tokens=settings.CLIP_MAX_BATCH_TOKENS,
+    )
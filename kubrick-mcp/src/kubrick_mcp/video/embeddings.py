@@ -0,0 +1,71 @@
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from kubrick_mcp.config import get_settings
+from kubrick_mcp.video.clip_backend import get_clip_backend
+
+settings = get_settings()
+
+
+@lru_cache(maxsize=1)
+def _get_openai_client():
+    from openai import OpenAI
+
+    return OpenAI(api_key=settings.OPENAI_API_KEY)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors along the last axis, so dot products are cosine similarities.
+
+    Args:
+        vectors (np.ndarray): A single vector or a matrix of row vectors.
+
+    Returns:
+        np.ndarray: The normalized vectors, as float32.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def embed_clip_texts(texts: List[str], model_id: str) -> np.ndarray:
+    """Embed texts with CLIP, matching the vectors stored by the CLIP embedding indexes.
+
+    Args:
+        texts (List[str]): The texts to embed.
+        model_id (str): The HuggingFace CLIP model id.
+
+    Returns:
+        np.ndarray: A (len(texts), dim) matrix of L2-normalized embeddings.
+    """
+    return normalize(get_clip_backend(model_id).embed_texts(texts))
+
+
+def embed_clip_images(images: List[Image.Image], model_id: str) -> np.ndarray:
+    """Embed images with CLIP, matching the vectors stored by the CLIP embedding indexes.
+
+    Args:
+        images (List[Image.Image]): The images to embed.
+        model_id (str): The HuggingFace CLIP model id.
+
+    Returns:
+        np.ndarray: A (len(images), dim) matrix of L2-normalized embeddings.
+    """
+    return normalize(get_clip_backend(model_id).embed_images(images))
+
+
+def embed_openai_texts(texts: List[str], model: str) -> np.ndarray:
+    """Embed texts with an OpenAI embedding model in a single request.
+
+    Args:
+        texts (List[str]): The texts to embed.
+        model (str): The OpenAI embedding model name.
+
+    Returns:
+        np.ndarray: A (len(texts), dim) matrix of L2-normalized embeddings.
+    """
+    response = _get_openai_client().embeddings.create(input=texts, model=model)
+    return normalize([item.embedding for item in sorted(response.data, key=lambda item: item.index)])
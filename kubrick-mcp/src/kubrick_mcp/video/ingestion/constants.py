@@ -1 +1,6 @@
 DEFAULT_CACHED_TABLES_REGISTRY_DIR = ".records"
+
+QUANTIZED_INDEX_DIR = "quantized"
+FRAMES_QUANTIZED_INDEX = "frames_index"
+CAPTIONS_QUANTIZED_INDEX = "captions_index"
+CHUNKS_QUANTIZED_INDEX = "chunks_index"
@@ -1,6 +1,16 @@
+from typing import Optional
+
 import pixeltable as pxt
+import pixeltable.type_system as ts
+from pixeltable.func import Batch
 from PIL import Image
 
+from kubrick_mcp.config import get_settings
+from kubrick_mcp.video.clip_backend import get_clip_backend
+from kubrick_mcp.video.text_embeddings import EMBEDDING_DIMENSIONS, get_text_embedder
+
+settings = get_settings()
+
 
 @pxt.udf
 def extract_text_from_chunk(transcript: pxt.type_system.Json) -> str:
@@ -32,3 +42,33 @@ def group_sentence_by_frames(
             relevant_text += segment["text"] + " "
 
     return relevant_text.strip()
+
+
+@pxt.udf(batch_size=settings.CLIP_BATCH_SIZE)
+def clip_embed(text: Batch[str], *, model_id: str) -> Batch[pxt.Array[(None,), pxt.Float]]:
+    """Embed texts with the CPU CLIP backend, a drop-in replacement for pixeltable's `clip` in embedding indexes."""
+    return list(get_clip_backend(model_id).embed_texts(text))
+
+
+@clip_embed.overload
+def _(image: Batch[Image.Image], *, model_id: str) -> Batch[pxt.Array[(None,), pxt.Float]]:
+    return list(get_clip_backend(model_id).embed_images(image))
+
+
+@clip_embed.conditional_return_type
+def _(model_id: str) -> ts.ArrayType:
+    from transformers import CLIPConfig
+
+    dim = CLIPConfig.from_pretrained(model_id).projection_dim
+    return ts.ArrayType((dim,), dtype=ts.FloatType(), nullable=False)
+
+
+@pxt.udf(batch_size=settings.TRANSCRIPT_EMBEDDING_BATCH_SIZE)
+async def transcript_embed(text: Batch[str], *, model: str) -> Batch[Optional[pxt.Array[(None,), pxt.Float]]]:
+    """Embed texts with an OpenAI model in large, deduplicated and throttled requests, None for empty ones."""
+    return await get_text_embedder(model).embed(text)
+
+
+@transcript_embed.conditional_return_type
+def _(model: str) -> ts.ArrayType:
+    return ts.ArrayType((EMBEDDING_DIMENSIONS[model],), dtype=ts.FloatType(), nullable=True)
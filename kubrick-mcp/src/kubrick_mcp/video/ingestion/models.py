@@ -1,11 +1,13 @@
 import base64
 import io
-from typing import List, Literal, Union
+from typing import TYPE_CHECKING, List, Literal, Optional, Union
 
-import pixeltable as pxt
 from PIL import Image
 from pydantic import BaseModel, Field, field_validator
 
+if TYPE_CHECKING:
+    import pixeltable as pxt
+
 #####################################
 # Table Registry Models
 #####################################
@@ -20,33 +22,51 @@ class CachedTableMetadata(BaseModel):
         ...,
         description="After chunking audio, getting transcript and splitting it into sentences",
     )
+    segments_table: Optional[str] = Field(
+        default=None,
+        description="Segment-level pooled embeddings used for coarse-to-fine search",
+    )
+    clip_int8: bool = Field(
+        default=False,
+        description="Whether the CLIP embeddings of the index were computed with int8 weights",
+    )
 
 
 class CachedTable:
     video_cache: str = Field(..., description="Path to the video cache")
-    video_table: pxt.Table = Field(..., description="Root video table")
-    frames_view: pxt.Table = Field(..., description="Video frames which were split using a FPS and frame iterator")
-    audio_chunks_view: pxt.Table = Field(
+    video_table: "pxt.Table" = Field(..., description="Root video table")
+    frames_view: "pxt.Table" = Field(..., description="Video frames which were split using a FPS and frame iterator")
+    audio_chunks_view: "pxt.Table" = Field(
         ...,
         description="After chunking audio, getting transcript and splitting it into sentences",
     )
+    segments_table: Optional["pxt.Table"] = Field(
+        default=None,
+        description="Segment-level pooled embeddings used for coarse-to-fine search",
+    )
 
     def __init__(
         self,
         video_name: str,
         video_cache: str,
-        video_table: pxt.Table,
-        frames_view: pxt.Table,
-        audio_chunks_view: pxt.Table,
+        video_table: "pxt.Table",
+        frames_view: "pxt.Table",
+        audio_chunks_view: "pxt.Table",
+        segments_table: Optional["pxt.Table"] = None,
+        clip_int8: bool = False,
     ):
         self.video_name = video_name
         self.video_cache = video_cache
         self.video_table = video_table
         self.frames_view = frames_view
         self.audio_chunks_view = audio_chunks_view
+        self.segments_table = segments_table
+        self.clip_int8 = clip_int8
 
     @classmethod
     def from_metadata(cls, metadata: dict | CachedTableMetadata) -> "CachedTable":
+        import pixeltable as pxt
+
         metadata = CachedTableMetadata(**metadata) if isinstance(metadata, dict) else metadata
         return cls(
             video_name=metadata.video_name,
@@ -54,6 +74,8 @@ class CachedTable:
             video_table=pxt.get_table(metadata.video_table),
             frames_view=pxt.get_table(metadata.frames_view),
             audio_chunks_view=pxt.get_table(metadata.audio_chunks_view),
+            segments_table=pxt.get_table(metadata.segments_table) if metadata.segments_table else None,
+            clip_int8=metadata.clip_int8,
         )
 
     def __str__(self):
@@ -62,6 +84,7 @@ class CachedTable:
             "video_table": str(self.video_table),
             "frames_view": str(self.frames_view),
             "audio_chunks_view": str(self.audio_chunks_view),
+            "segments_table": str(self.segments_table),
         }
 
     def describe(self) -> str:
@@ -3,7 +3,7 @@ import os
 from datetime import datetime
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from loguru import logger
 
@@ -50,11 +50,26 @@ def get_registry() -> Dict[str, CachedTableMetadata]:
     return VIDEO_INDEXES_REGISTRY
 
 
+def reload_registry() -> Dict[str, CachedTableMetadata]:
+    """
+    Reload the global video index registry from its latest file, to pick up the indexes added by another process.
+
+    Returns:
+        Dict[str, CachedTableMetadata]: The video index registry.
+    """
+    global VIDEO_INDEXES_REGISTRY
+    VIDEO_INDEXES_REGISTRY = {}
+    get_registry.cache_clear()
+    return get_registry()
+
+
 def add_index_to_registry(
     video_name: str,
     video_cache: str,
     frames_view_name: str,
     audio_view_name: str,
+    segments_table_name: Optional[str] = None,
+    clip_int8: bool = False,
 ):
     """
     Register a video index in the global registry.
@@ -67,6 +82,8 @@ def add_index_to_registry(
         frames_view_name (str): The name of the frames view.
         sentences_view_name (str): The name of the sentences view.
         semantics_index_name (str): The name of the semantics index.
+        segments_table_name (Optional[str]): The name of the segment-level table used for coarse search.
+        clip_int8 (bool): Whether the CLIP embeddings of the index were computed with int8 weights.
 
     """
     global VIDEO_INDEXES_REGISTRY
@@ -76,6 +93,8 @@ def add_index_to_registry(
         video_table=f"{video_cache}.table",
         frames_view=frames_view_name,
         audio_chunks_view=audio_view_name,
+        segments_table=segments_table_name,
+        clip_int8=clip_int8,
     ).model_dump_json()
     VIDEO_INDEXES_REGISTRY[video_name] = cached_table_meta
 
@@ -83,12 +102,16 @@ def add_index_to_registry(
     dtstr = dt.strftime("%Y-%m-%d%H:%M:%S")
     records_dir = Path(cc.DEFAULT_CACHED_TABLES_REGISTRY_DIR)
     records_dir.mkdir(parents=True, exist_ok=True)
-    with open(records_dir / f"registry_{dtstr}.json", "w") as f:
+    registry_path = records_dir / f"registry_{dtstr}.json"
+    # Written by the ingestion process while the server may be reloading it: only complete files are renamed
+    # to a name that `get_registry` reads.
+    with open(registry_path.with_suffix(".tmp"), "w") as f:
         for k, v in VIDEO_INDEXES_REGISTRY.items():
             if isinstance(v, CachedTableMetadata):
                 v = v.model_dump_json()
             VIDEO_INDEXES_REGISTRY[k] = v
         json.dump(VIDEO_INDEXES_REGISTRY, f, indent=4)
+    os.replace(registry_path.with_suffix(".tmp"), registry_path)
 
     logger.info(f"Video index '{video_name}' registered in the global registry.")
 
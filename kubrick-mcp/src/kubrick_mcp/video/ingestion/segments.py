@@ -0,0 +1,133 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from kubrick_mcp.video.embeddings import normalize
+
+SEGMENT_EMBEDDING_COLUMNS = ("frame_embedding", "caption_embedding", "transcript_embedding")
+
+
+def pool_embeddings(vectors: List[np.ndarray]) -> Optional[np.ndarray]:
+    """Mean-pool a list of embeddings into a single normalized segment embedding.
+
+    Args:
+        vectors (List[np.ndarray]): The embeddings to pool.
+
+    Returns:
+        Optional[np.ndarray]: The pooled embedding, or None if there is nothing to pool.
+    """
+    if not vectors:
+        return None
+    return normalize(np.mean(normalize(np.stack(vectors)), axis=0))
+
+
+def build_segments(
+    frames: Iterable[Dict[str, Any]],
+    chunks: Iterable[Dict[str, Any]],
+    segment_duration: float,
+) -> List[Dict[str, Any]]:
+    """Group frames and audio chunks into fixed-length segments with pooled embeddings.
+
+    Args:
+        frames (Iterable[Dict[str, Any]]): Frame rows with `pos_msec`, `frame_embedding`, `caption_embedding`
+            and `caption` keys.
+        chunks (Iterable[Dict[str, Any]]): Audio chunk rows with `start_time_sec`, `transcript_embedding`
+            and `chunk_text` keys.
+        segment_duration (float): Length of a segment in seconds.
+
+    Returns:
+        List[Dict[str, Any]]: One row per non-empty segment, ready to be inserted in the segments table.
+    """
+    frame_embeddings = defaultdict(list)
+    caption_embeddings = defaultdict(list)
+    transcript_embeddings = defaultdict(list)
+    texts = defaultdict(list)
+
+    for frame in frames:
+        idx = int(frame["pos_msec"] / 1000.0 // segment_duration)
+        if frame["frame_embedding"] is not None:
+            frame_embeddings[idx].append(frame["frame_embedding"])
+        if frame["caption_embedding"] is not None:
+            caption_embeddings[idx].append(frame["caption_embedding"])
+        if frame["caption"]:
+            texts[idx].append(frame["caption"])
+
+    for chunk in chunks:
+        idx = int(chunk["start_time_sec"] // segment_duration)
+        # Chunks without speech embed to zero vectors, which would only dilute the pooled embedding.
+        if chunk["transcript_embedding"] is not None and np.any(chunk["transcript_embedding"]):
+            transcript_embeddings[idx].append(chunk["transcript_embedding"])
+        if chunk["chunk_text"]:
+            texts[idx].append(chunk["chunk_text"])
+
+    segment_ids = sorted(set(frame_embeddings) | set(caption_embeddings) | set(transcript_embeddings))
+    return [
+        {
+            "segment_idx": idx,
+            "start_time_sec": idx * segment_duration,
+            "end_time_sec": (idx + 1) * segment_duration,
+            "frame_embedding": pool_embeddings(frame_embeddings[idx]),
+            "caption_embedding": pool_embeddings(caption_embeddings[idx]),
+            "transcript_embedding": pool_embeddings(transcript_embeddings[idx]),
+            "summary": "\n".join(texts[idx]),
+        }
+        for idx in segment_ids
+    ]
+
+
+class SegmentIndex:
+    """The pooled segment embeddings of a video, stacked per column for the coarse search step.
+
+    Built once per video from the segments table, so ranking segments is a single matrix product
+    instead of a scan of the table on every query.
+    """
+
+    def __init__(self, segments: List[Dict[str, Any]]):
+        self.size = len(segments)
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        for column in SEGMENT_EMBEDDING_COLUMNS:
+            rows = [segment for segment in segments if segment.get(column) is not None]
+            if rows:
+                self._columns[column] = (
+                    normalize(np.stack([row[column] for row in rows])),
+                    np.array([row["start_time_sec"] for row in rows], dtype=np.float64),
+                    np.array([row["end_time_sec"] for row in rows], dtype=np.float64),
+                )
+
+    def top_windows(
+        self,
+        column: str,
+        query_embedding: np.ndarray,
+        top_n: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> Optional[List[Tuple[float, float]]]:
+        """Rank segments by their pooled embedding and keep the windows of the best ones.
+
+        Args:
+            column (str): The pooled embedding to rank segments with.
+            query_embedding (np.ndarray): The normalized query embedding, in the same space as the column.
+            top_n (int): Number of segments to keep.
+            start_time (Optional[float]): Only consider segments after this time in seconds.
+            end_time (Optional[float]): Only consider segments before this time in seconds.
+
+        Returns:
+            Optional[List[Tuple[float, float]]]: The (start, end) windows of the top segments, or None
+                if no segment can be ranked and the flat search should be used.
+        """
+        if column not in self._columns:
+            return None
+        vectors, start_times, end_times = self._columns[column]
+        mask = np.ones(len(vectors), dtype=bool)
+        if start_time is not None:
+            mask &= end_times >= start_time
+        if end_time is not None:
+            mask &= start_times <= end_time
+        if not mask.any():
+            return None
+
+        scores = vectors @ query_embedding
+        scores[~mask] = -np.inf
+        top_segments = np.argsort(-scores, kind="stable")[: min(top_n, int(mask.sum()))]
+        return [(float(start_times[i]), float(end_times[i])) for i in top_segments]
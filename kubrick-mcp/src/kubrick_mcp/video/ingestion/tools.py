@@ -1,17 +1,28 @@
 import base64
+import bisect
 import subprocess
+import tempfile
 from io import BytesIO
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-import av
 import loguru
-from moviepy import VideoFileClip
 from PIL import Image
 
+from kubrick_mcp.config import get_settings
+
+if TYPE_CHECKING:
+    from moviepy import VideoFileClip
+
 logger = loguru.logger.bind(name="VideoTools")
 
+settings = get_settings()
+
+# Formats of the query images stored in the shared media directory.
+_IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png"}
 
-def extract_video_clip(video_path: str, start_time: float, end_time: float, output_path: str = None) -> VideoFileClip:
+
+def extract_video_clip(video_path: str, start_time: float, end_time: float, output_path: str = None) -> "VideoFileClip":
     # BUG: MoviePy crashes mid clip trimming. When it's got videos > N+5 minutes. Switching to ffmpeg for reliability.
 
     if start_time >= end_time:
@@ -47,11 +58,269 @@ def extract_video_clip(video_path: str, start_time: float, end_time: float, outp
         process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
         stdout, _ = process.communicate()
         logger.debug(f"FFmpeg output: {stdout.decode('utf-8', errors='ignore')}")
+        from moviepy import VideoFileClip
+
         return VideoFileClip(output_path)
     except subprocess.CalledProcessError as e:
         raise IOError(f"Failed to extract video clip: {str(e)}")
 
 
+def get_keyframe_times(video_path: str) -> List[float]:
+    """Get the timestamps of the video keyframes, by demuxing packets without decoding them.
+
+    Args:
+        video_path (str): Path to the video file.
+
+    Returns:
+        List[float]: Sorted keyframe timestamps in seconds.
+    """
+    import av
+
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        return sorted(
+            float(packet.pts * stream.time_base)
+            for packet in container.demux(stream)
+            if packet.is_keyframe and packet.pts is not None
+        )
+
+
+def merge_time_windows(windows: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Sort time windows and merge the overlapping ones.
+
+    Args:
+        windows (List[Tuple[float, float]]): (start, end) windows in seconds.
+
+    Returns:
+        List[Tuple[float, float]]: Disjoint windows, sorted by start time.
+    """
+    merged = []
+    for start, end in sorted((max(0.0, start), end) for start, end in windows if end > start):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+# Profile names of PyAV, as libx264 takes them.
+_X264_PROFILES = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+    "high 10": "high10",
+    "high 4:2:2": "high422",
+    "high 4:4:4 predictive": "high444",
+}
+
+
+def probe_video_stream(video_path: str) -> Dict[str, Any]:
+    """Read the codec parameters of the first video and audio streams of a video.
+
+    Args:
+        video_path (str): Path to the video file.
+
+    Returns:
+        Dict[str, Any]: The `codec`, `profile`, `level`, `pix_fmt`, `width`, `height` and `time_base` of the
+            video stream, and the `audio_codec`, `sample_rate` and `channels` of the audio stream, None
+            when the video has no audio.
+    """
+    import av
+
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        codec = stream.codec_context
+        audio = container.streams.audio[0].codec_context if container.streams.audio else None
+        return {
+            "codec": codec.name,
+            "profile": codec.profile,
+            "level": getattr(codec, "level", None),
+            "pix_fmt": codec.pix_fmt,
+            "width": codec.width,
+            "height": codec.height,
+            "time_base": stream.time_base,
+            "audio_codec": audio.name if audio else None,
+            "sample_rate": audio.sample_rate if audio else None,
+            "channels": audio.channels if audio else None,
+        }
+
+
+def _head_encode_args(stream: Dict[str, Any]) -> Optional[List[str]]:
+    """ffmpeg arguments that re-encode the head of a window so it can be joined with stream-copied parts.
+
+    The video is encoded with the profile, level and pixel format of the source. Copied audio would start
+    at the keyframe before the head, so the audio is re-encoded too, with the rate and channels of the source.
+
+    Returns:
+        Optional[List[str]]: The arguments, or None if the source is not H.264 with AAC or no audio, or its
+            profile has no libx264 equivalent, in which case the parts cannot be joined without re-encoding.
+    """
+    profile = _X264_PROFILES.get((stream["profile"] or "").lower())
+    if stream["codec"] != "h264" or profile is None or not stream["pix_fmt"]:
+        return None
+    if stream["audio_codec"] not in (None, "aac"):
+        return None
+
+    args = ["-c:v", "libx264", "-preset", "medium", "-crf", "23", "-profile:v", profile, "-pix_fmt", stream["pix_fmt"]]
+    if stream["level"] and stream["level"] > 0:
+        args += ["-level:v", f"{stream['level'] / 10:.1f}"]
+    if stream["audio_codec"]:
+        args += ["-c:a", "aac", "-ar", str(stream["sample_rate"]), "-ac", str(stream["channels"])]
+    return args
+
+
+def _cut_segment(
+    video_path: str, start_time: float, end_time: float, output_path: str, encode_args: Optional[List[str]]
+) -> None:
+    """Cut a piece of an H.264 video to MPEG-TS, stream-copied or re-encoded with `encode_args`.
+
+    Pieces are written as Annex B streams, which carry their SPS/PPS in-band, so stream-copied pieces and
+    re-encoded ones can be concatenated even though their encoders wrote different parameter sets.
+    """
+    codec_args = (
+        ["-c", "copy", "-bsf:v", "h264_mp4toannexb", "-avoid_negative_ts", "make_zero"]
+        if encode_args is None
+        else encode_args
+    )
+    command = [
+        "ffmpeg",
+        "-ss",
+        str(start_time),
+        "-to",
+        str(end_time),
+        "-i",
+        video_path,
+        *codec_args,
+        "-f",
+        "mpegts",
+        "-y",
+        output_path,
+    ]
+    subprocess.run(command, capture_output=True, check=True)
+
+
+def _reencode_windows(video_path: str, windows: List[Tuple[float, float]], output_path: str, has_audio: bool) -> None:
+    """Re-encode every window into a single H.264 video, for sources whose pieces cannot be stream-copied."""
+    inputs, streams = [], ""
+    for idx, (start_time, end_time) in enumerate(windows):
+        inputs += ["-ss", str(start_time), "-to", str(end_time), "-i", video_path]
+        streams += f"[{idx}:v:0]" + (f"[{idx}:a:0]" if has_audio else "")
+    outputs = "[v][a]" if has_audio else "[v]"
+    filter_graph = f"{streams}concat=n={len(windows)}:v=1:a={int(has_audio)}{outputs}"
+    command = [
+        "ffmpeg",
+        *inputs,
+        "-filter_complex",
+        filter_graph,
+        "-map",
+        "[v]",
+        *(["-map", "[a]", "-c:a", "aac"] if has_audio else []),
+        "-c:v",
+        "libx264",
+        "-preset",
+        "medium",
+        "-crf",
+        "23",
+        "-pix_fmt",
+        "yuv420p",
+        "-y",
+        output_path,
+    ]
+    subprocess.run(command, capture_output=True, check=True)
+
+
+def extract_highlight_reel(video_path: str, windows: List[Tuple[float, float]], output_path: str) -> Dict[str, Any]:
+    """Assemble several moments of a video into a single file, re-encoding as little as possible.
+
+    Overlapping windows are merged first. For an H.264 source, each window is cut at its first keyframe:
+    the part before it does not start on a keyframe, so it is re-encoded with the profile, level and pixel
+    format of the source, and the rest is stream-copied. The parts are cut to MPEG-TS, then joined with
+    the ffmpeg concat demuxer and remuxed to MP4 with the time scale of the source, without re-encoding.
+    Other sources cannot be joined with re-encoded H.264 parts, so their windows are fully re-encoded.
+
+    Args:
+        video_path (str): Path to the source video.
+        windows (List[Tuple[float, float]]): (start, end) windows in seconds.
+        output_path (str): Path of the assembled video.
+
+    Returns:
+        Dict[str, Any]: Dictionary containing:
+            clip_path (str): Path to the assembled video.
+            windows (List[Tuple[float, float]]): The merged windows included in the video.
+            duration (float): Total duration of the windows in seconds.
+            stream_copied_ratio (float): Fraction of that duration that was stream-copied.
+
+    Raises:
+        ValueError: If no valid window was given.
+        IOError: If ffmpeg fails to cut or concatenate the parts.
+    """
+    windows = merge_time_windows(windows)
+    if not windows:
+        raise ValueError("At least one window with start_time < end_time is required")
+
+    stream = probe_video_stream(video_path)
+    encode_args = _head_encode_args(stream)
+    total = sum(end_time - start_time for start_time, end_time in windows)
+    stream_copied = 0.0
+
+    try:
+        if encode_args is None:
+            logger.info(
+                f"Re-encoding the highlight reel of {video_path}, its {stream['codec']} streams cannot be copied"
+            )
+            _reencode_windows(video_path, windows, output_path, stream["audio_codec"] is not None)
+        else:
+            keyframes = get_keyframe_times(video_path)
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                parts = []
+                for start_time, end_time in windows:
+                    keyframe_idx = bisect.bisect_left(keyframes, start_time)
+                    keyframe = keyframes[keyframe_idx] if keyframe_idx < len(keyframes) else end_time
+
+                    # Only the stretch up to the first keyframe in the window needs to be re-encoded.
+                    pieces = [(start_time, min(keyframe, end_time), encode_args), (keyframe, end_time, None)]
+                    for piece_start, piece_end, piece_encode_args in pieces:
+                        if piece_end - piece_start <= 1e-3:
+                            continue
+                        part_path = str(Path(tmp_dir) / f"part_{len(parts):04d}.ts")
+                        _cut_segment(video_path, piece_start, piece_end, part_path, piece_encode_args)
+                        parts.append(part_path)
+                        if piece_encode_args is None:
+                            stream_copied += piece_end - piece_start
+
+                concat_list = Path(tmp_dir) / "parts.txt"
+                concat_list.write_text("".join(f"file '{part}'\n" for part in parts))
+                command = [
+                    "ffmpeg",
+                    "-f",
+                    "concat",
+                    "-safe",
+                    "0",
+                    "-i",
+                    str(concat_list),
+                    "-c",
+                    "copy",
+                    "-video_track_timescale",
+                    str(stream["time_base"].denominator),
+                    "-y",
+                    output_path,
+                ]
+                subprocess.run(command, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        raise IOError(f"Failed to assemble highlight reel: {e.stderr.decode('utf-8', errors='ignore')}")
+
+    logger.info(
+        f"Highlight reel {output_path}: {len(windows)} windows, {stream_copied:.1f}s/{total:.1f}s stream-copied"
+    )
+    return {
+        "clip_path": output_path,
+        "windows": windows,
+        "duration": total,
+        "stream_copied_ratio": stream_copied / total,
+    }
+
+
 def encode_image(image: str | Image.Image) -> str:
     """Encode an image to base64 string.
 
@@ -108,13 +377,42 @@ def decode_image(base64_string: str) -> Image.Image:
         raise IOError(f"Failed to decode image: {str(e)}")
 
 
+def load_image(image: str) -> Image.Image:
+    """Load a query image, given either as the path of an image stored in the shared media directory or in base64.
+
+    Images uploaded to the API are stored once, already downscaled, and passed to the tools by their path
+    relative to the shared media directory. Base64 strings are still accepted for callers that send the image itself.
+
+    Args:
+        image (str): Path of the stored image, relative to `SHARED_MEDIA_DIR`, or base64 encoded image.
+
+    Returns:
+        Image.Image: PIL Image object
+
+    Raises:
+        IOError: If the image cannot be read or decoded
+    """
+    if len(image) < 1024 and Path(image).suffix.lower() in _IMAGE_SUFFIXES:
+        shared_media_dir = Path(settings.SHARED_MEDIA_DIR).expanduser().resolve()
+        path = (shared_media_dir / image).resolve()
+        if not path.is_relative_to(shared_media_dir):
+            raise IOError(f"Image path outside of the shared media directory: {image}")
+        try:
+            return Image.open(path)
+        except (FileNotFoundError, IOError) as e:
+            raise IOError(f"Failed to load image: {str(e)}")
+    return decode_image(image)
+
+
 def re_encode_video(video_path: str) -> str:
+    import av
+
     if not Path(video_path).exists():
         logger.error(f"Error: Video file not found at {video_path}")
         return False
 
     try:
-        with av.open(video_path) as container:
+        with av.open(video_path):
             logger.info(f"Video {video_path} successfully opened by PyAV.")
             return video_path
     except Exception as e:
@@ -135,7 +433,7 @@ def re_encode_video(video_path: str) -> str:
             logger.debug(f"FFmpeg stderr: {result.stderr}")
 
             try:
-                with av.open(reencoded_video_path) as container:
+                with av.open(reencoded_video_path):
                     logger.info(f"Re-encoded video {reencoded_video_path} successfully opened by PyAV.")
                     return reencoded_video_path
             except Exception as e:
@@ -1,7 +1,8 @@
 import uuid
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
+import numpy as np
 import pixeltable as pxt
 from loguru import logger
 from pixeltable.functions import openai
@@ -11,10 +12,20 @@ from pixeltable.functions.video import extract_audio
 from pixeltable.iterators import AudioSplitter
 from pixeltable.iterators.video import FrameIterator
 
+import kubrick_mcp.video.ingestion.constants as cc
 import kubrick_mcp.video.ingestion.registry as registry
 from kubrick_mcp.config import get_settings
-from kubrick_mcp.video.ingestion.functions import extract_text_from_chunk, resize_image
+from kubrick_mcp.video.clip_backend import clip_int8_enabled
+from kubrick_mcp.video.ingestion.functions import (
+    clip_embed,
+    extract_text_from_chunk,
+    resize_image,
+    transcript_embed,
+)
+from kubrick_mcp.video.ingestion.models import CachedTableMetadata
+from kubrick_mcp.video.ingestion.segments import build_segments
 from kubrick_mcp.video.ingestion.tools import re_encode_video
+from kubrick_mcp.video.quantization import QuantizedEmbeddingIndex, quantized_index_dir
 
 if TYPE_CHECKING:
     from kubrick_mcp.video.ingestion.models import CachedTable
@@ -23,6 +34,20 @@ logger = logger.bind(name="VideoProcessor")
 settings = get_settings()
 
 
+def _clip_embedding(model_id: str):
+    """The CLIP embedding function of new indexes, from the configured backend."""
+    if settings.CLIP_EMBEDDING_BACKEND == "cpu":
+        return clip_embed.using(model_id=model_id)
+    return clip.using(model_id=model_id)
+
+
+def _transcript_embedding(model: str):
+    """The transcript embedding function of new indexes, from the configured backend."""
+    if settings.TRANSCRIPT_EMBEDDING_BACKEND == "batched":
+        return transcript_embed.using(model=model)
+    return embeddings.using(model=model)
+
+
 class VideoProcessor:
     def __init__(
         self,
@@ -31,6 +56,7 @@ class VideoProcessor:
         self._video_table = None
         self._frames_view = None
         self._audio_chunks = None
+        self._segments_table = None
         self._video_mapping_idx: Optional[str] = None
 
         logger.info(
@@ -49,12 +75,14 @@ class VideoProcessor:
             self.video_table = cached_table.video_table
             self.frames_view = cached_table.frames_view
             self.audio_chunks = cached_table.audio_chunks_view
+            self.segments_table = cached_table.segments_table
 
         else:
             self.pxt_cache = f"cache_{uuid.uuid4().hex[-4:]}"
             self.video_table_name = f"{self.pxt_cache}.table"
             self.frames_view_name = f"{self.video_table_name}_frames"
             self.audio_view_name = f"{self.video_table_name}_audio_chunks"
+            self.segments_table_name = f"{self.video_table_name}_segments"
             self.video_table = None
 
             self._setup_table()
@@ -64,6 +92,8 @@ class VideoProcessor:
                 video_cache=self.pxt_cache,
                 frames_view_name=self.frames_view_name,
                 audio_view_name=self.audio_view_name,
+                segments_table_name=self.segments_table_name,
+                clip_int8=clip_int8_enabled(),
             )
             logger.info(f"Creating new video index '{self.video_table_name}' in '{self.pxt_cache}'")
 
@@ -71,20 +101,30 @@ class VideoProcessor:
         """
         Checks if the PixelTable table and related views/index for the video index exist.
 
+        An index built with another CLIP_INT8 setting does not count, so processing the video again rebuilds it.
+
         Args:
             video_path (str): The path to the video file.
 
         Returns:
             bool: True if all components exist, False otherwise.
         """
-        existing_tables = registry.get_registry()
-        return video_path in existing_tables
+        metadata = registry.get_registry().get(video_path)
+        if metadata is None:
+            return False
+        if isinstance(metadata, str):
+            metadata = CachedTableMetadata.model_validate_json(metadata)
+        if metadata.clip_int8 != clip_int8_enabled():
+            logger.warning(f"Video index '{video_path}' was built with another CLIP_INT8 setting, it will be rebuilt.")
+            return False
+        return True
 
     def _setup_table(self):
         self._setup_cache_directory()
         self._create_video_table()
         self._setup_audio_processing()
         self._setup_frame_processing()
+        self._create_segments_table()
 
     def _setup_cache_directory(self):
         logger.info(f"Creating cache path {self.pxt_cache}.")
@@ -142,7 +182,7 @@ class VideoProcessor:
     def _add_audio_embedding_index(self):
         self.audio_chunks.add_embedding_index(
             column=self.audio_chunks.chunk_text,
-            string_embed=embeddings.using(model=settings.TRANSCRIPT_SIMILARITY_EMBD_MODEL),
+            string_embed=_transcript_embedding(settings.TRANSCRIPT_SIMILARITY_EMBD_MODEL),
             if_exists="ignore",
             idx_name="chunks_index",
         )
@@ -171,7 +211,7 @@ class VideoProcessor:
     def _add_frame_embedding_index(self):
         self.frames_view.add_embedding_index(
             column=self.frames_view.resized_frame,
-            image_embed=clip.using(model_id=settings.IMAGE_SIMILARITY_EMBD_MODEL),
+            image_embed=_clip_embedding(settings.IMAGE_SIMILARITY_EMBD_MODEL),
             if_exists="replace_force",
         )
 
@@ -187,10 +227,106 @@ class VideoProcessor:
     def _add_caption_embedding_index(self):
         self.frames_view.add_embedding_index(
             column=self.frames_view.im_caption,
-            string_embed=clip.using(model_id=settings.CAPTION_SIMILARITY_EMBD_MODEL),
+            string_embed=_clip_embedding(settings.CAPTION_SIMILARITY_EMBD_MODEL),
             if_exists="replace_force",
         )
 
+    def _create_segments_table(self):
+        self.segments_table = pxt.create_table(
+            self.segments_table_name,
+            schema={
+                "segment_idx": pxt.Int,
+                "start_time_sec": pxt.Float,
+                "end_time_sec": pxt.Float,
+                "frame_embedding": pxt.Array[(None,), pxt.Float],
+                "caption_embedding": pxt.Array[(None,), pxt.Float],
+                "transcript_embedding": pxt.Array[(None,), pxt.Float],
+                "summary": pxt.String,
+            },
+            if_exists="replace_force",
+        )
+
+    def _populate_segments_table(self):
+        """Pool frame, caption and transcript embeddings into segment-level rows for coarse search."""
+        frames = self.frames_view.select(
+            self.frames_view.pos_msec,
+            frame_embedding=self.frames_view.resized_frame.embedding(),
+            caption_embedding=self.frames_view.im_caption.embedding(),
+            caption=self.frames_view.im_caption,
+        ).collect()
+        chunks = self.audio_chunks.select(
+            self.audio_chunks.start_time_sec,
+            self.audio_chunks.chunk_text,
+            transcript_embedding=self.audio_chunks.chunk_text.embedding(),
+        ).collect()
+
+        segments = build_segments(frames, chunks, settings.SEGMENT_DURATION_SECONDS)
+        if segments:
+            self.segments_table.insert(segments)
+        logger.info(f"Built {len(segments)} segments of {settings.SEGMENT_DURATION_SECONDS}s for coarse search")
+
+    def quantize_indexes(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Build (or rebuild) int8 copies of the frame, caption and transcript embedding indexes.
+
+        The int8 copies are stored under the data directory with the `pos` of each row, and re-score their
+        candidates with the vectors of the pixeltable embedding indexes, which stay the source of truth.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: For each quantized index, the bytes it adds on disk, the memory scanned
+                per query compared to a float32 in-memory index, and the recall lost.
+        """
+        frames = self.frames_view.select(
+            self.frames_view.pos,
+            self.frames_view.pos_msec,
+            self.frames_view.im_caption,
+            frame_embedding=self.frames_view.resized_frame.embedding(),
+            caption_embedding=self.frames_view.im_caption.embedding(),
+        ).collect()
+        chunks = self.audio_chunks.select(
+            self.audio_chunks.pos,
+            self.audio_chunks.start_time_sec,
+            self.audio_chunks.end_time_sec,
+            self.audio_chunks.chunk_text,
+            transcript_embedding=self.audio_chunks.chunk_text.embedding(),
+        ).collect()
+        # Chunks without speech have no embedding.
+        chunks = [chunk for chunk in chunks if chunk["transcript_embedding"] is not None]
+
+        indexes = {}
+        if len(frames) > 0:
+            positions = np.array([frame["pos_msec"] / 1000.0 for frame in frames])
+            frame_keys = np.array([frame["pos"] for frame in frames])
+            indexes[cc.FRAMES_QUANTIZED_INDEX] = QuantizedEmbeddingIndex.build(
+                np.stack([frame["frame_embedding"] for frame in frames]), positions, positions, keys=frame_keys
+            )
+            indexes[cc.CAPTIONS_QUANTIZED_INDEX] = QuantizedEmbeddingIndex.build(
+                np.stack([frame["caption_embedding"] for frame in frames]),
+                positions,
+                positions,
+                texts=[frame["im_caption"] for frame in frames],
+                keys=frame_keys,
+            )
+        if len(chunks) > 0:
+            indexes[cc.CHUNKS_QUANTIZED_INDEX] = QuantizedEmbeddingIndex.build(
+                np.stack([chunk["transcript_embedding"] for chunk in chunks]),
+                np.array([chunk["start_time_sec"] for chunk in chunks]),
+                np.array([chunk["end_time_sec"] for chunk in chunks]),
+                texts=[chunk["chunk_text"] for chunk in chunks],
+                keys=np.array([chunk["pos"] for chunk in chunks]),
+            )
+
+        report = {}
+        quantized_dir = quantized_index_dir(self.pxt_cache)
+        for name, index in indexes.items():
+            disk_bytes = index.save(quantized_dir, name)
+            report[name] = {
+                "disk_bytes": disk_bytes,
+                **index.evaluate(rescore_factor=settings.QUANTIZATION_RESCORE_FACTOR),
+            }
+            logger.info(f"Quantized index '{name}' in '{quantized_dir}': {report[name]}")
+        return report
+
     def add_video(self, video_path: str) -> bool:
         """
         Add a video to the pixel table.
@@ -205,4 +341,7 @@ class VideoProcessor:
         new_video_path = re_encode_video(video_path=video_path)
         if new_video_path:
             self.video_table.insert([{"video": video_path}])
+            self._populate_segments_table()
+            if settings.EMBEDDING_QUANTIZATION == "int8":
+                self.quantize_indexes()
         return True
@@ -0,0 +1,304 @@
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+import kubrick_mcp.video.ingestion.constants as cc
+from kubrick_mcp.config import get_settings
+from kubrick_mcp.video.embeddings import normalize
+
+logger = logger.bind(name="QuantizedIndex")
+
+settings = get_settings()
+
+# Rows scored per block during the int8 scan, bounds the float32 working copy.
+_SCAN_BLOCK_SIZE = 65536
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Quantize row vectors to int8 with a symmetric per-vector scale.
+
+    Args:
+        vectors (np.ndarray): A (n, dim) float matrix.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The (n, dim) int8 codes and the (n,) float32 scales.
+    """
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales = np.maximum(scales, 1e-12).astype(np.float32)
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def quantized_index_dir(video_cache: str) -> Path:
+    """Directory of the quantized indexes of a video, under the configured data directory."""
+    return Path(settings.DATA_DIR).expanduser().resolve() / cc.QUANTIZED_INDEX_DIR / video_cache
+
+
+class QuantizedEmbeddingIndex:
+    """An int8 copy of an embedding index, with full-precision re-scoring of the top candidates.
+
+    Only the int8 codes are stored, with the key of each row in its pixeltable view. They are kept in
+    memory and scanned for every query, and the full-precision vectors of the few re-scored candidates
+    are read back from the pixeltable embedding index by key, so no float copy of the index is kept.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        scales: np.ndarray,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        texts: Optional[List[str]] = None,
+        keys: Optional[np.ndarray] = None,
+        full_precision: Optional[np.ndarray] = None,
+    ):
+        self.codes = codes
+        self.scales = scales
+        self.start_times = start_times
+        self.end_times = end_times
+        self.texts = texts
+        self.keys = keys
+        # Only set on a freshly built index, to evaluate its recall.
+        self.full_precision = full_precision
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        texts: Optional[List[str]] = None,
+        keys: Optional[np.ndarray] = None,
+    ) -> "QuantizedEmbeddingIndex":
+        vectors = normalize(vectors)
+        codes, scales = quantize_int8(vectors)
+        return cls(
+            codes=codes,
+            scales=scales,
+            start_times=np.asarray(start_times, dtype=np.float64),
+            end_times=np.asarray(end_times, dtype=np.float64),
+            texts=texts,
+            keys=np.asarray(keys, dtype=np.int64) if keys is not None else None,
+            full_precision=vectors,
+        )
+
+    @property
+    def quantized_nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+    @property
+    def full_precision_nbytes(self) -> int:
+        return self.codes.size * np.dtype(np.float32).itemsize
+
+    def save(self, directory: Path, name: str) -> int:
+        """Save the index, replacing a previous copy.
+
+        Returns:
+            int: The bytes the index takes on disk.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {
+            "codes": self.codes,
+            "scales": self.scales,
+            "start_times": self.start_times,
+            "end_times": self.end_times,
+        }
+        if self.keys is not None:
+            arrays["keys"] = self.keys
+        # Indexes are built in the ingestion process while the server may be loading them: every file is
+        # written then renamed, the codes last, as their modification time is what makes readers reload.
+        paths = []
+        if self.texts is not None:
+            paths.append(directory / f"{name}_texts.json")
+            with open(paths[-1].with_suffix(".tmp"), "w") as f:
+                json.dump(self.texts, f)
+            os.replace(paths[-1].with_suffix(".tmp"), paths[-1])
+        paths.append(directory / f"{name}.npz")
+        with open(paths[-1].with_suffix(".tmp"), "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(paths[-1].with_suffix(".tmp"), paths[-1])
+
+        return sum(path.stat().st_size for path in paths)
+
+    @classmethod
+    def load(cls, directory: Path, name: str) -> Optional["QuantizedEmbeddingIndex"]:
+        """Load a quantized index saved with `save`, or return None if it does not exist."""
+        if not (directory / f"{name}.npz").exists():
+            return None
+
+        arrays = np.load(directory / f"{name}.npz")
+        texts = None
+        if (directory / f"{name}_texts.json").exists():
+            with open(directory / f"{name}_texts.json") as f:
+                texts = json.load(f)
+        return cls(
+            codes=arrays["codes"],
+            scales=arrays["scales"],
+            start_times=arrays["start_times"],
+            end_times=arrays["end_times"],
+            texts=texts,
+            keys=arrays["keys"] if "keys" in arrays else None,
+        )
+
+    def _time_mask(
+        self,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        windows: Optional[List[Tuple[float, float]]],
+    ) -> Optional[np.ndarray]:
+        mask = None
+        if start_time is not None:
+            mask = self.end_times >= start_time
+        if end_time is not None:
+            upper_bound = self.start_times <= end_time
+            mask = upper_bound if mask is None else mask & upper_bound
+        if windows:
+            in_windows = np.zeros(len(self.start_times), dtype=bool)
+            for window_start, window_end in windows:
+                in_windows |= (self.end_times >= window_start) & (self.start_times <= window_end)
+            mask = in_windows if mask is None else mask & in_windows
+        return mask
+
+    def approximate_scores(self, query_embedding: np.ndarray) -> np.ndarray:
+        """Approximate cosine similarity of every row using the int8 codes."""
+        scores = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), _SCAN_BLOCK_SIZE):
+            block = self.codes[start : start + _SCAN_BLOCK_SIZE].astype(np.float32)
+            scores[start : start + _SCAN_BLOCK_SIZE] = block @ query_embedding
+        return scores * self.scales
+
+    def _search_rows(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        rescore_factor: int,
+        mask: Optional[np.ndarray] = None,
+        rescore_vectors: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.approximate_scores(query_embedding)
+        if mask is not None:
+            scores[~mask] = -np.inf
+
+        n_valid = len(scores) if mask is None else int(mask.sum())
+        n_candidates = min(max(top_k * rescore_factor, top_k), n_valid)
+        if n_candidates == 0:
+            return np.empty(0, dtype=np.int64), scores
+        candidates = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+
+        if rescore_vectors is None and self.full_precision is not None:
+            rescore_vectors = self.full_precision.__getitem__
+        if rescore_factor > 0 and rescore_vectors is not None:
+            candidates = np.sort(candidates)
+            scores = np.full(len(scores), -np.inf, dtype=np.float32)
+            scores[candidates] = normalize(rescore_vectors(candidates)) @ query_embedding
+
+        return candidates[np.argsort(-scores[candidates])][:top_k], scores
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        top_k: int,
+        rescore_factor: int = 4,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        windows: Optional[List[Tuple[float, float]]] = None,
+        rescore_vectors: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search the index with the int8 codes and re-score the best candidates in full precision.
+
+        Args:
+            query_embedding (np.ndarray): The normalized query embedding.
+            top_k (int): Number of results to return.
+            rescore_factor (int): Number of int8 candidates re-scored per returned result. 0 disables re-scoring.
+            start_time (Optional[float]): Only consider rows after this time in seconds.
+            end_time (Optional[float]): Only consider rows before this time in seconds.
+            windows (Optional[List[Tuple[float, float]]]): Only consider rows overlapping one of these windows.
+            rescore_vectors (Optional[Callable[[np.ndarray], np.ndarray]]): Reads the full-precision vectors
+                of the given rows. Without it, the int8 scores are returned as they are.
+
+        Returns:
+            List[Dict[str, Any]]: Rows sorted by similarity, with `start_time`, `end_time`, `similarity`
+                and, when stored, `text` keys.
+        """
+        mask = self._time_mask(start_time, end_time, windows)
+        rows, scores = self._search_rows(normalize(query_embedding), top_k, rescore_factor, mask, rescore_vectors)
+        return [
+            {
+                "start_time": float(self.start_times[i]),
+                "end_time": float(self.end_times[i]),
+                "similarity": float(scores[i]),
+                **({"text": self.texts[i]} if self.texts is not None else {}),
+            }
+            for i in rows
+        ]
+
+    def evaluate(self, top_k: int = 10, n_queries: int = 100, rescore_factor: int = 4, seed: int = 0) -> Dict[str, Any]:
+        """Report the scan memory saved and the recall lost against an exact full-precision search.
+
+        Only available on a freshly built index. Queries are midpoints of random pairs of stored vectors, so
+        they look like real in-index queries without being exact matches of a single row.
+
+        Args:
+            top_k (int): Number of results compared per query.
+            n_queries (int): Number of sampled queries.
+            rescore_factor (int): Re-scoring factor used for the re-scored recall.
+            seed (int): Random seed for query sampling.
+
+        Returns:
+            Dict[str, Any]: Memory scanned per query, by the int8 codes and by a float32 in-memory index,
+                and recall@k with and without full-precision re-scoring.
+        """
+        report = {
+            "vectors": int(self.codes.shape[0]),
+            "dim": int(self.codes.shape[1]) if self.codes.ndim == 2 else 0,
+            "full_precision_scan_bytes": self.full_precision_nbytes,
+            "quantized_scan_bytes": self.quantized_nbytes,
+            "scan_memory_saved_pct": 100.0 * (1 - self.quantized_nbytes / max(self.full_precision_nbytes, 1)),
+        }
+        if len(self.codes) == 0 or self.full_precision is None:
+            return report
+
+        rng = np.random.default_rng(seed)
+        full_precision = np.asarray(self.full_precision, dtype=np.float32)
+        k = min(top_k, len(self.codes))
+        int8_recalls, rescored_recalls = [], []
+        for _ in range(n_queries):
+            pair = rng.choice(len(full_precision), size=2, replace=len(full_precision) < 2)
+            query = normalize(full_precision[pair].mean(axis=0))
+            expected = set(np.argsort(-(full_precision @ query))[:k])
+
+            int8_top, _ = self._search_rows(query, k, rescore_factor=0)
+            int8_recalls.append(len(expected & set(int8_top)) / k)
+
+            rescored_top, _ = self._search_rows(query, k, rescore_factor=rescore_factor)
+            rescored_recalls.append(len(expected & set(rescored_top)) / k)
+
+        report[f"recall@{k}_int8"] = float(np.mean(int8_recalls))
+        report[f"recall@{k}_rescored"] = float(np.mean(rescored_recalls))
+        return report
+
+
+@lru_cache(maxsize=32)
+def _load_quantized_index(directory: Path, name: str, mtime: float) -> Optional[QuantizedEmbeddingIndex]:
+    return QuantizedEmbeddingIndex.load(directory, name)
+
+
+def get_quantized_index(directory: Path, name: str) -> Optional[QuantizedEmbeddingIndex]:
+    """Get a quantized index, loading it from disk only when it is new or was re-quantized.
+
+    Args:
+        directory (Path): Directory the index was saved to.
+        name (str): Name of the index.
+
+    Returns:
+        Optional[QuantizedEmbeddingIndex]: The index, or None if it does not exist.
+    """
+    path = directory / f"{name}.npz"
+    if not path.exists():
+        return None
+    return _load_quantized_index(directory, name, path.stat().st_mtime)
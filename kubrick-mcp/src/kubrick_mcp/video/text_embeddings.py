@@ -0,0 +1,209 @@
+import asyncio
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from kubrick_mcp.config import get_settings
+
+logger = logger.bind(name="TextEmbeddings")
+
+settings = get_settings()
+
+# Output sizes of the OpenAI embedding models, needed up front by the embedding indexes.
+EMBEDDING_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+
+_DURATION_PART_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _estimate_tokens(text: str) -> int:
+    # Same estimate as pixeltable's rate limiting of the embeddings endpoint.
+    return max(1, len(text) // 4)
+
+
+def _parse_duration(value: str) -> float:
+    """Parse a rate limit reset duration, such as "20ms", "1.5s" or "6m0s", in seconds."""
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in _DURATION_PART_PATTERN.findall(value))
+
+
+class _RateLimits:
+    """Request and token budgets of a model, from the rate limit headers of its last response.
+
+    Every request reserves its estimated cost from the remaining budgets, so concurrent requests do not all
+    go out on the same stale headers. A request that does not fit waits for the budget to reset.
+    """
+
+    def __init__(self):
+        # resource -> (remaining, monotonic time of the reset)
+        self._budgets: Dict[str, Tuple[float, float]] = {}
+
+    def record(self, headers) -> None:
+        now = time.monotonic()
+        for resource in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{resource}")
+            reset = headers.get(f"x-ratelimit-reset-{resource}")
+            if remaining is None or reset is None:
+                continue
+            self._budgets[resource] = (int(remaining), now + _parse_duration(reset))
+
+    async def acquire(self, tokens: int) -> float:
+        """Wait until the budgets fit a request of `tokens` tokens and reserve them.
+
+        Returns:
+            float: The time waited, in seconds.
+        """
+        waited = 0.0
+        for resource, cost in (("requests", 1), ("tokens", tokens)):
+            if resource not in self._budgets:
+                continue
+            remaining, reset_at = self._budgets[resource]
+            if remaining < cost:
+                delay = max(0.0, reset_at - time.monotonic())
+                logger.debug(f"Out of {resource} budget, waiting {delay:.2f}s for the reset")
+                await asyncio.sleep(delay)
+                waited += delay
+                # The budget is unknown again until the next response reports it.
+                del self._budgets[resource]
+                continue
+            self._budgets[resource] = (remaining - cost, reset_at)
+        return waited
+
+
+class RemoteTextEmbedder:
+    """Batched OpenAI text embeddings for an embedding model.
+
+    Empty texts are not sent and have no embedding: None is stored, so they are never returned by similarity
+    searches. The other texts are deduplicated, looked up in a bounded cache, and the remaining ones are split into
+    requests of at most `request_size` inputs and `max_request_tokens` estimated tokens. Up to
+    `max_concurrency` requests are in flight at once, throttled on the rate limit headers of the responses.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        request_size: int = 256,
+        max_request_tokens: int = 100_000,
+        max_concurrency: int = 4,
+        cache_size: int = 4096,
+    ):
+        self.model = model
+        self.request_size = request_size
+        self.max_request_tokens = max_request_tokens
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rate_limits = _RateLimits()
+        self._client = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"rows": 0, "empty": 0, "duplicates": 0, "cached": 0, "requests": 0, "rate_limit_wait_s": 0.0}
+
+    @property
+    def dim(self) -> int:
+        return EMBEDDING_DIMENSIONS[self.model]
+
+    def _request_batches(self, texts: List[str]) -> List[List[int]]:
+        batches, batch, batch_tokens = [], [], 0
+        for i, text in enumerate(texts):
+            tokens = _estimate_tokens(text)
+            if batch and (len(batch) == self.request_size or batch_tokens + tokens > self.max_request_tokens):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _get_client(self):
+        """Get the OpenAI client of the running event loop, as its connections cannot be shared across loops."""
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not loop:
+            self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            self._client_loop = loop
+        return self._client
+
+    async def _request(self, texts: List[str], semaphore: asyncio.Semaphore) -> List[np.ndarray]:
+        async with semaphore:
+            self.stats["rate_limit_wait_s"] += await self._rate_limits.acquire(sum(map(_estimate_tokens, texts)))
+            response = await self._get_client().embeddings.with_raw_response.create(
+                input=texts, model=self.model, encoding_format="float"
+            )
+            self._rate_limits.record(response.headers)
+            self.stats["requests"] += 1
+        data = sorted(response.parse().data, key=lambda item: item.index)
+        if [item.index for item in data] != list(range(len(texts))):
+            raise ValueError(f"Expected {len(texts)} embeddings from {self.model}, got {len(data)}")
+        return [np.asarray(item.embedding, dtype=np.float32) for item in data]
+
+    def _cache_put(self, text: str, embedding: np.ndarray) -> None:
+        if self.cache_size <= 0:
+            return
+        self._cache[text] = embedding
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def embed(self, texts: List[Optional[str]]) -> List[Optional[np.ndarray]]:
+        """Embed texts, returning their embeddings in the input order, None for the empty ones.
+
+        Raises:
+            ValueError: If a response does not hold one embedding per input.
+        """
+        embeddings: List[Optional[np.ndarray]] = [None] * len(texts)
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text is None or not text.strip():
+                self.stats["empty"] += 1
+                continue
+            positions.setdefault(text, []).append(i)
+        self.stats["rows"] += len(texts)
+        self.stats["duplicates"] += sum(len(rows) - 1 for rows in positions.values())
+
+        missing = []
+        for text, rows in positions.items():
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                for row in rows:
+                    embeddings[row] = self._cache[text]
+                self.stats["cached"] += 1
+            else:
+                missing.append(text)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        batches = [[missing[i] for i in batch] for batch in self._request_batches(missing)]
+        results = await asyncio.gather(*[self._request(batch, semaphore) for batch in batches])
+        for batch, batch_embeddings in zip(batches, results, strict=True):
+            for text, embedding in zip(batch, batch_embeddings, strict=True):
+                for row in positions[text]:
+                    embeddings[row] = embedding
+                self._cache_put(text, embedding)
+
+        if batches:
+            logger.info(
+                f"Embedded {len(texts)} texts with {self.model} in {len(batches)} requests "
+                f"({len(missing)} unique, {len(texts) - len(missing)} empty, duplicate or cached)"
+            )
+        return embeddings
+
+
+@lru_cache(maxsize=2)
+def get_text_embedder(model: str) -> RemoteTextEmbedder:
+    """Get the text embedder of a model, created once per process with the configured settings."""
+    return RemoteTextEmbedder(
+        model,
+        request_size=settings.TRANSCRIPT_EMBEDDING_REQUEST_SIZE,
+        max_request_tokens=settings.TRANSCRIPT_EMBEDDING_MAX_REQUEST_TOKENS,
+        max_concurrency=settings.TRANSCRIPT_EMBEDDING_MAX_CONCURRENCY,
+        cache_size=settings.TRANSCRIPT_EMBEDDING_CACHE_SIZE,
+    )
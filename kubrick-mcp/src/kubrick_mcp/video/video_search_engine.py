@@ -1,36 +1,306 @@
-from typing import Any, Dict, List
+import hashlib
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+from PIL import Image
+
+import kubrick_mcp.video.ingestion.constants as cc
 import kubrick_mcp.video.ingestion.registry as registry
 from kubrick_mcp.config import get_settings
+from kubrick_mcp.video.clip_backend import clip_int8_enabled
+from kubrick_mcp.video.embeddings import embed_clip_images, embed_clip_texts, embed_openai_texts, normalize
 from kubrick_mcp.video.ingestion.models import CachedTable
-from kubrick_mcp.video.ingestion.tools import decode_image
+from kubrick_mcp.video.ingestion.segments import SegmentIndex
+from kubrick_mcp.video.ingestion.tools import load_image
+from kubrick_mcp.video.quantization import get_quantized_index, quantized_index_dir
 
 settings = get_settings()
 
+_SEGMENT_EMBEDDING_COLUMNS = {
+    "speech": "transcript_embedding",
+    "caption": "caption_embedding",
+    "image": "frame_embedding",
+}
+_QUANTIZED_INDEXES = {
+    "speech": cc.CHUNKS_QUANTIZED_INDEX,
+    "caption": cc.CAPTIONS_QUANTIZED_INDEX,
+    "image": cc.FRAMES_QUANTIZED_INDEX,
+}
+
+# Segment indexes by video cache, shared by the search engines of every tool call. A video that is
+# processed again gets a new cache, so an entry never goes stale.
+_segment_indexes: Dict[str, SegmentIndex] = {}
+
+
+def _get_segment_index(video_index: CachedTable) -> SegmentIndex:
+    """Get the segment index of a video, loaded from its segments table on the first search."""
+    if video_index.video_cache not in _segment_indexes:
+        segments_table = video_index.segments_table
+        segments = list(segments_table.collect()) if segments_table is not None else []
+        _segment_indexes[video_index.video_cache] = SegmentIndex(segments)
+    return _segment_indexes[video_index.video_cache]
+
+
+def _query_key(modality: str, query: str | Image.Image) -> Tuple[str, Any]:
+    """The query embedding cache key of a query: the text itself, or the hash of an image's pixels."""
+    if isinstance(query, str):
+        return modality, query
+    return modality, (query.mode, query.size, hashlib.sha256(query.tobytes()).hexdigest())
+
+
+def _overlap_predicate(start_column, end_column, start_time: Optional[float], end_time: Optional[float], scale=1.0):
+    """Build a pixeltable predicate matching rows that overlap [start_time, end_time].
+
+    Args:
+        start_column: Column holding the start position of a row.
+        end_column: Column holding the end position of a row.
+        start_time (Optional[float]): Lower bound in seconds. Unbounded if None.
+        end_time (Optional[float]): Upper bound in seconds. Unbounded if None.
+        scale (float): Factor converting seconds to the unit of the columns.
+
+    Returns:
+        The predicate, or None if both bounds are None.
+    """
+    predicate = None
+    if start_time is not None:
+        predicate = end_column >= start_time * scale
+    if end_time is not None:
+        upper_bound = start_column <= end_time * scale
+        predicate = upper_bound if predicate is None else predicate & upper_bound
+    return predicate
+
+
+def _restrict_to_time(
+    view,
+    start_column,
+    end_column,
+    start_time: Optional[float],
+    end_time: Optional[float],
+    windows: Optional[List[Tuple[float, float]]] = None,
+    scale=1.0,
+):
+    """Filter a view to rows overlapping [start_time, end_time] and, if given, any of the windows."""
+    predicate = _overlap_predicate(start_column, end_column, start_time, end_time, scale)
+    if windows:
+        windows_predicate = None
+        for window_start, window_end in windows:
+            window_predicate = _overlap_predicate(start_column, end_column, window_start, window_end, scale)
+            windows_predicate = window_predicate if windows_predicate is None else windows_predicate | window_predicate
+        predicate = windows_predicate if predicate is None else predicate & windows_predicate
+    return view.where(predicate) if predicate is not None else view
+
 
 class VideoSearchEngine:
     """A class that provides video search capabilities using different modalities."""
 
-    def __init__(self, video_name: str):
+    def __init__(self, video_name: str, hierarchical: bool = True):
         """Initialize the video search engine.
 
         Args:
             video_name (str): The name of the video index to search in.
+            hierarchical (bool): Whether to narrow searches down to the best matching segments first,
+                when the video is long enough. Defaults to True.
 
         Raises:
-            ValueError: If the video index is not found in registry.
+            ValueError: If the video index is not found in registry, or was built with another CLIP_INT8 setting.
         """
         self.video_index: CachedTable = registry.get_table(video_name)
         if not self.video_index:
             raise ValueError(f"Video index {video_name} not found in registry.")
+        if self.video_index.clip_int8 != clip_int8_enabled():
+            # Its CLIP embeddings and the query ones would come from different weights.
+            raise ValueError(
+                f"Video index {video_name} was built with {'int8' if self.video_index.clip_int8 else 'fp32'} CLIP "
+                f"embeddings, which do not match the current CLIP_INT8 setting. Process the video again to rebuild it."
+            )
         self.video_name = video_name
+        self.hierarchical = hierarchical
+        self._query_embeddings: Dict[Tuple[str, Any], np.ndarray] = {}
+        self._index_vectors: Dict[str, Dict[str, Any]] = {}
+
+    @property
+    def segments(self) -> SegmentIndex:
+        """Segment-level embeddings of the video index, loaded once per video."""
+        return _get_segment_index(self.video_index)
+
+    def _use_segments(self) -> bool:
+        return self.hierarchical and self.segments.size >= settings.HIERARCHICAL_SEARCH_MIN_SEGMENTS
+
+    def _embed_query(self, modality: str, query: str | Image.Image) -> np.ndarray:
+        """Embed a query in the embedding space of a modality, once per search engine and query."""
+        key = _query_key(modality, query)
+        if key not in self._query_embeddings:
+            if modality == "speech":
+                embedding = embed_openai_texts([query], settings.TRANSCRIPT_SIMILARITY_EMBD_MODEL)[0]
+            elif modality == "caption":
+                embedding = embed_clip_texts([query], settings.CAPTION_SIMILARITY_EMBD_MODEL)[0]
+            else:
+                embedding = embed_clip_images([query], settings.IMAGE_SIMILARITY_EMBD_MODEL)[0]
+            self._query_embeddings[key] = embedding
+        return self._query_embeddings[key]
+
+    def _segment_windows(
+        self, modality: str, query: str | Image.Image, start_time: Optional[float], end_time: Optional[float]
+    ) -> Optional[List[Tuple[float, float]]]:
+        if not self._use_segments():
+            return None
+        return self.segments.top_windows(
+            _SEGMENT_EMBEDDING_COLUMNS[modality],
+            self._embed_query(modality, query),
+            settings.HIERARCHICAL_SEARCH_TOP_SEGMENTS,
+            start_time,
+            end_time,
+        )
+
+    def _quantized_search(
+        self,
+        modality: str,
+        query: str | Image.Image,
+        top_k: int,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        windows: Optional[List[Tuple[float, float]]],
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Search the int8 copy of a modality's index, if quantization is enabled and the index was quantized.
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: The re-scored results, or None if the pixeltable index should be used.
+        """
+        if settings.EMBEDDING_QUANTIZATION == "none":
+            return None
+        quantized_index = get_quantized_index(
+            quantized_index_dir(self.video_index.video_cache), _QUANTIZED_INDEXES[modality]
+        )
+        if quantized_index is None:
+            return None
+
+        rescore_vectors = None
+        if quantized_index.keys is not None:
+
+            def rescore_vectors(rows: np.ndarray) -> np.ndarray:
+                return self._full_precision_vectors(modality, quantized_index.keys[rows])
+
+        return quantized_index.search(
+            self._embed_query(modality, query),
+            top_k,
+            settings.QUANTIZATION_RESCORE_FACTOR,
+            start_time,
+            end_time,
+            windows,
+            rescore_vectors,
+        )
+
+    def _rank_chunks_in_windows(
+        self,
+        query: str,
+        top_k: int,
+        start_time: Optional[float],
+        end_time: Optional[float],
+        windows: List[Tuple[float, float]],
+    ) -> List[Dict[str, Any]]:
+        """Rank the audio chunks inside the segment windows against the speech query embedding.
+
+        The query was already embedded to pick the segments, and pixeltable's `similarity` would embed it
+        again with another remote request, so the few chunks left are scored here instead.
+        """
+        view = self.video_index.audio_chunks_view
+        rows = (
+            self._audio_chunks_in_range(start_time, end_time, windows)
+            .select(view.start_time_sec, view.end_time_sec, text=view.chunk_text, embedding=view.chunk_text.embedding())
+            .collect()
+        )
+        # Chunks without speech have no embedding, so no similarity.
+        rows = [row for row in rows if row["embedding"] is not None]
+        if not rows:
+            return []
+        scores = normalize(np.stack([row["embedding"] for row in rows])) @ self._embed_query("speech", query)
+        return [
+            {
+                "start_time": float(rows[i]["start_time_sec"]),
+                "end_time": float(rows[i]["end_time_sec"]),
+                "text": rows[i]["text"],
+                "similarity": float(scores[i]),
+            }
+            for i in np.argsort(-scores, kind="stable")[:top_k]
+        ]
+
+    def _full_precision_vectors(self, modality: str, keys: np.ndarray) -> np.ndarray:
+        """Read the vectors of the rows with the given `pos` keys from a modality's pixeltable embedding index."""
+        if modality == "speech":
+            view = self.video_index.audio_chunks_view
+            column = view.chunk_text
+        else:
+            view = self.video_index.frames_view
+            column = view.im_caption if modality == "caption" else view.resized_frame
+        keys = [int(key) for key in keys]
+        rows = view.where(view.pos.isin(keys)).select(view.pos, embedding=column.embedding()).collect()
+        vectors = {row["pos"]: row["embedding"] for row in rows}
+        return np.stack([vectors[key] for key in keys])
+
+    def _frames_in_range(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        windows: Optional[List[Tuple[float, float]]] = None,
+    ):
+        """Restrict the frames view to frames whose position falls inside a time window.
+
+        The predicate is applied on `pos_msec` so it is pushed down to the index scan and
+        only frames inside the window are ranked by similarity.
+
+        Args:
+            start_time (Optional[float]): Lower bound of the window in seconds. Unbounded if None.
+            end_time (Optional[float]): Upper bound of the window in seconds. Unbounded if None.
+            windows (Optional[List[Tuple[float, float]]]): Segment windows in seconds, frames must fall in one of them.
+
+        Returns:
+            The frames view, or a filtered query over it when a bound is given.
+        """
+        frames_view = self.video_index.frames_view
+        return _restrict_to_time(
+            frames_view, frames_view.pos_msec, frames_view.pos_msec, start_time, end_time, windows, scale=1000.0
+        )
+
+    def _audio_chunks_in_range(
+        self,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+        windows: Optional[List[Tuple[float, float]]] = None,
+    ):
+        """Restrict the audio chunks view to chunks overlapping a time window.
+
+        Args:
+            start_time (Optional[float]): Lower bound of the window in seconds. Unbounded if None.
+            end_time (Optional[float]): Upper bound of the window in seconds. Unbounded if None.
+            windows (Optional[List[Tuple[float, float]]]): Segment windows in seconds, chunks must overlap one of them.
+
+        Returns:
+            The audio chunks view, or a filtered query over it when a bound is given.
+        """
+        audio_chunks_view = self.video_index.audio_chunks_view
+        return _restrict_to_time(
+            audio_chunks_view,
+            audio_chunks_view.start_time_sec,
+            audio_chunks_view.end_time_sec,
+            start_time,
+            end_time,
+            windows,
+        )
 
-    def search_by_speech(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def search_by_speech(
+        self,
+        query: str,
+        top_k: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Search video clips by speech similarity.
 
         Args:
             query (str): The search query to match against speech content.
             top_k (int, optional): Number of top results to return. Defaults to settings.SPEECH_SIMILARITY_SEARCH_TOP_K.
+            start_time (Optional[float]): Only consider content after this time in seconds. Defaults to None.
+            end_time (Optional[float]): Only consider content before this time in seconds. Defaults to None.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing clip information with keys:
@@ -38,13 +308,27 @@ class VideoSearchEngine:
                 - end_time (float): End time in seconds
                 - similarity (float): Similarity score
         """
+        windows = self._segment_windows("speech", query, start_time, end_time)
+        hits = self._quantized_search("speech", query, top_k, start_time, end_time, windows)
+        if hits is None and windows:
+            hits = self._rank_chunks_in_windows(query, top_k, start_time, end_time, windows)
+        if hits is not None:
+            return [
+                {"start_time": hit["start_time"], "end_time": hit["end_time"], "similarity": hit["similarity"]}
+                for hit in hits
+            ]
+
         sims = self.video_index.audio_chunks_view.chunk_text.similarity(query)
-        results = self.video_index.audio_chunks_view.select(
-            self.video_index.audio_chunks_view.pos,
-            self.video_index.audio_chunks_view.start_time_sec,
-            self.video_index.audio_chunks_view.end_time_sec,
-            similarity=sims,
-        ).order_by(sims, asc=False)
+        results = (
+            self._audio_chunks_in_range(start_time, end_time, windows)
+            .select(
+                self.video_index.audio_chunks_view.pos,
+                self.video_index.audio_chunks_view.start_time_sec,
+                self.video_index.audio_chunks_view.end_time_sec,
+                similarity=sims,
+            )
+            .order_by(sims, asc=False)
+        )
 
         return [
             {
@@ -53,14 +337,24 @@ class VideoSearchEngine:
                 "similarity": float(entry["similarity"]),
             }
             for entry in results.limit(top_k).collect()
+            # Chunks without speech have no embedding, so no similarity.
+            if entry["similarity"] is not None
         ]
 
-    def search_by_image(self, image_base64: str, top_k: int) -> List[Dict[str, Any]]:
+    def search_by_image(
+        self,
+        image: str,
+        top_k: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Search video clips by image similarity.
 
         Args:
-            image_base64 (str): The query image to match against video frames.
+            image (str): The query image to match against video frames, as a stored image path or in base64.
             top_k (int, optional): Number of top results to return. Defaults to settings.IMAGE_SIMILARITY_SEARCH_TOP_K.
+            start_time (Optional[float]): Only consider content after this time in seconds. Defaults to None.
+            end_time (Optional[float]): Only consider content before this time in seconds. Defaults to None.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing clip information with keys:
@@ -68,13 +362,29 @@ class VideoSearchEngine:
                 - end_time (float): End time in seconds
                 - similarity (float): Similarity score
         """
-        image = decode_image(image_base64)
+        image = load_image(image)
+        windows = self._segment_windows("image", image, start_time, end_time)
+        hits = self._quantized_search("image", image, top_k, start_time, end_time, windows)
+        if hits is not None:
+            return [
+                {
+                    "start_time": hit["start_time"] - settings.DELTA_SECONDS_FRAME_INTERVAL,
+                    "end_time": hit["end_time"] + settings.DELTA_SECONDS_FRAME_INTERVAL,
+                    "similarity": hit["similarity"],
+                }
+                for hit in hits
+            ]
+
         sims = self.video_index.frames_view.resized_frame.similarity(image)
-        results = self.video_index.frames_view.select(
-            self.video_index.frames_view.pos_msec,
-            self.video_index.frames_view.resized_frame,
-            similarity=sims,
-        ).order_by(sims, asc=False)
+        results = (
+            self._frames_in_range(start_time, end_time, windows)
+            .select(
+                self.video_index.frames_view.pos_msec,
+                self.video_index.frames_view.resized_frame,
+                similarity=sims,
+            )
+            .order_by(sims, asc=False)
+        )
 
         return [
             {
@@ -85,12 +395,20 @@ class VideoSearchEngine:
             for entry in results.limit(top_k).collect()
         ]
 
-    def search_by_caption(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def search_by_caption(
+        self,
+        query: str,
+        top_k: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Search video clips by caption similarity.
 
         Args:
             query (str): The search query to match against frame captions.
             top_k (int, optional): Number of top results to return. Defaults to settings.CAPTION_SIMILARITY_SEARCH_TOP_K.
+            start_time (Optional[float]): Only consider content after this time in seconds. Defaults to None.
+            end_time (Optional[float]): Only consider content before this time in seconds. Defaults to None.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing clip information with keys:
@@ -98,12 +416,28 @@ class VideoSearchEngine:
                 - end_time (float): End time in seconds
                 - similarity (float): Similarity score
         """
+        windows = self._segment_windows("caption", query, start_time, end_time)
+        hits = self._quantized_search("caption", query, top_k, start_time, end_time, windows)
+        if hits is not None:
+            return [
+                {
+                    "start_time": hit["start_time"] - settings.DELTA_SECONDS_FRAME_INTERVAL,
+                    "end_time": hit["end_time"] + settings.DELTA_SECONDS_FRAME_INTERVAL,
+                    "similarity": hit["similarity"],
+                }
+                for hit in hits
+            ]
+
         sims = self.video_index.frames_view.im_caption.similarity(query)
-        results = self.video_index.frames_view.select(
-            self.video_index.frames_view.pos_msec,
-            self.video_index.frames_view.im_caption,
-            similarity=sims,
-        ).order_by(sims, asc=False)
+        results = (
+            self._frames_in_range(start_time, end_time, windows)
+            .select(
+                self.video_index.frames_view.pos_msec,
+                self.video_index.frames_view.im_caption,
+                similarity=sims,
+            )
+            .order_by(sims, asc=False)
+        )
 
         return [
             {
@@ -114,23 +448,42 @@ class VideoSearchEngine:
             for entry in results.limit(top_k).collect()
         ]
 
-    def get_speech_info(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def get_speech_info(
+        self,
+        query: str,
+        top_k: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Get speech text information based on query similarity.
 
         Args:
             query (str): The search query to match against speech content.
             top_k (int, optional): Number of top results to return. Defaults to settings.SPEECH_SIMILARITY_SEARCH_TOP_K.
+            start_time (Optional[float]): Only consider content after this time in seconds. Defaults to None.
+            end_time (Optional[float]): Only consider content before this time in seconds. Defaults to None.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing text information with keys:
                 - text (str): The speech text
                 - similarity (float): Similarity score
         """
+        windows = self._segment_windows("speech", query, start_time, end_time)
+        hits = self._quantized_search("speech", query, top_k, start_time, end_time, windows)
+        if hits is None and windows:
+            hits = self._rank_chunks_in_windows(query, top_k, start_time, end_time, windows)
+        if hits is not None:
+            return [{"text": hit["text"], "similarity": hit["similarity"]} for hit in hits]
+
         sims = self.video_index.audio_chunks_view.chunk_text.similarity(query)
-        results = self.video_index.audio_chunks_view.select(
-            self.video_index.audio_chunks_view.chunk_text,
-            similarity=sims,
-        ).order_by(sims, asc=False)
+        results = (
+            self._audio_chunks_in_range(start_time, end_time, windows)
+            .select(
+                self.video_index.audio_chunks_view.chunk_text,
+                similarity=sims,
+            )
+            .order_by(sims, asc=False)
+        )
 
         return [
             {
@@ -138,25 +491,44 @@ class VideoSearchEngine:
                 "similarity": float(entry["similarity"]),
             }
             for entry in results.limit(top_k).collect()
+            # Chunks without speech have no embedding, so no similarity.
+            if entry["similarity"] is not None
         ]
 
-    def get_caption_info(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def get_caption_info(
+        self,
+        query: str,
+        top_k: int,
+        start_time: Optional[float] = None,
+        end_time: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
         """Get caption information based on query similarity.
 
         Args:
             query (str): The search query to match against frame captions.
             top_k (int, optional): Number of top results to return. Defaults to settings.CAPTION_SIMILARITY_SEARCH_TOP_K.
+            start_time (Optional[float]): Only consider content after this time in seconds. Defaults to None.
+            end_time (Optional[float]): Only consider content before this time in seconds. Defaults to None.
 
         Returns:
             List[Dict[str, Any]]: List of dictionaries containing caption information with keys:
                 - caption (str): The frame caption
                 - similarity (float): Similarity score
         """
+        windows = self._segment_windows("caption", query, start_time, end_time)
+        hits = self._quantized_search("caption", query, top_k, start_time, end_time, windows)
+        if hits is not None:
+            return [{"caption": hit["text"], "similarity": hit["similarity"]} for hit in hits]
+
         sims = self.video_index.frames_view.im_caption.similarity(query)
-        results = self.video_index.frames_view.select(
-            self.video_index.frames_view.im_caption,
-            similarity=sims,
-        ).order_by(sims, asc=False)
+        results = (
+            self._frames_in_range(start_time, end_time, windows)
+            .select(
+                self.video_index.frames_view.im_caption,
+                similarity=sims,
+            )
+            .order_by(sims, asc=False)
+        )
 
         return [
             {
@@ -165,3 +537,141 @@ class VideoSearchEngine:
             }
             for entry in results.limit(top_k).collect()
         ]
+
+    def _load_index_vectors(self, modality: str) -> Dict[str, Any]:
+        """Load all embeddings of a modality's index in memory, once per search engine.
+
+        Args:
+            modality (str): One of "speech", "caption" or "image".
+
+        Returns:
+            Dict[str, Any]: Normalized `vectors` matrix with the `start_times`, `end_times` and `texts` of each
+                row. Frames start and end at their position, like in the pixeltable and quantized indexes.
+        """
+        if modality not in self._index_vectors:
+            if modality == "speech":
+                view = self.video_index.audio_chunks_view
+                rows = view.select(
+                    view.start_time_sec,
+                    view.end_time_sec,
+                    text=view.chunk_text,
+                    embedding=view.chunk_text.embedding(),
+                ).collect()
+                # Chunks without speech have no embedding.
+                rows = [row for row in rows if row["embedding"] is not None]
+                start_times = [row["start_time_sec"] for row in rows]
+                end_times = [row["end_time_sec"] for row in rows]
+            else:
+                view = self.video_index.frames_view
+                column = view.im_caption if modality == "caption" else view.resized_frame
+                rows = view.select(view.pos_msec, text=view.im_caption, embedding=column.embedding()).collect()
+                start_times = end_times = [row["pos_msec"] / 1000.0 for row in rows]
+
+            self._index_vectors[modality] = {
+                "vectors": normalize(np.stack([row["embedding"] for row in rows])) if len(rows) > 0 else None,
+                "start_times": np.asarray(start_times, dtype=np.float64),
+                "end_times": np.asarray(end_times, dtype=np.float64),
+                "texts": [row["text"] for row in rows],
+            }
+        return self._index_vectors[modality]
+
+    def _batch_rank(self, modality: str, queries: List[str | Image.Image], top_k: int) -> List[List[Dict[str, Any]]]:
+        """Rank a modality's index against all queries, the same way the single-query searches do.
+
+        Each query is narrowed down to its best segments first and searched in the quantized index when
+        they are enabled. Otherwise the index is loaded once and scored against every query with a single
+        matrix product.
+        """
+        windows = [self._segment_windows(modality, query, None, None) for query in queries]
+        results: List[Optional[List[Dict[str, Any]]]] = [
+            self._quantized_search(modality, query, top_k, None, None, query_windows)
+            for query, query_windows in zip(queries, windows)
+        ]
+
+        exact = [idx for idx, hits in enumerate(results) if hits is None]
+        if exact:
+            index = self._load_index_vectors(modality)
+            if index["vectors"] is None:
+                for idx in exact:
+                    results[idx] = []
+                return results
+
+            query_embeddings = np.stack([self._embed_query(modality, queries[idx]) for idx in exact])
+            scores = query_embeddings @ index["vectors"].T
+            for query_scores, idx in zip(scores, exact):
+                if windows[idx]:
+                    in_windows = np.zeros(len(query_scores), dtype=bool)
+                    for window_start, window_end in windows[idx]:
+                        in_windows |= (index["end_times"] >= window_start) & (index["start_times"] <= window_end)
+                    query_scores[~in_windows] = -np.inf
+                n_valid = int(np.isfinite(query_scores).sum())
+                rows = np.argsort(-query_scores, kind="stable")[: min(top_k, n_valid)]
+                results[idx] = [
+                    {
+                        "start_time": float(index["start_times"][row]),
+                        "end_time": float(index["end_times"][row]),
+                        "text": index["texts"][row],
+                        "similarity": float(query_scores[row]),
+                    }
+                    for row in rows
+                ]
+
+        if modality != "speech":
+            # Frames stand for the moments around them, like in search_by_image and search_by_caption.
+            for hits in results:
+                for hit in hits:
+                    hit["start_time"] -= settings.DELTA_SECONDS_FRAME_INTERVAL
+                    hit["end_time"] += settings.DELTA_SECONDS_FRAME_INTERVAL
+        return results
+
+    def _prefill_query_embeddings(self, modality: str, queries: List[str | Image.Image], embeddings: np.ndarray):
+        for query, embedding in zip(queries, embeddings, strict=True):
+            self._query_embeddings[_query_key(modality, query)] = embedding
+
+    def batch_search(
+        self,
+        text_queries: List[str],
+        images: List[str],
+        top_k: int,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Search many text and image queries at once.
+
+        All text queries are embedded with one request per embedding model and all images in one CLIP batch.
+        Every query is then ranked like a single search would rank it, through the segments and the
+        quantized index when they are enabled, so batched and single searches return the same clips.
+
+        Args:
+            text_queries (List[str]): Queries matched against speech and frame captions.
+            images (List[str]): Images matched against video frames, as stored image paths or in base64.
+            top_k (int): Number of results to return per query and modality.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Dictionary containing:
+                text_results: One entry per text query, with `query`, `speech` and `caption` results.
+                image_results: One entry per image, with `image_idx` and `frames` results.
+        """
+        text_results, image_results = [], []
+
+        if text_queries:
+            self._prefill_query_embeddings(
+                "speech", text_queries, embed_openai_texts(text_queries, settings.TRANSCRIPT_SIMILARITY_EMBD_MODEL)
+            )
+            self._prefill_query_embeddings(
+                "caption", text_queries, embed_clip_texts(text_queries, settings.CAPTION_SIMILARITY_EMBD_MODEL)
+            )
+            speech_results = self._batch_rank("speech", text_queries, top_k)
+            caption_results = self._batch_rank("caption", text_queries, top_k)
+            text_results = [
+                {"query": query, "speech": speech, "caption": caption}
+                for query, speech, caption in zip(text_queries, speech_results, caption_results)
+            ]
+
+        if images:
+            loaded_images = [load_image(image) for image in images]
+            self._prefill_query_embeddings(
+                "image", loaded_images, embed_clip_images(loaded_images, settings.IMAGE_SIMILARITY_EMBD_MODEL)
+            )
+            frame_results = self._batch_rank("image", loaded_images, top_k)
+            image_results = [{"image_idx": idx, "frames": frames} for idx, frames in enumerate(frame_results)]
+
+        return {"text_results": text_results, "image_results": image_results}
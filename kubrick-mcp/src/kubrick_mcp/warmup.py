@@ -0,0 +1,136 @@
+import time
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from PIL import Image
+
+import kubrick_mcp.video.ingestion.registry as registry
+from kubrick_mcp.config import get_settings
+from kubrick_mcp.executors import search_executor
+from kubrick_mcp.video.embeddings import embed_clip_images, embed_clip_texts
+from kubrick_mcp.video.video_search_engine import VideoSearchEngine
+
+logger = logger.bind(name="WarmUp")
+
+settings = get_settings()
+
+
+class Readiness:
+    """Tracks the warm-up of the server: ready once the embedding models and the hot indexes are loaded.
+
+    A server whose models could not be loaded is still ready, with a "degraded" status: its models then load
+    on the first query instead.
+    """
+
+    def __init__(self):
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.models_ms: Dict[str, float] = {}
+        self.indexes_ms: Dict[str, float] = {}
+        self._started_at = time.perf_counter()
+        self.warm_up_ms: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "degraded")
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.warm_up_ms = 1000 * (time.perf_counter() - self._started_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "attempts": self.attempts,
+            "warm_up_ms": self.warm_up_ms,
+            "models_ms": self.models_ms,
+            "indexes_ms": self.indexes_ms,
+        }
+
+
+readiness = Readiness()
+
+
+def _warm_up_pixeltable_clip(model_id: str) -> None:
+    """Run one text and one image inference through pixeltable's CLIP, which the "huggingface" indexes use."""
+    from pixeltable.functions.huggingface import clip
+
+    # `clip` is overloaded on texts and images, each of its resolutions embeds one of them.
+    for fn, value in zip(clip._resolved_fns, ["warm up", Image.new("RGB", (224, 224))], strict=True):
+        fn.exec([value], {"model_id": model_id})
+
+
+def warm_up_models() -> None:
+    """Load every CLIP model the searches use and run one text and one image inference through it.
+
+    Query embeddings are always computed by the CLIP backend. With the "huggingface" backend, the embedding
+    indexes embed their similarity queries with pixeltable's own CLIP, which is warmed up too.
+    """
+    for model_id in dict.fromkeys([settings.IMAGE_SIMILARITY_EMBD_MODEL, settings.CAPTION_SIMILARITY_EMBD_MODEL]):
+        start = time.perf_counter()
+        embed_clip_texts(["warm up"], model_id)
+        embed_clip_images([Image.new("RGB", (224, 224))], model_id)
+        if settings.CLIP_EMBEDDING_BACKEND == "huggingface":
+            _warm_up_pixeltable_clip(model_id)
+        readiness.models_ms[model_id] = 1000 * (time.perf_counter() - start)
+        logger.info(f"Loaded {model_id} in {readiness.models_ms[model_id]:.0f}ms")
+
+
+def warm_up_indexes() -> None:
+    """Open the most recently processed video indexes with a caption search on each.
+
+    A video whose index fails to load is skipped, it will be loaded again on its first query.
+    """
+    if settings.WARMUP_HOT_INDEXES <= 0:
+        return
+    for video_name in list(registry.get_registry())[-settings.WARMUP_HOT_INDEXES :]:
+        start = time.perf_counter()
+        try:
+            VideoSearchEngine(video_name).search_by_caption("warm up", 1)
+        except Exception as e:
+            logger.warning(f"Failed to warm up the index of {video_name}: {e}")
+            continue
+        readiness.indexes_ms[video_name] = 1000 * (time.perf_counter() - start)
+        logger.info(f"Loaded the index of {video_name} in {readiness.indexes_ms[video_name]:.0f}ms")
+
+
+def warm_up() -> None:
+    """Load the embedding models and the hot indexes, then mark the server as ready.
+
+    A failed model warm-up, e.g. a transient download error, is retried with exponential backoff. Once
+    `WARMUP_MAX_ATTEMPTS` attempts failed, the server is marked ready with a "degraded" status rather than
+    never becoming ready, which would keep every service depending on it from starting.
+    """
+    error = None
+    backoff = settings.WARMUP_RETRY_BACKOFF_SECONDS
+    while readiness.attempts < settings.WARMUP_MAX_ATTEMPTS:
+        readiness.attempts += 1
+        try:
+            warm_up_models()
+            error = None
+            break
+        except Exception as e:
+            logger.exception(f"Model warm-up failed (attempt {readiness.attempts}/{settings.WARMUP_MAX_ATTEMPTS})")
+            error = str(e)
+            if readiness.attempts < settings.WARMUP_MAX_ATTEMPTS:
+                time.sleep(backoff)
+                backoff *= 2
+
+    warm_up_indexes()
+    if error is not None:
+        readiness.finish("degraded", error)
+        logger.warning(f"Server ready without its models after {readiness.warm_up_ms:.0f}ms of warm-up")
+        return
+    readiness.finish("ready")
+    logger.info(f"Server ready after {readiness.warm_up_ms:.0f}ms of warm-up")
+
+
+def start_warm_up() -> None:
+    """Warm up on the search thread, ahead of the first queries, which wait behind it instead of loading cold."""
+    if not settings.WARMUP_ENABLED:
+        readiness.finish("ready")
+        return
+    search_executor.submit(warm_up)
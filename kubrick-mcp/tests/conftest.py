@@ -0,0 +1,7 @@
+import os
+import tempfile
+
+# The settings require the API keys, and pixeltable must not touch the developer's own catalog.
+os.environ.setdefault("OPIK_API_KEY", "test")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PIXELTABLE_HOME", tempfile.mkdtemp(prefix="kubrick-mcp-tests-"))
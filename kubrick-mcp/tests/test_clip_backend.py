@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import kubrick_mcp.video.clip_backend as clip_backend
+import kubrick_mcp.video.video_search_engine as search_engine_module
+from kubrick_mcp.video.embeddings import normalize
+from kubrick_mcp.video.video_search_engine import VideoSearchEngine
+
+MODEL_ID = "openai/clip-vit-base-patch32"
+# Worst-case cosine between the eager fp32 and int8 embeddings of the same input.
+MIN_INT8_COSINE = 0.95
+
+
+@pytest.mark.parametrize(
+    "index_int8, backend, int8", [(False, "cpu", True), (True, "cpu", False), (True, "huggingface", True)]
+)
+def test_index_built_with_another_clip_setting_is_refused(monkeypatch, index_int8, backend, int8):
+    monkeypatch.setattr(clip_backend.settings, "CLIP_EMBEDDING_BACKEND", backend)
+    monkeypatch.setattr(clip_backend.settings, "CLIP_INT8", int8)
+    monkeypatch.setattr(
+        search_engine_module.registry, "get_table", lambda video_name: SimpleNamespace(clip_int8=index_int8)
+    )
+
+    with pytest.raises(ValueError, match="Process the video again"):
+        VideoSearchEngine("video.mp4")
+
+
+@pytest.mark.parametrize("int8", [False, True])
+def test_index_built_with_the_same_clip_setting_is_searched(monkeypatch, int8):
+    monkeypatch.setattr(clip_backend.settings, "CLIP_EMBEDDING_BACKEND", "cpu")
+    monkeypatch.setattr(clip_backend.settings, "CLIP_INT8", int8)
+    monkeypatch.setattr(search_engine_module.registry, "get_table", lambda video_name: SimpleNamespace(clip_int8=int8))
+
+    assert VideoSearchEngine("video.mp4").video_index.clip_int8 == int8
+
+
+def test_text_batches_hold_at_most_max_batch_tokens():
+    backend = clip_backend.ClipBackend.__new__(clip_backend.ClipBackend)
+    backend.batch_size, backend.max_batch_tokens = 4, 40
+    token_ids = [[0] * length for length in [30, 3, 12, 5, 7, 10, 3, 9]]
+
+    batches = backend._text_batches(token_ids)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(token_ids)))
+    for batch in batches:
+        assert len(batch) <= 4
+        assert len(batch) * max(len(token_ids[i]) for i in batch) <= 40 or len(batch) == 1
+
+
+def _cached_backends():
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from huggingface_hub import try_to_load_from_cache
+
+    if not isinstance(try_to_load_from_cache(MODEL_ID, "config.json"), str):
+        pytest.skip(f"{MODEL_ID} is not in the Hugging Face cache")
+    return clip_backend.ClipBackend(MODEL_ID), clip_backend.ClipBackend(MODEL_ID, int8=True)
+
+
+def test_int8_embeddings_match_the_eager_ones():
+    eager, int8 = _cached_backends()
+    texts = ["a dog runs on the beach", "a man in a red shirt holds a ball", "two cars on a street at night"]
+    rng = np.random.default_rng(0)
+    images = [Image.fromarray(rng.integers(0, 255, (224, 224, 3), dtype=np.uint8)) for _ in range(4)]
+
+    text_cosines = np.sum(normalize(eager.embed_texts(texts)) * normalize(int8.embed_texts(texts)), axis=1)
+    image_cosines = np.sum(normalize(eager.embed_images(images)) * normalize(int8.embed_images(images)), axis=1)
+
+    assert text_cosines.min() >= MIN_INT8_COSINE
+    assert image_cosines.min() >= MIN_INT8_COSINE
@@ -0,0 +1,77 @@
+import shutil
+import subprocess
+
+import av
+import pytest
+
+from kubrick_mcp.video.ingestion.tools import _head_encode_args, extract_highlight_reel
+
+H264_STREAM = {
+    "codec": "h264",
+    "profile": "Main",
+    "level": 31,
+    "pix_fmt": "yuv420p",
+    "audio_codec": "aac",
+    "sample_rate": 44100,
+    "channels": 2,
+}
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+
+def test_head_is_encoded_with_the_source_parameters():
+    args = _head_encode_args(H264_STREAM)
+
+    assert args[args.index("-profile:v") + 1] == "main"
+    assert args[args.index("-level:v") + 1] == "3.1"
+    assert args[args.index("-pix_fmt") + 1] == "yuv420p"
+    assert args[args.index("-ar") + 1] == "44100"
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [{"codec": "mpeg4", "profile": "Simple Profile"}, {"profile": "High 4:4:4 Intra"}, {"audio_codec": "opus"}],
+)
+def test_head_cannot_be_joined_with_copied_parts(changes):
+    assert _head_encode_args({**H264_STREAM, **changes}) is None
+
+
+def _make_video(path, codec):
+    command = [
+        "ffmpeg",
+        *("-f", "lavfi", "-i", "testsrc=duration=10:size=320x240:rate=25"),
+        *("-f", "lavfi", "-i", "sine=duration=10"),
+        *("-c:v", codec, "-g", "50", "-c:a", "aac", "-y", str(path)),
+    ]
+    subprocess.run(command, capture_output=True, check=True)
+    return str(path)
+
+
+def _decoded_frames(path):
+    with av.open(path) as container:
+        return container.streams.video[0].codec_context.name, sum(1 for _ in container.decode(video=0))
+
+
+@requires_ffmpeg
+def test_h264_reel_is_mostly_stream_copied(tmp_path):
+    video_path = _make_video(tmp_path / "source.mp4", "libx264")
+
+    reel = extract_highlight_reel(video_path, [(1.3, 3.1), (5.7, 7.2), (2.5, 4.0)], str(tmp_path / "reel.mp4"))
+
+    assert reel["windows"] == [(1.3, 4.0), (5.7, 7.2)]
+    assert reel["stream_copied_ratio"] > 0.5
+    codec, frames = _decoded_frames(reel["clip_path"])
+    assert codec == "h264"
+    assert frames / 25 == pytest.approx(reel["duration"], abs=0.5)
+
+
+@requires_ffmpeg
+def test_other_codecs_are_fully_reencoded(tmp_path):
+    video_path = _make_video(tmp_path / "source.mp4", "mpeg4")
+
+    reel = extract_highlight_reel(video_path, [(1.3, 3.1), (5.7, 7.2)], str(tmp_path / "reel.mp4"))
+
+    assert reel["stream_copied_ratio"] == 0.0
+    codec, frames = _decoded_frames(reel["clip_path"])
+    assert codec == "h264"
+    assert frames / 25 == pytest.approx(reel["duration"], abs=0.5)
@@ -0,0 +1,40 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from kubrick_mcp.video.ingestion import tools
+from kubrick_mcp.video.ingestion.tools import load_image
+
+
+@pytest.fixture
+def shared_media_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "shared_media"
+    (directory / "images").mkdir(parents=True)
+    monkeypatch.setattr(tools.settings, "SHARED_MEDIA_DIR", str(directory))
+    # The server runs from another directory, as it does in its container.
+    monkeypatch.chdir(tmp_path.parent)
+    return directory
+
+
+@pytest.mark.parametrize("name, image_format", [("a.jpg", "JPEG"), ("b.jpeg", "JPEG"), ("c.PNG", "PNG")])
+def test_stored_images_are_loaded_from_the_shared_media_dir(shared_media_dir, name, image_format):
+    Image.new("RGB", (8, 4)).save(shared_media_dir / "images" / name, format=image_format)
+
+    assert load_image(f"images/{name}").size == (8, 4)
+
+
+@pytest.mark.parametrize("image", ["../secret.jpg", "images/../../secret.jpg", "/etc/secret.png"])
+def test_paths_outside_of_the_shared_media_dir_are_rejected(shared_media_dir, image):
+    Image.new("RGB", (8, 4)).save(shared_media_dir.parent / "secret.jpg")
+
+    with pytest.raises(IOError, match="outside of the shared media directory"):
+        load_image(image)
+
+
+def test_base64_images_are_decoded(shared_media_dir):
+    buffer = BytesIO()
+    Image.new("RGB", (8, 4)).save(buffer, format="PNG")
+
+    assert load_image(base64.b64encode(buffer.getvalue()).decode()).size == (8, 4)
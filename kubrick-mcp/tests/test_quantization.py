@@ -0,0 +1,68 @@
+import numpy as np
+
+from kubrick_mcp.video.embeddings import normalize
+from kubrick_mcp.video.quantization import QuantizedEmbeddingIndex, quantize_int8
+
+
+def _vectors(n=2000, dim=64, seed=0):
+    return normalize(np.random.default_rng(seed).standard_normal((n, dim)))
+
+
+def _index(vectors):
+    times = np.arange(len(vectors), dtype=np.float64)
+    return QuantizedEmbeddingIndex.build(vectors, times, times, keys=np.arange(len(vectors)) + 100)
+
+
+def test_quantize_int8_round_trip():
+    vectors = _vectors(n=10)
+
+    codes, scales = quantize_int8(vectors)
+
+    assert codes.dtype == np.int8
+    np.testing.assert_allclose(codes * scales[:, None], vectors, atol=scales.max())
+
+
+def test_recall_with_rescoring():
+    report = _index(_vectors()).evaluate(top_k=10, n_queries=50, rescore_factor=4)
+
+    assert report["recall@10_int8"] >= 0.8
+    assert report["recall@10_rescored"] >= 0.95
+    assert report["recall@10_rescored"] >= report["recall@10_int8"]
+    assert report["quantized_scan_bytes"] < report["full_precision_scan_bytes"] / 3
+
+
+def test_saved_index_keeps_only_int8_codes(tmp_path):
+    vectors = _vectors(dim=512)
+    disk_bytes = _index(vectors).save(tmp_path, "frames_index")
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["frames_index.npz"]
+    assert disk_bytes == (tmp_path / "frames_index.npz").stat().st_size
+    assert disk_bytes < vectors.astype(np.float32).nbytes / 3
+
+
+def test_loaded_index_rescores_from_the_keyed_vectors(tmp_path):
+    vectors = _vectors()
+    _index(vectors).save(tmp_path, "frames_index")
+    loaded = QuantizedEmbeddingIndex.load(tmp_path, "frames_index")
+    requested_keys = []
+
+    def rescore_vectors(rows):
+        keys = loaded.keys[rows]
+        requested_keys.extend(keys.tolist())
+        return vectors[keys - 100]
+
+    query = normalize(vectors[7] + 0.1 * vectors[8])
+    hits = loaded.search(query, top_k=5, rescore_factor=4, rescore_vectors=rescore_vectors)
+
+    assert hits[0]["start_time"] == 7.0
+    assert len(requested_keys) == 20
+    expected = np.argsort(-(vectors @ query))[:5]
+    assert [int(hit["start_time"]) for hit in hits] == expected.tolist()
+
+
+def test_search_respects_time_windows():
+    vectors = _vectors()
+
+    hits = _index(vectors).search(vectors[7], top_k=3, windows=[(100.0, 200.0)])
+
+    assert all(100.0 <= hit["start_time"] <= 200.0 for hit in hits)
@@ -0,0 +1,26 @@
+import pytest
+
+import kubrick_mcp.video.ingestion.constants as cc
+import kubrick_mcp.video.ingestion.registry as registry
+
+
+@pytest.fixture
+def registry_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(cc, "DEFAULT_CACHED_TABLES_REGISTRY_DIR", str(tmp_path))
+    monkeypatch.setattr(registry, "VIDEO_INDEXES_REGISTRY", {})
+    registry.get_registry.cache_clear()
+    yield tmp_path
+    registry.get_registry.cache_clear()
+
+
+def test_registered_indexes_are_reloaded_by_another_process(registry_dir, monkeypatch):
+    registry.add_index_to_registry(
+        "video.mp4", "cache_1234", "cache_1234.frames", "cache_1234.audio_chunks", clip_int8=True
+    )
+    # What the server sees once the ingestion process is done.
+    monkeypatch.setattr(registry, "VIDEO_INDEXES_REGISTRY", {})
+    reloaded = registry.reload_registry()
+
+    assert [path.suffix for path in registry_dir.iterdir()] == [".json"]
+    assert reloaded["video.mp4"].frames_view == "cache_1234.frames"
+    assert reloaded["video.mp4"].clip_int8
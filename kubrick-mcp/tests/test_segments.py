@@ -0,0 +1,75 @@
+import numpy as np
+
+from kubrick_mcp.video.ingestion.segments import SegmentIndex, build_segments, pool_embeddings
+
+
+def _unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_pool_embeddings_is_normalized_mean():
+    pooled = pool_embeddings([_unit(1, 0), _unit(0, 1)])
+
+    np.testing.assert_allclose(pooled, _unit(1, 1), atol=1e-6)
+    assert pool_embeddings([]) is None
+
+
+def test_build_segments_groups_rows_by_time():
+    frames = [
+        {"pos_msec": 1_000, "frame_embedding": _unit(1, 0), "caption_embedding": _unit(0, 1), "caption": "a dog"},
+        {"pos_msec": 65_000, "frame_embedding": _unit(0, 1), "caption_embedding": None, "caption": ""},
+    ]
+    chunks = [
+        {"start_time_sec": 5.0, "transcript_embedding": _unit(1, 1), "chunk_text": "hello"},
+        # A chunk without speech embeds to a zero vector, it must not dilute the pooled embedding.
+        {"start_time_sec": 15.0, "transcript_embedding": np.zeros(2, dtype=np.float32), "chunk_text": ""},
+    ]
+
+    segments = build_segments(frames, chunks, segment_duration=60.0)
+
+    assert [segment["segment_idx"] for segment in segments] == [0, 1]
+    first, second = segments
+    assert (first["start_time_sec"], first["end_time_sec"]) == (0.0, 60.0)
+    np.testing.assert_allclose(first["transcript_embedding"], _unit(1, 1), atol=1e-6)
+    assert first["summary"] == "a dog\nhello"
+    assert second["caption_embedding"] is None
+    assert second["transcript_embedding"] is None
+
+
+def _segments(n):
+    return [
+        {
+            "start_time_sec": 60.0 * i,
+            "end_time_sec": 60.0 * (i + 1),
+            "frame_embedding": _unit(np.cos(i / 10), np.sin(i / 10)),
+            "caption_embedding": None,
+            "transcript_embedding": None,
+        }
+        for i in range(n)
+    ]
+
+
+def test_segment_index_ranks_segments():
+    index = SegmentIndex(_segments(10))
+
+    windows = index.top_windows("frame_embedding", _unit(np.cos(0.5), np.sin(0.5)), top_n=3)
+
+    assert windows[0] == (300.0, 360.0)
+    assert sorted(windows) == [(240.0, 300.0), (300.0, 360.0), (360.0, 420.0)]
+
+
+def test_segment_index_respects_time_bounds():
+    index = SegmentIndex(_segments(10))
+
+    windows = index.top_windows("frame_embedding", _unit(1, 0), top_n=3, start_time=400.0, end_time=500.0)
+
+    assert sorted(windows) == [(360.0, 420.0), (420.0, 480.0), (480.0, 540.0)]
+    assert index.top_windows("frame_embedding", _unit(1, 0), top_n=3, start_time=10_000.0) is None
+
+
+def test_segment_index_without_column():
+    index = SegmentIndex(_segments(10))
+
+    assert index.top_windows("caption_embedding", _unit(1, 0), top_n=3) is None
+    assert SegmentIndex([]).size == 0
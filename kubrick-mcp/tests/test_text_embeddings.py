@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from kubrick_mcp.video.text_embeddings import RemoteTextEmbedder, _parse_duration
+
+
+class FakeEmbeddings:
+    """The embeddings endpoint, embedding each text to a vector holding its length."""
+
+    def __init__(self, drop_last=False):
+        self.requests = []
+        self.drop_last = drop_last
+        self.with_raw_response = self
+
+    async def create(self, input, model, encoding_format):
+        self.requests.append(list(input))
+        data = [
+            SimpleNamespace(index=i, embedding=[float(len(text))] * 4) for i, text in reversed(list(enumerate(input)))
+        ]
+        if self.drop_last:
+            data = data[1:]
+        headers = {"x-ratelimit-remaining-requests": "100", "x-ratelimit-reset-requests": "1s"}
+        return SimpleNamespace(headers=headers, parse=lambda: SimpleNamespace(data=data))
+
+
+def _embedder(endpoint, **kwargs):
+    embedder = RemoteTextEmbedder("text-embedding-3-small", **kwargs)
+    client = SimpleNamespace(embeddings=endpoint)
+    embedder._get_client = lambda: client
+    return embedder
+
+
+def test_empty_texts_have_no_embedding_and_are_not_sent():
+    endpoint = FakeEmbeddings()
+    embedder = _embedder(endpoint)
+
+    embeddings = asyncio.run(embedder.embed(["a dog", "", None, "   ", "a cat!"]))
+
+    assert embeddings[1] is None and embeddings[2] is None and embeddings[3] is None
+    assert embeddings[0].tolist() == [5.0] * 4
+    assert embeddings[4].tolist() == [6.0] * 4
+    assert endpoint.requests == [["a dog", "a cat!"]]
+    assert embedder.stats["empty"] == 3
+
+
+def test_duplicates_are_sent_once():
+    endpoint = FakeEmbeddings()
+    embedder = _embedder(endpoint)
+
+    embeddings = asyncio.run(embedder.embed(["a dog", "a cat!", "a dog", "a dog"]))
+
+    assert endpoint.requests == [["a dog", "a cat!"]]
+    assert [embedding[0] for embedding in embeddings] == [5.0, 6.0, 5.0, 5.0]
+    assert embedder.stats["duplicates"] == 2
+
+
+def test_cached_texts_are_not_sent_again():
+    endpoint = FakeEmbeddings()
+    embedder = _embedder(endpoint, cache_size=2)
+
+    asyncio.run(embedder.embed(["a", "bb", "ccc"]))
+    embeddings = asyncio.run(embedder.embed(["a", "bb", "ccc"]))
+
+    # The cache holds the last two texts only.
+    assert endpoint.requests == [["a", "bb", "ccc"], ["a"]]
+    assert [embedding[0] for embedding in embeddings] == [1.0, 2.0, 3.0]
+    assert embedder.stats["cached"] == 2
+
+
+def test_requests_are_split_by_size():
+    endpoint = FakeEmbeddings()
+    embedder = _embedder(endpoint, request_size=2)
+
+    asyncio.run(embedder.embed([f"text {i}" for i in range(5)]))
+
+    assert [len(request) for request in endpoint.requests] == [2, 2, 1]
+
+
+def test_requests_are_split_by_tokens():
+    endpoint = FakeEmbeddings()
+    embedder = _embedder(endpoint, max_request_tokens=10)
+    # About 4 characters per token: 5, 5, 2 and 10 tokens.
+    texts = ["a" * 20, "b" * 20, "c" * 8, "d" * 40]
+
+    asyncio.run(embedder.embed(texts))
+
+    assert endpoint.requests == [[texts[0], texts[1]], [texts[2]], [texts[3]]]
+
+
+def test_short_response_is_an_error():
+    embedder = _embedder(FakeEmbeddings(drop_last=True))
+
+    with pytest.raises(ValueError, match="Expected 2 embeddings"):
+        asyncio.run(embedder.embed(["a dog", "a cat!"]))
+
+
+@pytest.mark.parametrize("value, seconds", [("20ms", 0.02), ("1.5s", 1.5), ("6m0s", 360.0), ("1h2m3s", 3723.0)])
+def test_rate_limit_reset_durations_are_parsed(value, seconds):
+    assert _parse_duration(value) == pytest.approx(seconds)
+
+
+def test_embeddings_are_float32():
+    embeddings = asyncio.run(_embedder(FakeEmbeddings()).embed(["a dog"]))
+
+    assert embeddings[0].dtype == np.float32
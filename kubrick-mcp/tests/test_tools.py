@@ -0,0 +1,55 @@
+import asyncio
+
+import kubrick_mcp.tools as tools
+
+
+def test_clip_from_user_query_without_match(monkeypatch):
+    monkeypatch.setattr(tools, "_search_best_clip", lambda *args: None)
+
+    result = asyncio.run(tools.get_video_clip_from_user_query("video.mp4", "a dog"))
+
+    assert result["clip_path"] is None
+    assert "No matching clip" in result["message"]
+
+
+def test_clip_from_time_range_without_match(monkeypatch):
+    monkeypatch.setattr(tools, "_search_best_clip", lambda *args: None)
+
+    result = asyncio.run(tools.get_video_clip_from_time_range("video.mp4", "a dog", 10.0, 20.0))
+
+    assert result["clip_path"] is None
+    assert "between 10.0s and 20.0s" in result["message"]
+
+
+def test_clip_from_time_range_is_clamped_to_the_range(monkeypatch):
+    monkeypatch.setattr(tools, "_search_best_clip", lambda *args: {"start_time": 5.0, "end_time": 15.0})
+    extracted = []
+
+    async def extract_clip(video_path, start_time, end_time):
+        extracted.append((start_time, end_time))
+        return "clip.mp4"
+
+    monkeypatch.setattr(tools, "_extract_clip", extract_clip)
+
+    result = asyncio.run(tools.get_video_clip_from_time_range("video.mp4", "a dog", 10.0, 20.0))
+
+    assert result == {"clip_path": "clip.mp4"}
+    assert extracted == [(10.0, 15.0)]
+
+
+def test_quantization_runs_in_the_ingestion_process(monkeypatch):
+    lanes = []
+
+    async def run_ingestion(fn, *args):
+        lanes.append(("ingestion", fn))
+        return {}
+
+    async def run_search(fn, *args):
+        lanes.append(("search", fn))
+
+    monkeypatch.setattr(tools, "run_ingestion", run_ingestion)
+    monkeypatch.setattr(tools, "run_search", run_search)
+
+    asyncio.run(tools.quantize_video_index("video.mp4"))
+
+    assert lanes == [("ingestion", tools._quantize_video_index)]
@@ -0,0 +1,118 @@
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+import pixeltable as pxt
+import pytest
+from PIL import Image
+
+import kubrick_mcp.video.video_search_engine as search_engine_module
+from kubrick_mcp.video.ingestion.segments import SegmentIndex
+from kubrick_mcp.video.video_search_engine import VideoSearchEngine, _query_key
+
+
+def _unit(angle):
+    return np.array([np.cos(angle), np.sin(angle)], dtype=np.float32)
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """A search engine over 20 one-minute segments with one chunk of speech every 10 seconds."""
+    monkeypatch.setattr(search_engine_module.settings, "EMBEDDING_QUANTIZATION", "none")
+    monkeypatch.setattr(search_engine_module.settings, "HIERARCHICAL_SEARCH_MIN_SEGMENTS", 10)
+    monkeypatch.setattr(search_engine_module.settings, "HIERARCHICAL_SEARCH_TOP_SEGMENTS", 1)
+
+    segments = [
+        {
+            "start_time_sec": 60.0 * i,
+            "end_time_sec": 60.0 * (i + 1),
+            "frame_embedding": None,
+            "caption_embedding": None,
+            "transcript_embedding": _unit(i / 10),
+        }
+        for i in range(20)
+    ]
+    monkeypatch.setitem(search_engine_module._segment_indexes, "cache_test", SegmentIndex(segments))
+
+    engine = VideoSearchEngine.__new__(VideoSearchEngine)
+    engine.video_index = SimpleNamespace(video_cache="cache_test", segments_table=None)
+    engine.video_name = "video.mp4"
+    engine.hierarchical = True
+    engine._query_embeddings = {}
+    start_times = np.arange(0.0, 1200.0, 10.0)
+    engine._index_vectors = {
+        "speech": {
+            # Chunks far from the matching segment are closer to the query, the segments must rule them out.
+            "vectors": np.stack([_unit(t / 600 + (1.0 if t >= 900 else 0.0)) for t in start_times]),
+            "start_times": start_times,
+            "end_times": start_times + 10.0,
+            "texts": [f"chunk {int(t)}" for t in start_times],
+        }
+    }
+    return engine
+
+
+def test_batch_rank_narrows_down_to_the_best_segments(engine):
+    engine._query_embeddings[("speech", "query")] = _unit(0.5)
+
+    [hits] = engine._batch_rank("speech", ["query"], top_k=3)
+
+    # The best segment for an angle of 0.5 is the sixth one, [300, 360].
+    assert all(hit["end_time"] >= 300.0 and hit["start_time"] <= 360.0 for hit in hits)
+    assert hits[0]["similarity"] >= hits[-1]["similarity"]
+
+
+def test_batch_rank_without_segments_is_flat(engine):
+    engine.hierarchical = False
+    engine._query_embeddings[("speech", "query")] = _unit(1.0 + 950 / 600)
+
+    [hits] = engine._batch_rank("speech", ["query"], top_k=1)
+
+    assert hits[0]["start_time"] == 950.0
+
+
+def test_images_are_keyed_by_their_pixels():
+    black, white = Image.new("RGB", (8, 8)), Image.new("RGB", (8, 8), "white")
+
+    assert _query_key("image", black) == _query_key("image", Image.new("RGB", (8, 8)))
+    assert _query_key("image", black) != _query_key("image", white)
+    assert _query_key("image", black) != _query_key("image", black.convert("L"))
+
+
+_chunk_embeddings = {}
+
+
+# Embeds the chunks only: a similarity query through the index fails to embed the query.
+@pxt.udf
+def _embed_chunk(text: str) -> pxt.Array[(2,), pxt.Float]:
+    return _chunk_embeddings[text]
+
+
+def test_hierarchical_speech_search_embeds_the_query_once(engine, monkeypatch):
+    start_times = engine._index_vectors["speech"]["start_times"]
+    _chunk_embeddings.update(
+        {f"chunk {int(t)}": vector for t, vector in zip(start_times, engine._index_vectors["speech"]["vectors"])}
+    )
+    chunks = pxt.create_table(
+        f"chunks_{uuid.uuid4().hex[:8]}",
+        {"start_time_sec": pxt.Float, "end_time_sec": pxt.Float, "chunk_text": pxt.String},
+    )
+    chunks.insert(
+        [{"start_time_sec": t, "end_time_sec": t + 10.0, "chunk_text": f"chunk {int(t)}"} for t in start_times]
+    )
+    chunks.add_embedding_index(chunks.chunk_text, string_embed=_embed_chunk)
+    engine.video_index.audio_chunks_view = chunks
+    embedded = []
+
+    def embed_openai_texts(texts, model):
+        embedded.append(texts)
+        return np.stack([_unit(0.5)])
+
+    monkeypatch.setattr(search_engine_module, "embed_openai_texts", embed_openai_texts)
+
+    hits = engine.search_by_speech("query", top_k=3)
+
+    assert embedded == [["query"]]
+    assert len(hits) == 3
+    assert all(hit["end_time"] >= 300.0 and hit["start_time"] <= 360.0 for hit in hits)
+    assert hits[0]["similarity"] >= hits[-1]["similarity"]
@@ -0,0 +1,46 @@
+import pytest
+
+import kubrick_mcp.warmup as warmup
+
+
+@pytest.fixture
+def readiness(monkeypatch):
+    readiness = warmup.Readiness()
+    monkeypatch.setattr(warmup, "readiness", readiness)
+    monkeypatch.setattr(warmup.settings, "WARMUP_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(warmup.settings, "WARMUP_RETRY_BACKOFF_SECONDS", 0.0)
+    monkeypatch.setattr(warmup, "warm_up_indexes", lambda: None)
+    return readiness
+
+
+def _failing_models(monkeypatch, failures):
+    attempts = []
+
+    def warm_up_models():
+        attempts.append(len(attempts))
+        if len(attempts) <= failures:
+            raise OSError("Temporary failure in name resolution")
+
+    monkeypatch.setattr(warmup, "warm_up_models", warm_up_models)
+    return attempts
+
+
+def test_a_transient_model_failure_is_retried(monkeypatch, readiness):
+    attempts = _failing_models(monkeypatch, failures=2)
+
+    warmup.warm_up()
+
+    assert len(attempts) == 3
+    assert readiness.to_dict()["status"] == "ready"
+    assert readiness.error is None
+
+
+def test_the_server_is_ready_but_degraded_when_the_models_never_load(monkeypatch, readiness):
+    attempts = _failing_models(monkeypatch, failures=10)
+
+    warmup.warm_up()
+
+    assert len(attempts) == 3
+    assert readiness.ready
+    assert readiness.to_dict()["status"] == "degraded"
+    assert "name resolution" in readiness.error
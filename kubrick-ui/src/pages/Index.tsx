@@ -49,6 +49,7 @@ const Index = () => {
   const [isProcessingVideo, setIsProcessingVideo] = useState(false);
   const [uploadProgress, setUploadProgress] = useState(0);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const sessionId = useRef<string>(crypto.randomUUID());
 
   const scrollToBottom = () => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -99,26 +100,30 @@ const Index = () => {
     try {
       const requestBody: {
         message: string;
-        image_base64?: string;
+        session_id: string;
+        image_id?: string;
         video_path?: string;
       } = {
-        message: userMessage
+        message: userMessage,
+        session_id: sessionId.current
       };
 
       if (fileUrl && fileType) {
         if (fileType === 'image') {
           const response = await fetch(fileUrl);
           const blob = await response.blob();
-          const base64 = await new Promise<string>((resolve) => {
-            const reader = new FileReader();
-            reader.onloadend = () => {
-              const result = reader.result as string;
-              const base64Data = result.split(',')[1];
-              resolve(base64Data);
-            };
-            reader.readAsDataURL(blob);
+          const formData = new FormData();
+          formData.append('file', blob, 'image');
+
+          const uploadResponse = await fetch('http://localhost:8080/upload-image', {
+            method: 'POST',
+            body: formData,
           });
-          requestBody.image_base64 = base64;
+          if (!uploadResponse.ok) {
+            throw new Error(`Image upload failed: ${uploadResponse.status}`);
+          }
+          const uploadData = await uploadResponse.json();
+          requestBody.image_id = uploadData.image_id;
         }
       }
 